@@ -0,0 +1,178 @@
+"""Per-step framework overhead of `GraphAgentWithTools`.
+
+The graph is run with a stub chat model and a stub tool that return immediately, so the measured
+time is only the cost of LangGraph, LangChain and `GraphAgentWithTools` per node execution (step).
+It is compared with rebuilding the bound model, the tool executor and the graph on every access,
+as the agent did before caching them, and the time of each rebuild is reported too. The results
+are saved as JSON.
+
+Usage (from `libs/gptstonks-multiagents`):
+
+    python benchmarks/graph_overhead.py --num-runs 200 --tool-rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import Tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from gptstonks.multiagents.graphs import GraphAgentWithTools
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that calls the `echo` tool `tool_rounds` times and then answers."""
+
+    tool_rounds: int = 5
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any):
+        # converted to OpenAI's schema, as the OpenAI chat models do
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        num_tool_messages = sum(isinstance(message, ToolMessage) for message in messages)
+        if num_tool_messages >= self.tool_rounds:
+            message = AIMessage(content="Final answer.")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "echo", "args": {"__arg1": "AAPL"}, "id": f"call_{num_tool_messages}"}
+                ],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class UncachedGraphAgentWithTools(GraphAgentWithTools):
+    """Rebuilds the bound model, the tool executor and the graph on every access."""
+
+    def _clear_cache(self):
+        self.__dict__.pop("tool_executor", None)
+        self.__dict__.pop("llm_with_tools", None)
+        self._compiled_graphs.clear()
+
+    async def _call_model(self, state):
+        self._clear_cache()
+        return await super()._call_model(state)
+
+    async def _call_openai_tool(self, agent_action):
+        self._clear_cache()
+        return await super()._call_openai_tool(agent_action)
+
+    def define_basic_graph(self):
+        self._clear_cache()
+        return super().define_basic_graph()
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Compute the mean and the p50/p95 percentiles of a list of values."""
+    p50, p95 = np.percentile(values, [50, 95]).tolist()
+    return {"mean": float(np.mean(values)), "p50": p50, "p95": p95}
+
+
+def create_graph_agent(
+    graph_agent_cls: type[GraphAgentWithTools], args: argparse.Namespace
+) -> GraphAgentWithTools:
+    return graph_agent_cls(
+        model=StubChatModel(tool_rounds=args.tool_rounds),
+        tools=[
+            Tool(name=name, func=lambda query: f"echo {query}", description=f"Echo ({name}).")
+            for name in ["echo"] + [f"echo_{i}" for i in range(1, args.num_tools)]
+        ],
+        prompt_main_agent=ChatPromptTemplate.from_messages(
+            [("user", "{input}"), MessagesPlaceholder(variable_name="agent_scratchpad")]
+        ),
+    )
+
+
+async def measure_ms_per_step(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run the graphs `num_runs` times and measure the milliseconds per step.
+
+    The cached and uncached agents are run alternately, so both are equally affected by the noise
+    of the machine.
+    """
+    graph_agents = {
+        "cached": create_graph_agent(GraphAgentWithTools, args),
+        "uncached": create_graph_agent(UncachedGraphAgentWithTools, args),
+    }
+    # agent and action per tool round, plus the final agent step
+    num_steps = 2 * args.tool_rounds + 1
+    ms_per_step = {name: [] for name in graph_agents}
+    for i in range(args.num_warmup_runs + args.num_runs):
+        for name, graph_agent in graph_agents.items():
+            start = time.perf_counter()
+            graph = graph_agent.define_basic_graph()
+            await graph.ainvoke(
+                {"input": "AAPL price", "context_messages": []},
+                {"recursion_limit": num_steps + 1},
+            )
+            if i >= args.num_warmup_runs:
+                ms_per_step[name].append((time.perf_counter() - start) * 1000 / num_steps)
+    return {name: summarize(values) for name, values in ms_per_step.items()}
+
+
+def measure_ms_per_rebuild(args: argparse.Namespace) -> dict[str, float]:
+    """Measure the milliseconds to build the bound model, the tool executor and the graph, which
+    the uncached agent paid on every step (the graph, on every run)."""
+    graph_agent = create_graph_agent(UncachedGraphAgentWithTools, args)
+    ms_per_rebuild = {"llm_with_tools": [], "tool_executor": [], "graph": []}
+    for _ in range(args.num_runs):
+        for name in ms_per_rebuild:
+            graph_agent._clear_cache()
+            start = time.perf_counter()
+            if name == "graph":
+                graph_agent.define_basic_graph()
+            else:
+                getattr(graph_agent, name)
+            ms_per_rebuild[name].append((time.perf_counter() - start) * 1000)
+    return {name: float(np.mean(values)) for name, values in ms_per_rebuild.items()}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num-runs", type=int, default=200)
+    parser.add_argument("--num-warmup-runs", type=int, default=10)
+    parser.add_argument("--tool-rounds", type=int, default=5, help="Tool calls per run.")
+    parser.add_argument("--num-tools", type=int, default=5, help="Tools bound to the model.")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSON file to save the results. Default: benchmarks/results/graph_overhead_{timestamp}.json",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "ms_per_step": asyncio.run(measure_ms_per_step(args)),
+        "ms_per_rebuild": measure_ms_per_rebuild(args),
+    }
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        f"graph_overhead_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results saved to {output}")
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Any, Sequence
+from functools import cached_property
+from typing import Any, Callable, Hashable
 
 from langchain.agents.output_parsers.openai_tools import (
     parse_ai_message_to_openai_tool_action,
@@ -11,34 +12,75 @@ from langchain_core.runnables.base import RunnableLike
 from langgraph.graph import END, StateGraph
 from langgraph.graph.graph import CompiledGraph
 from langgraph.prebuilt import ToolExecutor, ToolInvocation
-from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, computed_field
 
 from ..states import BaseAgentState
 
 
 class GraphAgentWithTools(BaseModel):
-    """Factory class for Agent with tools using LangGraph."""
+    """Factory class for Agent with tools using LangGraph.
+
+    The tool executor, the model with the tools bound and the compiled graphs are built once and
+    reused by every step and run. They are rebuilt if `model`, `tools`, `prompt_main_agent` or
+    `state_schema` are reassigned. The tools are stored as a tuple, so they cannot be changed in
+    place without rebuilding them: reassign `tools` instead.
+    """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     model: Any = Field(
         description="LangChain LLM to use in the graph. Tools should not be binded yet."
     )
-    tools: Sequence[Any] = Field(description="LangChain tools the agent can call")
+    tools: tuple[Any, ...] = Field(description="LangChain tools the agent can call")
     prompt_main_agent: Any = Field(
         description="LangChain Prompt object to use with the main agent"
     )
+    state_schema: Any = Field(
+        default=BaseAgentState,
+        description=(
+            "State of the graph, `BaseAgentState` or a subclass. Use `create_context_window_state`"
+            " to keep the context messages within a token budget"
+        ),
+    )
+
+    _compiled_graphs: dict[Hashable, CompiledGraph] = PrivateAttr(default_factory=dict)
 
     @computed_field
-    @property
+    @cached_property
     def tool_executor(self) -> ToolExecutor:
         return ToolExecutor(self.tools)
 
     @computed_field
-    @property
+    @cached_property
     def llm_with_tools(self) -> LLM:
         return self.prompt_main_agent | self.model.bind_tools(self.tools)
 
+    def __setattr__(self, name: str, value: Any):
+        if name == "tools":
+            value = tuple(value)
+        super().__setattr__(name, value)
+        if name in ("model", "tools", "prompt_main_agent", "state_schema"):
+            # the cached objects depend on the previous value
+            self.__dict__.pop("tool_executor", None)
+            self.__dict__.pop("llm_with_tools", None)
+            self._compiled_graphs.clear()
+
+    def _get_compiled_graph(
+        self, key: Hashable, define_workflow: Callable[[], StateGraph]
+    ) -> CompiledGraph:
+        """Compile the workflow the first time a configuration is requested and reuse it after.
+
+        Args:
+            key (`Hashable`): identifier of the graph configuration.
+            define_workflow (`Callable[[], StateGraph]`): builds the workflow, with its entry point.
+
+        Returns:
+            `CompiledGraph`: the compiled graph of the configuration.
+        """
+        if key not in self._compiled_graphs:
+            self._compiled_graphs[key] = define_workflow().compile()
+        return self._compiled_graphs[key]
+
     def _should_continue(self, state: BaseAgentState):
         """Function that determines whether to continue or not."""
         last_message = parse_ai_message_to_openai_tool_action(state["context_messages"][-1])
@@ -112,7 +154,7 @@ class GraphAgentWithTools(BaseModel):
             `StateGraph`: StateGraph with action and agent nodes included.
         """
         # Define a new graph
-        workflow = StateGraph(BaseAgentState)
+        workflow = StateGraph(self.state_schema)
 
         # Define the two nodes we will cycle between
         workflow.add_node("agent", self._call_model)
@@ -140,9 +182,14 @@ class GraphAgentWithTools(BaseModel):
         return workflow
 
     def define_basic_graph(self) -> CompiledGraph:
-        """Defines basic LangGraph graph."""
+        """Defines basic LangGraph graph.
+
+        It is compiled only on the first call.
+        """
 
-        workflow = self._define_basic_workflow()
-        workflow.set_entry_point("agent")
+        def define_workflow() -> StateGraph:
+            workflow = self._define_basic_workflow()
+            workflow.set_entry_point("agent")
+            return workflow
 
-        return workflow.compile()
+        return self._get_compiled_graph("basic", define_workflow)
@@ -1 +1,4 @@
 from .base import BaseAgentState as BaseAgentState
+from .context_window import ContextWindowReducer as ContextWindowReducer
+from .context_window import count_tokens_approximately as count_tokens_approximately
+from .context_window import create_context_window_state as create_context_window_state
@@ -0,0 +1,140 @@
+from typing import Annotated, Callable, Sequence, TypedDict, get_type_hints
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+from .base import BaseAgentState
+
+TRUNCATION_SUFFIX = "\n[...truncated]"
+
+
+def count_tokens_approximately(messages: Sequence[BaseMessage]) -> int:
+    """Estimate the number of tokens of some messages, as 1 token every 4 characters plus 4 tokens
+    of overhead per message.
+
+    Used when no tokenizer is given.
+    """
+    return sum(len(str(message.content)) // 4 + 4 for message in messages)
+
+
+class ContextWindowReducer:
+    """LangGraph reducer that keeps the context messages of an agent within a token budget.
+
+    It replaces `operator.add` in `BaseAgentState.context_messages`, so the prompt of each step
+    stays bounded no matter how many tool rounds the agent takes. Plain string entries are
+    converted to `HumanMessage` first, so `token_counter` only receives messages:
+    1. The content of each new `ToolMessage` is truncated to `max_tool_message_tokens`.
+    2. If the messages exceed `max_tokens`, the oldest turns (a message with tool calls and its
+        tool messages are a turn, as they cannot be separated) are removed until they fit. The
+        last `min_turns` turns are always kept in full.
+    3. If `summarize` is given, the removed turns (including a previous summary) are replaced by
+        a message with their summary.
+
+    Args:
+        max_tokens (`int`): token budget of the context messages.
+        max_tool_message_tokens (`int | None`): max. tokens of each tool message. None for no limit.
+        min_turns (`int`): number of newest turns always kept, even if they exceed the budget.
+        token_counter (`Callable[[Sequence[BaseMessage]], int] | None`): counts the tokens of a
+            list of messages, e.g., `model.get_num_tokens_from_messages`. Defaults to
+            `count_tokens_approximately`.
+        summarize (`Callable[[list[BaseMessage]], str] | None`): summarizes the removed
+            messages. It is called synchronously, when the state is updated.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        max_tool_message_tokens: int | None = 1000,
+        min_turns: int = 1,
+        token_counter: Callable[[Sequence[BaseMessage]], int] | None = None,
+        summarize: Callable[[list[BaseMessage]], str] | None = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_tool_message_tokens = max_tool_message_tokens
+        self.min_turns = min_turns
+        self.token_counter = token_counter or count_tokens_approximately
+        self.summarize = summarize
+
+    def __call__(
+        self, left: list[BaseMessage | str], right: list[BaseMessage | str]
+    ) -> list[BaseMessage]:
+        messages = [self._to_message(message) for message in left] + [
+            self._truncate_tool_message(self._to_message(message)) for message in right
+        ]
+        if self.token_counter(messages) <= self.max_tokens:
+            return messages
+
+        turns = self._split_turns(messages)
+        num_removed = 0
+        kept_tokens = self.token_counter(messages)
+        while len(turns) - num_removed > self.min_turns and kept_tokens > self.max_tokens:
+            kept_tokens -= self.token_counter(turns[num_removed])
+            num_removed += 1
+        if num_removed == 0:
+            return messages
+        kept_messages = [message for turn in turns[num_removed:] for message in turn]
+        removed_messages = [message for turn in turns[:num_removed] for message in turn]
+        if self.summarize is None:
+            return kept_messages
+        if len(removed_messages) == 1 and self._is_summary(removed_messages[0]):
+            # nothing new to summarize
+            return removed_messages + kept_messages
+        summary = HumanMessage(
+            content=f"Summary of the previous steps: {self.summarize(removed_messages)}",
+            additional_kwargs={"is_context_summary": True},
+        )
+        return [summary] + kept_messages
+
+    @staticmethod
+    def _to_message(message: BaseMessage | str) -> BaseMessage:
+        return HumanMessage(content=message) if isinstance(message, str) else message
+
+    @staticmethod
+    def _is_summary(message: BaseMessage) -> bool:
+        return isinstance(message, HumanMessage) and message.additional_kwargs.get(
+            "is_context_summary", False
+        )
+
+    def _truncate_tool_message(self, message: BaseMessage) -> BaseMessage:
+        if self.max_tool_message_tokens is None or not isinstance(message, ToolMessage):
+            return message
+        num_tokens = self.token_counter([message])
+        if num_tokens <= self.max_tool_message_tokens:
+            return message
+        content = str(message.content)
+        # characters are removed proportionally to the excess of tokens, making room for the suffix
+        num_chars = max(
+            len(content) * self.max_tool_message_tokens // num_tokens - len(TRUNCATION_SUFFIX), 0
+        )
+        return message.copy(update={"content": content[:num_chars] + TRUNCATION_SUFFIX})
+
+    @staticmethod
+    def _split_turns(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+        """Group the messages in turns.
+
+        Tool messages belong to the turn of the message that called them, so removing a turn never
+        leaves a tool message without its tool call.
+        """
+        turns = []
+        for message in messages:
+            if isinstance(message, ToolMessage) and len(turns) > 0:
+                turns[-1].append(message)
+            else:
+                turns.append([message])
+        return turns
+
+
+def create_context_window_state(**reducer_kwargs) -> type:
+    """Create a state like `BaseAgentState` whose context messages are kept within a token budget
+    by `ContextWindowReducer`.
+
+    Args:
+        reducer_kwargs: arguments of `ContextWindowReducer`, e.g., `max_tokens`.
+
+    Returns:
+        `type`: the state, to use as `state_schema` of the graphs.
+    """
+    annotations = get_type_hints(BaseAgentState, include_extras=True)
+    annotations["context_messages"] = Annotated[
+        list[BaseMessage], ContextWindowReducer(**reducer_kwargs)
+    ]
+    return TypedDict("ContextWindowAgentState", annotations)
@@ -1,4 +1,11 @@
+from typing import Any
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import Tool
 from langchain_openai import ChatOpenAI
 from llama_index.llms.openai import OpenAI as LlamaIndexOpenAI
 
@@ -32,3 +39,77 @@ def test_agent_with_tools_def():
             ]
         ),
     ).define_basic_graph()
+
+
+class ToolThenAnswerChatModel(BaseChatModel):
+    """Chat model that calls the `echo` tool once and then answers, counting `bind_tools`."""
+
+    num_bind_tools: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-then-answer"
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any):
+        self.num_bind_tools += 1
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content=f"Answer: {messages[-1].content}")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": "echo", "args": {"__arg1": "AAPL"}, "id": "call_0"}],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def create_graph_agent(model: BaseChatModel) -> GraphAgentWithTools:
+    return GraphAgentWithTools(
+        model=model,
+        tools=[Tool(name="echo", func=lambda query: f"echo {query}", description="Echo.")],
+        prompt_main_agent=ChatPromptTemplate.from_messages(
+            [("user", "{input}"), MessagesPlaceholder(variable_name="agent_scratchpad")]
+        ),
+    )
+
+
+def test_agent_with_tools_reuses_cached_objects():
+    model = ToolThenAnswerChatModel()
+    graph_agent = create_graph_agent(model)
+
+    assert graph_agent.llm_with_tools is graph_agent.llm_with_tools
+    assert graph_agent.tool_executor is graph_agent.tool_executor
+    assert graph_agent.define_basic_graph() is graph_agent.define_basic_graph()
+    assert model.num_bind_tools == 1
+
+
+def test_agent_with_tools_rebuilds_on_reassignment():
+    graph_agent = create_graph_agent(ToolThenAnswerChatModel())
+    llm_with_tools, tool_executor = graph_agent.llm_with_tools, graph_agent.tool_executor
+    graph = graph_agent.define_basic_graph()
+
+    graph_agent.model = ToolThenAnswerChatModel()
+
+    assert graph_agent.llm_with_tools is not llm_with_tools
+    assert graph_agent.tool_executor is not tool_executor
+    assert graph_agent.define_basic_graph() is not graph
+
+    # the tools are stored as a tuple, so they can only be changed by reassigning them
+    assert isinstance(graph_agent.tools, tuple)
+    tool_executor = graph_agent.tool_executor
+    graph_agent.tools = [*graph_agent.tools, Tool(name="noop", func=str, description="Noop.")]
+    assert isinstance(graph_agent.tools, tuple)
+    assert graph_agent.tool_executor is not tool_executor
+
+
+@pytest.mark.asyncio
+async def test_agent_with_tools_runs_tool_loop():
+    model = ToolThenAnswerChatModel()
+    graph = create_graph_agent(model).define_basic_graph()
+
+    for _ in range(3):
+        state = await graph.ainvoke({"input": "AAPL price", "context_messages": []})
+        assert state["context_messages"][-1].content == "Answer: echo AAPL"
+    assert model.num_bind_tools == 1
@@ -0,0 +1,139 @@
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import Tool
+
+from gptstonks.multiagents.graphs import GraphAgentWithTools
+from gptstonks.multiagents.states import (
+    ContextWindowReducer,
+    count_tokens_approximately,
+    create_context_window_state,
+)
+
+
+def tool_turn(i: int, content: str = "result") -> list:
+    return [
+        AIMessage(content="", tool_calls=[{"name": "echo", "args": {}, "id": f"call_{i}"}]),
+        ToolMessage(content=content, tool_call_id=f"call_{i}"),
+    ]
+
+
+def test_context_window_reducer_truncates_tool_messages():
+    reducer = ContextWindowReducer(max_tokens=10_000, max_tool_message_tokens=50)
+
+    messages = reducer([], tool_turn(0, content="x" * 4000))
+
+    assert messages[1].content.endswith("[...truncated]")
+    assert count_tokens_approximately(messages[1:]) <= 55
+    assert messages[1].tool_call_id == "call_0"
+
+
+def test_context_window_reducer_removes_oldest_turns():
+    reducer = ContextWindowReducer(max_tokens=100, max_tool_message_tokens=None)
+    messages = []
+    for i in range(20):
+        messages = reducer(messages, tool_turn(i, content="y" * 100))
+
+    assert count_tokens_approximately(messages) <= 100
+    # the newest turn is kept and no tool message is left without its tool call
+    assert messages[-1].tool_call_id == "call_19"
+    assert isinstance(messages[0], AIMessage)
+    assert messages[0].tool_calls[0]["id"] == messages[1].tool_call_id
+
+
+def test_context_window_reducer_keeps_min_turns():
+    reducer = ContextWindowReducer(max_tokens=10, max_tool_message_tokens=None, min_turns=2)
+
+    messages = reducer(tool_turn(0, content="z" * 400), tool_turn(1, content="z" * 400))
+
+    assert len(messages) == 4
+
+
+def test_context_window_reducer_summarizes_removed_turns():
+    summarized = []
+
+    def summarize(messages):
+        summarized.append(messages)
+        return f"{len(messages)} messages"
+
+    reducer = ContextWindowReducer(
+        max_tokens=100, max_tool_message_tokens=None, summarize=summarize
+    )
+    messages = []
+    for i in range(3):
+        messages = reducer(messages, tool_turn(i, content="y" * 200))
+
+    assert messages[0].content == "Summary of the previous steps: 3 messages"
+    assert messages[0].additional_kwargs["is_context_summary"]
+    assert messages[-1].tool_call_id == "call_2"
+    # the previous summary is summarized again with the newly removed turn
+    assert summarized[-1][0].additional_kwargs["is_context_summary"]
+
+
+def test_context_window_reducer_converts_strings_to_messages():
+    def count_tokens(messages):
+        assert all(isinstance(message, BaseMessage) for message in messages)
+        return count_tokens_approximately(messages)
+
+    reducer = ContextWindowReducer(
+        max_tokens=100, max_tool_message_tokens=10, token_counter=count_tokens
+    )
+
+    messages = reducer(["AAPL price"], ["x" * 800, *tool_turn(0, content="y" * 400)])
+
+    assert all(isinstance(message, BaseMessage) for message in messages)
+    assert messages[-1].content.endswith("[...truncated]")
+    # the string entries are removed as turns, like any other message
+    assert isinstance(messages[0], AIMessage)
+    assert reducer(["AAPL price"], []) == [HumanMessage(content="AAPL price")]
+
+
+class ManyToolRoundsChatModel(BaseChatModel):
+    """Chat model that calls the `echo` tool `tool_rounds` times, recording its prompt sizes."""
+
+    tool_rounds: int = 30
+    prompt_tokens: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "many-tool-rounds"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.prompt_tokens.append(count_tokens_approximately(messages))
+        num_rounds = len(self.prompt_tokens)
+        if num_rounds > self.tool_rounds:
+            message = AIMessage(content="Final answer.")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "echo", "args": {"__arg1": "AAPL"}, "id": f"call_{num_rounds}"}
+                ],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.mark.asyncio
+async def test_context_window_state_bounds_prompt_size():
+    model = ManyToolRoundsChatModel()
+    graph = GraphAgentWithTools(
+        model=model,
+        tools=[Tool(name="echo", func=lambda query: "w" * 8000, description="Echo.")],
+        prompt_main_agent=ChatPromptTemplate.from_messages(
+            [("user", "{input}"), MessagesPlaceholder(variable_name="agent_scratchpad")]
+        ),
+        state_schema=create_context_window_state(max_tokens=1000, max_tool_message_tokens=300),
+    ).define_basic_graph()
+
+    state = await graph.ainvoke(
+        {"input": "AAPL price", "context_messages": []}, {"recursion_limit": 100}
+    )
+
+    assert state["context_messages"][-1].content == "Final answer."
+    assert len(model.prompt_tokens) == 31
+    assert max(model.prompt_tokens) <= 1100
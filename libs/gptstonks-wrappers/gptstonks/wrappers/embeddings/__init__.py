@@ -0,0 +1,6 @@
+from .batched_embedding import BatchedQueryEmbedding as BatchedQueryEmbedding
+from .batched_embedding import embed_queries as embed_queries
+from .cached_embedding import CachedQueryEmbedding as CachedQueryEmbedding
+from .onnx_embedding import OnnxEmbedding as OnnxEmbedding
+from .onnx_embedding import export_onnx_model as export_onnx_model
+from .onnx_embedding import resolve_embed_model as resolve_embed_model
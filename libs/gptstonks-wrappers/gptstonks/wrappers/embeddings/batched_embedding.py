@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+
+def embed_queries(embed_model: BaseEmbedding, queries: list[str]) -> list[Embedding]:
+    """Compute the embeddings of several queries with a single forward pass, when the embedding
+    model supports it.
+
+    Models with a `_get_query_embeddings` method (e.g., `OnnxEmbedding`) and HuggingFace embeddings
+    are computed in one batch, adding the query instruction of the model. For the rest of the
+    models, the queries are embedded one by one.
+
+    Args:
+        embed_model (`BaseEmbedding`): embedding model.
+        queries (`list[str]`): queries to embed.
+
+    Returns:
+        `list[Embedding]`: embedding of each query.
+    """
+    if hasattr(embed_model, "_get_query_embeddings"):
+        return embed_model._get_query_embeddings(queries)
+    if hasattr(embed_model, "_embed") and hasattr(embed_model, "query_instruction"):
+        try:
+            from llama_index.embeddings.huggingface.utils import format_query
+
+            return embed_model._embed(
+                [
+                    format_query(query, embed_model.model_name, embed_model.query_instruction)
+                    for query in queries
+                ]
+            )
+        except ImportError:
+            pass
+    return [embed_model._get_query_embedding(query) for query in queries]
+
+
+class BatchedQueryEmbedding(BaseEmbedding):
+    """Embedding model wrapper that groups the concurrent async query embeddings in batches.
+
+    The queries awaiting their embedding are collected for up to `max_wait` seconds, or until
+    there are `max_batch_size` of them, and embedded as a single batch in a worker thread, so the
+    forward pass of the model does not block the event loop and uses its batch efficiency. The sync
+    interface and the text embeddings are not batched.
+
+    Args:
+        embed_model (`BaseEmbedding`): embedding model that computes the embeddings.
+        max_batch_size (`int`): max. number of queries per batch.
+        max_wait (`float`): max. seconds that a query waits for more queries to fill its batch.
+        num_workers (`int`): number of worker threads computing batches.
+        batch_embed_fn (`Callable[[BaseEmbedding, list[str]], list[Embedding]] | None`):
+            function to embed a batch of queries. Defaults to `embed_queries`.
+    """
+
+    embed_model: BaseEmbedding = Field(description="Wrapped embedding model.")
+    max_batch_size: int = Field(default=32, description="Max. number of queries per batch.")
+    max_wait: float = Field(default=0.005, description="Max. seconds to wait to fill a batch.")
+    num_workers: int = Field(default=1, description="Number of worker threads.")
+
+    _batch_embed_fn: Callable[[BaseEmbedding, list[str]], list[Embedding]] = PrivateAttr()
+    _executor: ThreadPoolExecutor = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _pending: list = PrivateAttr()
+    _timer: asyncio.TimerHandle | None = PrivateAttr()
+    _num_batches: int = PrivateAttr()
+    _num_queries: int = PrivateAttr()
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        num_workers: int = 1,
+        batch_embed_fn: Callable[[BaseEmbedding, list[str]], list[Embedding]] | None = None,
+        **kwargs: Any,
+    ):
+        kwargs.setdefault("model_name", embed_model.model_name)
+        kwargs.setdefault("embed_batch_size", embed_model.embed_batch_size)
+        super().__init__(
+            embed_model=embed_model,
+            max_batch_size=max_batch_size,
+            max_wait=max_wait,
+            num_workers=num_workers,
+            **kwargs,
+        )
+        # keep the same instance, as pydantic copies the models on validation
+        self.embed_model = embed_model
+        self._batch_embed_fn = batch_embed_fn or embed_queries
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="query-embedding"
+        )
+        self._lock = threading.Lock()
+        # (query, future) waiting for the next batch
+        self._pending = []
+        self._timer = None
+        self._num_batches = 0
+        self._num_queries = 0
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "BatchedQueryEmbedding"
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Number of batches and queries embedded, and the average batch size."""
+        with self._lock:
+            return {
+                "num_batches": self._num_batches,
+                "num_queries": self._num_queries,
+                "avg_batch_size": (
+                    self._num_queries / self._num_batches if self._num_batches > 0 else 0.0
+                ),
+            }
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_batch(self, queries: list[str]) -> list[Embedding]:
+        embeddings = self._batch_embed_fn(self.embed_model, queries)
+        if len(embeddings) != len(queries):
+            raise RuntimeError(f"{len(embeddings)} embeddings computed for {len(queries)} queries")
+        return embeddings
+
+    def _flush(self):
+        """Send the pending queries to a worker thread as a batch."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if len(batch) == 0:
+                return
+            self._num_batches += 1
+            self._num_queries += len(batch)
+
+        def resolve_futures(batch_future: Future):
+            try:
+                results = [
+                    (future, embedding, None)
+                    for (_, future), embedding in zip(batch, batch_future.result())
+                ]
+            except Exception as e:
+                results = [(future, None, e) for _, future in batch]
+            for future, embedding, error in results:
+                future.get_loop().call_soon_threadsafe(
+                    _set_future_result, future, embedding, error
+                )
+
+        self._executor.submit(self._run_batch, [query for query, _ in batch]).add_done_callback(
+            resolve_futures
+        )
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self.embed_model._get_query_embedding(query)
+
+    def _get_query_embeddings(self, queries: List[str]) -> List[Embedding]:
+        """Embed several queries as one batch, in the calling thread."""
+        return self._run_batch(queries)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._pending.append((query, future))
+            is_full = len(self._pending) >= self.max_batch_size
+            if not is_full and self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+        if is_full:
+            self._flush()
+        return await future
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self.embed_model._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await self.embed_model._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self.embed_model._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self.embed_model._aget_text_embeddings(texts)
+
+
+def _set_future_result(future: asyncio.Future, result: Any, error: Exception | None):
+    if future.done():
+        # the caller was cancelled
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
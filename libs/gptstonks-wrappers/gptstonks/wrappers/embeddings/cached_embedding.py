@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+from .batched_embedding import embed_queries
+
+
+class CachedQueryEmbedding(BaseEmbedding):
+    """Embedding model wrapper with a bounded LRU cache of the query embeddings.
+
+    The queries are normalized (lowercase and collapsed whitespace) before looking them up, so
+    trivial variations of the same query share the entry. Entries are evicted when the cache is
+    full (least recently used first) or when they are older than `ttl`. The text embeddings, used
+    when indexing, are not cached.
+
+    Args:
+        embed_model (`BaseEmbedding`): embedding model that computes the embeddings.
+        max_size (`int`): max. number of cached query embeddings.
+        ttl (`float | None`): seconds to keep the query embeddings. None to keep them until evicted.
+    """
+
+    embed_model: BaseEmbedding = Field(description="Wrapped embedding model.")
+    max_size: int = Field(default=1024, description="Max. number of cached query embeddings.")
+    ttl: float | None = Field(default=None, description="Seconds to keep the query embeddings.")
+
+    _entries: OrderedDict = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _hits: int = PrivateAttr()
+    _misses: int = PrivateAttr()
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        max_size: int = 1024,
+        ttl: float | None = None,
+        **kwargs: Any,
+    ):
+        kwargs.setdefault("model_name", embed_model.model_name)
+        kwargs.setdefault("embed_batch_size", embed_model.embed_batch_size)
+        super().__init__(embed_model=embed_model, max_size=max_size, ttl=ttl, **kwargs)
+        # keep the same instance, as pydantic copies the models on validation
+        self.embed_model = embed_model
+        # normalized query -> (embedding, expiration time)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedQueryEmbedding"
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Hits, misses, hit rate and current size of the cache."""
+        with self._lock:
+            num_lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / num_lookups if num_lookups > 0 else 0.0,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        """Remove all the cached embeddings and reset the stats."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def _get_cached(self, key: str) -> Embedding | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def _put(self, key: str, embedding: Embedding):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (embedding, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        key = self.normalize_query(query)
+        embedding = self._get_cached(key)
+        if embedding is None:
+            embedding = self.embed_model._get_query_embedding(query)
+            self._put(key, embedding)
+        return embedding
+
+    def _get_query_embeddings(self, queries: List[str]) -> List[Embedding]:
+        """Embed several queries, computing the ones not cached as a single batch."""
+        keys = [self.normalize_query(query) for query in queries]
+        embeddings = [self._get_cached(key) for key in keys]
+        missing = {}
+        for query, key, embedding in zip(queries, keys, embeddings):
+            if embedding is None:
+                missing.setdefault(key, query)
+        if len(missing) > 0:
+            for key, embedding in zip(
+                missing, embed_queries(self.embed_model, list(missing.values()))
+            ):
+                missing[key] = embedding
+                self._put(key, embedding)
+        return [
+            embedding if embedding is not None else missing[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        key = self.normalize_query(query)
+        embedding = self._get_cached(key)
+        if embedding is None:
+            embedding = await self.embed_model._aget_query_embedding(query)
+            self._put(key, embedding)
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self.embed_model._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await self.embed_model._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self.embed_model._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self.embed_model._aget_text_embeddings(texts)
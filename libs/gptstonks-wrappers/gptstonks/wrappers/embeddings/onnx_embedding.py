@@ -0,0 +1,226 @@
+import asyncio
+import os
+from typing import Any, List
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.embeddings.utils import EmbedType
+from llama_index.core.embeddings.utils import (
+    resolve_embed_model as resolve_llama_index_embed_model,
+)
+
+ONNX_MODEL_FNAME = "model.onnx"
+ONNX_QUANTIZED_MODEL_FNAME = "model_quantized.onnx"
+DEFAULT_ONNX_CACHE_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "gptstonks", "onnx")
+
+
+def get_default_query_instruction(model_name: str) -> str | None:
+    """Query instruction of the model, as used by LlamaIndex's HuggingFace embeddings."""
+    if "bge-" in model_name and "-en" in model_name:
+        from llama_index.embeddings.huggingface.utils import (
+            DEFAULT_QUERY_BGE_INSTRUCTION_EN,
+        )
+
+        return DEFAULT_QUERY_BGE_INSTRUCTION_EN
+    return None
+
+
+def format_instruction(instruction: str | None, text: str) -> str:
+    """Prefix a text with its instruction, as LlamaIndex's HuggingFace embeddings do."""
+    return f"{instruction or ''} {text}".strip()
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """Export a HuggingFace model to ONNX, optionally adding a dynamically quantized int8 copy.
+
+    It requires `optimum[onnxruntime]` for the export. The export is skipped if the ONNX model
+    already exists in `output_dir`. The files are written with temporary names and renamed, so
+    other processes never load an incomplete model.
+
+    Args:
+        model_name (`str`): HuggingFace ID of the model (e.g., `BAAI/bge-base-en-v1.5`).
+        output_dir (`str`): folder to save the ONNX model and its tokenizer.
+        quantize (`bool`): whether to also save the model with int8 weights.
+
+    Returns:
+        `str`: path of the ONNX model to use.
+    """
+    model_path = os.path.join(output_dir, ONNX_MODEL_FNAME)
+    if not os.path.exists(model_path):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        tmp_dir = f"{output_dir}.{os.getpid()}.tmp"
+        ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(
+            tmp_dir
+        )
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        # the model is moved last, as its existence marks the export as finished
+        for fname in sorted(os.listdir(tmp_dir), key=lambda fname: fname == ONNX_MODEL_FNAME):
+            os.replace(os.path.join(tmp_dir, fname), os.path.join(output_dir, fname))
+        os.rmdir(tmp_dir)
+    if not quantize:
+        return model_path
+    quantized_model_path = os.path.join(output_dir, ONNX_QUANTIZED_MODEL_FNAME)
+    if not os.path.exists(quantized_model_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = f"{quantized_model_path}.{os.getpid()}.tmp"
+        quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, quantized_model_path)
+    return quantized_model_path
+
+
+class OnnxEmbedding(BaseEmbedding):
+    """Sentence embedding model run with ONNX Runtime on CPU.
+
+    The model is exported from HuggingFace the first time it is used and kept in `cache_folder`,
+    unless `model_name` is a local folder containing `model.onnx` and the tokenizer. With
+    `quantize`, the weights are dynamically quantized to int8, which is faster and lighter on CPU
+    at the cost of a small deviation from the float model (check it with
+    `projects/gptstonks_api/benchmarks/check_onnx_embeddings.py`).
+
+    Args:
+        model_name (`str`): HuggingFace ID or local folder of the model.
+        quantize (`bool`): whether to use int8 weights.
+        intra_op_num_threads (`int | None`): threads used by ONNX Runtime per operator. None for its default.
+        pooling (`str`): 'cls' (e.g., BGE models) or 'mean'.
+        normalize (`bool`): whether to L2-normalize the embeddings.
+        max_length (`int`): max. number of tokens per text.
+        query_instruction (`str | None`): prefix of the queries. By default, the one recommended for the model.
+        text_instruction (`str | None`): prefix of the texts.
+        cache_folder (`str | None`): folder to store the exported models.
+    """
+
+    quantize: bool = Field(default=True, description="Whether to use int8 weights.")
+    intra_op_num_threads: int | None = Field(
+        default=None, description="Threads used by ONNX Runtime per operator."
+    )
+    pooling: str = Field(default="cls", description="'cls' or 'mean'.")
+    normalize: bool = Field(default=True, description="Whether to normalize the embeddings.")
+    max_length: int = Field(default=512, description="Max. number of tokens per text.")
+    query_instruction: str | None = Field(default=None, description="Prefix of the queries.")
+    text_instruction: str | None = Field(default=None, description="Prefix of the texts.")
+
+    _session: Any = PrivateAttr()
+    _tokenizer: Any = PrivateAttr()
+    _input_names: set[str] = PrivateAttr()
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        intra_op_num_threads: int | None = None,
+        pooling: str = "cls",
+        normalize: bool = True,
+        max_length: int = 512,
+        query_instruction: str | None = None,
+        text_instruction: str | None = None,
+        cache_folder: str | None = None,
+        **kwargs: Any,
+    ):
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"`pooling` must be 'cls' or 'mean'. Current value: {pooling}")
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "ONNX embeddings require `onnxruntime`, `transformers` and `optimum[onnxruntime]`"
+            ) from e
+        super().__init__(
+            model_name=model_name,
+            quantize=quantize,
+            intra_op_num_threads=intra_op_num_threads,
+            pooling=pooling,
+            normalize=normalize,
+            max_length=max_length,
+            query_instruction=query_instruction or get_default_query_instruction(model_name),
+            text_instruction=text_instruction,
+            **kwargs,
+        )
+
+        if os.path.exists(os.path.join(model_name, ONNX_MODEL_FNAME)):
+            model_dir = model_name
+        else:
+            model_dir = os.path.join(
+                cache_folder or DEFAULT_ONNX_CACHE_FOLDER, model_name.replace("/", "__")
+            )
+        model_path = export_onnx_model(model_name, model_dir, quantize=quantize)
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_num_threads is not None:
+            session_options.intra_op_num_threads = intra_op_num_threads
+        self._session = ort.InferenceSession(
+            model_path, sess_options=session_options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {session_input.name for session_input in self._session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "OnnxEmbedding"
+
+    def _encode(self, sentences: list[str]) -> list[Embedding]:
+        inputs = self._tokenizer(
+            sentences,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        last_hidden_state = self._session.run(
+            None, {name: value for name, value in inputs.items() if name in self._input_names}
+        )[0]
+        if self.pooling == "cls":
+            embeddings = last_hidden_state[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(last_hidden_state.dtype)
+            embeddings = (last_hidden_state * mask).sum(axis=1) / np.maximum(
+                mask.sum(axis=1), 1e-9
+            )
+        if self.normalize:
+            embeddings = embeddings / np.maximum(
+                np.linalg.norm(embeddings, axis=-1, keepdims=True), 1e-12
+            )
+        return embeddings.tolist()
+
+    def _get_query_embeddings(self, queries: List[str]) -> List[Embedding]:
+        """Embed several queries in a single forward pass."""
+        return self._encode(
+            [format_instruction(self.query_instruction, query) for query in queries]
+        )
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._get_query_embeddings([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._encode([format_instruction(self.text_instruction, text) for text in texts])
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await asyncio.to_thread(self._get_text_embedding, text)
+
+
+def resolve_embed_model(embed_model: EmbedType | None = None, **onnx_kwargs: Any) -> BaseEmbedding:
+    """Resolve the embedding model like LlamaIndex's `resolve_embed_model`, also supporting
+    `onnx:{model_name}` for `OnnxEmbedding`.
+
+    Args:
+        embed_model (`EmbedType | None`): embedding model or its ID (e.g., `onnx:BAAI/bge-base-en-v1.5`).
+        **onnx_kwargs: arguments of `OnnxEmbedding` (e.g., `quantize` or `intra_op_num_threads`).
+
+    Returns:
+        `BaseEmbedding`: the loaded embedding model.
+    """
+    if isinstance(embed_model, str) and embed_model.startswith("onnx:"):
+        return OnnxEmbedding(model_name=embed_model.split(":", 1)[1], **onnx_kwargs)
+    return resolve_llama_index_embed_model(embed_model)
@@ -0,0 +1,2 @@
+from .incremental import update_index_from_files as update_index_from_files
+from .pipeline import ingest_files as ingest_files
@@ -0,0 +1,52 @@
+"""Build a vector store index from a folder of files in parallel, reporting the throughput.
+
+Usage:
+
+    python -m gptstonks.wrappers.ingestion ./openbb_docs ./openbb_vsi_npy \
+        --embed-model local:BAAI/bge-base-en-v1.5 --output-format vsi-npy --num-workers 8
+"""
+
+import argparse
+import json
+
+from .pipeline import OUTPUT_FORMATS, ingest_files
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("input_dir", help="Folder with the files to index (recursive).")
+    parser.add_argument("output_dir", help="Folder to persist the index.")
+    parser.add_argument("--embed-model", default="local:BAAI/bge-base-en-v1.5")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="vsi")
+    parser.add_argument(
+        "--num-workers", type=int, default=None, help="Parsing processes. Default: CPU count."
+    )
+    parser.add_argument("--embed-batch-size", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--chunk-overlap", type=int, default=None)
+    parser.add_argument(
+        "--persist-bm25", action="store_true", help="Also persist the sparse BM25 matrix."
+    )
+    parser.add_argument(
+        "--required-exts", nargs="*", default=None, help="File extensions to read (e.g., .md)."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = ingest_files(
+        args.input_dir,
+        args.output_dir,
+        embed_model=args.embed_model,
+        output_format=args.output_format,
+        num_workers=args.num_workers,
+        embed_batch_size=args.embed_batch_size,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        persist_bm25=args.persist_bm25,
+        other_llama_index_simple_directory_reader_kwargs=(
+            {"required_exts": args.required_exts} if args.required_exts else {}
+        ),
+    )
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import warnings
+from pathlib import Path
+
+from llama_index.core import (
+    Settings,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
+
+FILES_MANIFEST_FNAME = "files_manifest.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(file_path: str | Path) -> str:
+    """SHA-256 of the content of a file."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_files_manifest(persist_dir: str) -> dict | None:
+    """Load the manifest of the files indexed in `persist_dir`, or None if there is none."""
+    manifest_path = os.path.join(persist_dir, FILES_MANIFEST_FNAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def update_index_from_files(
+    input_dir: str,
+    persist_dir: str,
+    other_llama_index_simple_directory_reader_kwargs: dict = {},
+    other_llama_index_storage_context_kwargs: dict = {},
+    other_llama_index_vector_store_index_kwargs: dict = {},
+) -> tuple[VectorStoreIndex, dict[str, int]]:
+    """Create or update the vector store index persisted in `persist_dir` with the files of
+    `input_dir`, embedding only the files that changed since the last update.
+
+    A manifest with the SHA-256 of each file and the IDs of its documents is saved with the index.
+    On the next update, the documents of the removed and modified files are deleted from the index,
+    and only the new and modified files are read, chunked and embedded. The index is built from
+    scratch if there is no manifest or if it was built with a different embedding model.
+
+    Args:
+        input_dir (`str`): folder with the files to index. It is processed recursively.
+        persist_dir (`str`): folder of the persisted index and its manifest.
+        other_llama_index_simple_directory_reader_kwargs (`dict`):
+            Overrides the default values in LlamaIndex's `SimpleDirectoryReader`.
+        other_llama_index_storage_context_kwargs (`dict`):
+            Overrides the default values in LlamaIndex's `StorageContext.from_defaults`, when the
+            index is built from scratch.
+        other_llama_index_vector_store_index_kwargs (`dict`):
+            Overrides the default values in LlamaIndex's `VectorStoreIndex`.
+
+    Returns:
+        `tuple[VectorStoreIndex, dict[str, int]]`: the updated index and the number of added,
+            modified, removed and unchanged files.
+    """
+    embed_model = (
+        other_llama_index_vector_store_index_kwargs.get("embed_model") or Settings.embed_model
+    )
+    file_paths = SimpleDirectoryReader(
+        input_dir, recursive=True, **other_llama_index_simple_directory_reader_kwargs
+    ).input_files
+    file_hashes = {
+        Path(file_path).relative_to(input_dir).as_posix(): hash_file(file_path)
+        for file_path in file_paths
+    }
+
+    manifest = load_files_manifest(persist_dir)
+    if manifest is not None and manifest.get("embed_model_name") != embed_model.model_name:
+        warnings.warn(
+            f"The index in {persist_dir} was built with {manifest.get('embed_model_name')}, "
+            f"rebuilding it with {embed_model.model_name}"
+        )
+        manifest = None
+    if manifest is None:
+        index = VectorStoreIndex(
+            nodes=[],
+            storage_context=StorageContext.from_defaults(
+                **other_llama_index_storage_context_kwargs
+            ),
+            **other_llama_index_vector_store_index_kwargs,
+        )
+        indexed_files = {}
+    else:
+        index = load_index_from_storage(
+            storage_context=StorageContext.from_defaults(persist_dir=persist_dir),
+            **other_llama_index_vector_store_index_kwargs,
+        )
+        indexed_files = manifest["files"]
+
+    added = [path for path in file_hashes if path not in indexed_files]
+    modified = [
+        path
+        for path in file_hashes
+        if path in indexed_files and indexed_files[path]["hash"] != file_hashes[path]
+    ]
+    removed = [path for path in indexed_files if path not in file_hashes]
+
+    for path in modified + removed:
+        for ref_doc_id in indexed_files.pop(path)["ref_doc_ids"]:
+            index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+    for path in added + modified:
+        # files are read one by one to know the documents of each of them
+        documents = SimpleDirectoryReader(
+            input_files=[os.path.join(input_dir, path)],
+            **other_llama_index_simple_directory_reader_kwargs,
+        ).load_data()
+        for document in documents:
+            index.insert(document)
+        indexed_files[path] = {
+            "hash": file_hashes[path],
+            "ref_doc_ids": [document.doc_id for document in documents],
+        }
+
+    index.storage_context.persist(persist_dir=persist_dir)
+    # the manifest is written last, as it marks the persisted index as up to date
+    with open(os.path.join(persist_dir, FILES_MANIFEST_FNAME), "w") as f:
+        json.dump(
+            {"embed_model_name": embed_model.model_name, "files": indexed_files},
+            f,
+            indent=2,
+        )
+    stats = {
+        "added": len(added),
+        "modified": len(modified),
+        "removed": len(removed),
+        "unchanged": len(file_hashes) - len(added) - len(modified),
+    }
+    return index, stats
@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from llama_index.core import (
+    Settings,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+)
+from llama_index.core.embeddings.utils import EmbedType
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from ..embeddings.onnx_embedding import resolve_embed_model
+from ..retrievers.sparse_bm25_retriever import SparseBM25Retriever
+from ..vector_stores.numpy_vector_store import NumpyVectorStore
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+OUTPUT_FORMATS = ("vsi", "vsi-npy")
+
+
+def get_peak_memory_mb() -> dict[str, float] | None:
+    """Peak resident memory, in MB, of this process and of its finished child processes (e.g., the
+    parsing workers), or None if it cannot be measured in this platform."""
+    if resource is None:
+        return None
+    # bytes on macOS, kilobytes on Linux
+    unit = 1024**2 if sys.platform == "darwin" else 1024
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit,
+    }
+
+
+def load_and_chunk_file(
+    file_path: str,
+    other_llama_index_simple_directory_reader_kwargs: dict = {},
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> tuple[list[tuple[str, str]], list[BaseNode]]:
+    """Read a file and split its documents into nodes. It runs in the worker processes.
+
+    Returns:
+        `tuple[list[tuple[str, str]], list[BaseNode]]`: ID and hash of each document, and the nodes.
+    """
+    documents = SimpleDirectoryReader(
+        input_files=[file_path], **other_llama_index_simple_directory_reader_kwargs
+    ).load_data()
+    node_parser = SentenceSplitter(
+        chunk_size=chunk_size or Settings.chunk_size,
+        chunk_overlap=chunk_overlap if chunk_overlap is not None else Settings.chunk_overlap,
+    )
+    nodes = node_parser.get_nodes_from_documents(documents)
+    return [(document.doc_id, document.hash) for document in documents], nodes
+
+
+def ingest_files(
+    input_dir: str,
+    output_dir: str,
+    embed_model: EmbedType | None = None,
+    output_format: str = "vsi",
+    num_workers: int | None = None,
+    embed_batch_size: int = 256,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+    persist_bm25: bool = False,
+    other_llama_index_simple_directory_reader_kwargs: dict = {},
+    other_onnx_embedding_kwargs: dict = {},
+) -> dict:
+    """Build a vector store index from the files of a folder and persist it, as `AutoRag` does with
+    `files:` sources but in parallel.
+
+    The files are read and split into nodes by a pool of `num_workers` processes. The nodes are
+    streamed back to the main process, which embeds them in batches of `embed_batch_size` while
+    the workers continue parsing, and inserts them into the index. The nodes are the same as with
+    `VectorStoreIndex.from_documents`, which uses LlamaIndex's `SentenceSplitter` by default.
+
+    Args:
+        input_dir (`str`): folder with the files to index. It is processed recursively.
+        output_dir (`str`): folder where the index is persisted.
+        embed_model (`EmbedType | None`): embedding model or its ID, including `onnx:{model_name}`.
+            Defaults to LlamaIndex's `Settings.embed_model`. A copy of it with `embed_batch_size` is used,
+            so the given model is not modified.
+        output_format (`str`): 'vsi' (`vsi:` in `AutoRag`) or 'vsi-npy' (`vsi-npy:`, embeddings in NumPy format).
+        num_workers (`int | None`): number of processes to read and chunk the files. By default, the number of CPUs.
+            0 or 1 to do it in the main process.
+        embed_batch_size (`int`): number of nodes embedded per batch.
+        chunk_size (`int | None`): tokens per node. By default, LlamaIndex's `Settings.chunk_size`.
+        chunk_overlap (`int | None`): tokens shared by consecutive nodes. By default, `Settings.chunk_overlap`.
+        persist_bm25 (`bool`): whether to also persist the matrix of `SparseBM25Retriever` in `output_dir`.
+        other_llama_index_simple_directory_reader_kwargs (`dict`):
+            Overrides the default values in LlamaIndex's `SimpleDirectoryReader`. They must be picklable.
+        other_onnx_embedding_kwargs (`dict`):
+            Overrides the default values in `OnnxEmbedding`, for `onnx:` models.
+
+    Returns:
+        `dict`: throughput report with the number of files, documents and nodes, the elapsed and
+            embedding seconds, the documents and nodes per second, and the peak memory in MB.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"`output_format` must be one of {OUTPUT_FORMATS}. Current value: {output_format}"
+        )
+    start = time.perf_counter()
+    embed_model = (
+        resolve_embed_model(embed_model, **other_onnx_embedding_kwargs)
+        if embed_model is not None
+        else Settings.embed_model
+    )
+    # the model may be shared (e.g., `Settings.embed_model`), so its batch size is not changed
+    embed_model = embed_model.copy(update={"embed_batch_size": embed_batch_size})
+    file_paths = [
+        str(file_path)
+        for file_path in SimpleDirectoryReader(
+            input_dir, recursive=True, **other_llama_index_simple_directory_reader_kwargs
+        ).input_files
+    ]
+
+    index = VectorStoreIndex(nodes=[], embed_model=embed_model)
+    num_docs, num_nodes, embed_seconds = 0, 0, 0.0
+    pending_nodes: list[BaseNode] = []
+
+    def embed_and_insert(nodes: list[BaseNode]):
+        nonlocal embed_seconds
+        embed_start = time.perf_counter()
+        embeddings = embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        )
+        embed_seconds += time.perf_counter() - embed_start
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        index.insert_nodes(nodes)
+
+    for doc_hashes, nodes in _iter_chunked_files(
+        file_paths,
+        num_workers=num_workers if num_workers is not None else os.cpu_count(),
+        other_llama_index_simple_directory_reader_kwargs=other_llama_index_simple_directory_reader_kwargs,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    ):
+        for doc_id, doc_hash in doc_hashes:
+            index.docstore.set_document_hash(doc_id, doc_hash)
+        num_docs += len(doc_hashes)
+        num_nodes += len(nodes)
+        pending_nodes.extend(nodes)
+        while len(pending_nodes) >= embed_batch_size:
+            embed_and_insert(pending_nodes[:embed_batch_size])
+            pending_nodes = pending_nodes[embed_batch_size:]
+    if len(pending_nodes) > 0:
+        embed_and_insert(pending_nodes)
+
+    storage_context = index.storage_context
+    if output_format == "vsi-npy":
+        storage_context = StorageContext(
+            docstore=storage_context.docstore,
+            index_store=storage_context.index_store,
+            vector_stores={
+                "default": NumpyVectorStore.from_simple_vector_store(storage_context.vector_store)
+            },
+            graph_store=storage_context.graph_store,
+        )
+    storage_context.persist(persist_dir=output_dir)
+    if persist_bm25:
+        SparseBM25Retriever.from_defaults(index=index, persist_dir=output_dir)
+
+    seconds = time.perf_counter() - start
+    return {
+        "output": f"{output_format}:{output_dir}",
+        "num_files": len(file_paths),
+        "num_docs": num_docs,
+        "num_nodes": num_nodes,
+        "seconds": seconds,
+        "embed_seconds": embed_seconds,
+        "docs_per_second": num_docs / seconds,
+        "nodes_per_second": num_nodes / seconds,
+        "peak_memory_mb": get_peak_memory_mb(),
+    }
+
+
+def _iter_chunked_files(
+    file_paths: list[str],
+    num_workers: int,
+    **load_and_chunk_kwargs,
+) -> Iterator[tuple[list[tuple[str, str]], list[BaseNode]]]:
+    """Yield the documents and nodes of each file as soon as they are ready."""
+    if num_workers <= 1:
+        for file_path in file_paths:
+            yield load_and_chunk_file(file_path, **load_and_chunk_kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(load_and_chunk_file, file_path, **load_and_chunk_kwargs)
+            for file_path in file_paths
+        ]
+        for future in futures:
+            yield future.result()
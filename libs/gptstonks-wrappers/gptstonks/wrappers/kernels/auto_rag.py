@@ -1,3 +1,4 @@
+import asyncio
 import warnings
 from typing import List, Optional
 
@@ -11,6 +12,7 @@ from llama_index.core import (
     get_response_synthesizer,
     load_index_from_storage,
 )
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.response.schema import RESPONSE_TYPE
 from llama_index.core.indices.query.schema import QueryType
 from llama_index.core.llms import LLM
@@ -26,7 +28,14 @@ from llama_index.llms.openai import OpenAI
 from llama_index.retrievers.bm25 import BM25Retriever
 from pydantic import BaseModel
 
+from ..embeddings.batched_embedding import BatchedQueryEmbedding
+from ..embeddings.cached_embedding import CachedQueryEmbedding
+from ..embeddings.onnx_embedding import resolve_embed_model
+from ..ingestion.incremental import update_index_from_files
+from ..retrievers.batched_retrieval import retrieve_many
 from ..retrievers.hybrid_or_retriever import HybridORRetriever
+from ..retrievers.sparse_bm25_retriever import SparseBM25Retriever
+from ..vector_stores.numpy_vector_store import NumpyVectorStore
 
 
 class AutoLlamaIndex(BaseModel):
@@ -438,12 +447,16 @@ class AutoRag(BaseModel):
 
     Args:
         vsi (`str | VectorStoreIndex`):
-            There are three possibilities, depending of the starting sequence:
+            There are four possibilities, depending of the starting sequence:
             1. `files:{path_str}` (default): path to files to compute embeddings. The folder is processed recursively.
+                With `files_persist_dir`, only the files added or modified since the last run are embedded.
             2. `vsi:{path_str}`: path to a persisted vector store index.
-            3. `VectorStoreIndex`: any LlamaIndex-compatible vector store index, already loaded.
-        embedding_model_id (`str`):
-            Name of the Embedding model to use following `llama-index` convention.
+            3. `vsi-npy:{path_str}`: path to a persisted vector store index whose embeddings are stored in NumPy format
+                (see `gptstonks.wrappers.vector_stores.convert_vsi_to_npy`). They are memory-mapped when loaded.
+            4. `VectorStoreIndex`: any LlamaIndex-compatible vector store index, already loaded.
+        embedding_model_id (`str | BaseEmbedding`):
+            Name of the Embedding model to use following `llama-index` convention, or `onnx:{model_name}` to run it with
+            ONNX Runtime (see `gptstonks.wrappers.embeddings.OnnxEmbedding`). An already loaded model is also accepted.
         llm_model (`str | llama_index.llms.base.LLM`):
             It can be specified in three possible ways:
             - Name of the LLM to use. For now, only OpenAI and Hugging Face models are supported.
@@ -467,6 +480,15 @@ class AutoRag(BaseModel):
             String representation of the LlamaIndex's refine template to use.
         retriever_type (`str`):
             One of 'hybrid', 'vector' or 'bm25'. Default 'hybrid'.
+        bm25_retriever_type (`str`):
+            'rank-bm25' (LlamaIndex's `BM25Retriever`, built on every start) or 'sparse' (`SparseBM25Retriever`,
+            persisted as a sparse matrix). Default 'rank-bm25'.
+        bm25_persist_dir (`Optional[str]`):
+            Folder to persist the sparse BM25 matrix. By default, the folder of `vsi:` and `vsi-npy:` indexes.
+        files_persist_dir (`Optional[str]`):
+            Folder to persist the index of `files:` sources with a manifest of the content hashes of the files, to
+            update it incrementally on the next runs (see `gptstonks.wrappers.ingestion.update_index_from_files`).
+            None to build the index in memory from all the files.
         other_llama_index_llm_kwargs (`dict`):
             Overrides the default values in LlamaIndex's `LLM`
         other_llama_index_simple_directory_reader_kwargs (`dict`):
@@ -481,12 +503,25 @@ class AutoRag(BaseModel):
             Overrides the default values in LlamaIndex's `get_response_synthesizer`.
         other_llama_index_retriever_query_engine_kwargs (`dict`):
             Overrides the default values in LlamaIndex's `RetrieverQueryEngine`.
+        other_hybrid_or_retriever_kwargs (`dict`):
+            Overrides the default values in `HybridORRetriever` (e.g., `fusion_mode` or `similarity_top_k`).
+        query_embedding_cache_size (`int`):
+            Max. number of query embeddings cached by the vector retriever (see `CachedQueryEmbedding`). 0 disables it.
+        query_embedding_cache_ttl (`float | None`):
+            Seconds to keep the cached query embeddings. None to keep them until evicted.
+        query_embedding_batch_size (`int`):
+            Max. number of concurrent async query embeddings computed as a single batch in a worker thread
+            (see `BatchedQueryEmbedding`). 0 disables the batching.
+        query_embedding_batch_wait (`float`):
+            Max. seconds that a query embedding waits for more queries to fill its batch.
+        other_onnx_embedding_kwargs (`dict`):
+            Overrides the default values in `OnnxEmbedding` (e.g., `quantize` or `intra_op_num_threads`), for `onnx:` models.
     """
 
     def __init__(
         self,
         vsi: str | VectorStoreIndex,
-        embedding_model_id: str,
+        embedding_model_id: str | BaseEmbedding,
         llm_model: str | LLM | None = None,
         context_window: int = 1024,
         tokenizer_name: Optional[str] = None,
@@ -496,6 +531,9 @@ class AutoRag(BaseModel):
         qa_template_str: Optional[str] = None,
         refine_template_str: Optional[str] = None,
         retriever_type: str = "hybrid",
+        bm25_retriever_type: str = "rank-bm25",
+        bm25_persist_dir: Optional[str] = None,
+        files_persist_dir: Optional[str] = None,
         other_llama_index_llm_kwargs: dict = {},
         other_llama_index_simple_directory_reader_kwargs: dict = {},
         other_llama_index_storage_context_kwargs: dict = {},
@@ -504,6 +542,12 @@ class AutoRag(BaseModel):
         other_llama_index_bm25_retriever_kwargs: dict = {},
         other_llama_index_response_synthesizer_kwargs: dict = {},
         other_llama_index_retriever_query_engine_kwargs: dict = {},
+        other_hybrid_or_retriever_kwargs: dict = {},
+        query_embedding_cache_size: int = 0,
+        query_embedding_cache_ttl: float | None = None,
+        query_embedding_batch_size: int = 0,
+        query_embedding_batch_wait: float = 0.005,
+        other_onnx_embedding_kwargs: dict = {},
     ):
         """Init method."""
         super().__init__()
@@ -524,32 +568,64 @@ class AutoRag(BaseModel):
             self._llm = None
 
         # global default
-        Settings.embed_model = embedding_model_id
+        Settings.embed_model = resolve_embed_model(
+            embedding_model_id, **other_onnx_embedding_kwargs
+        )
 
         # create index
         self._set_index_from_vsi(
             vsi=vsi,
+            files_persist_dir=files_persist_dir,
             other_llama_index_simple_directory_reader_kwargs=other_llama_index_simple_directory_reader_kwargs,
             other_llama_index_storage_context_kwargs=other_llama_index_storage_context_kwargs,
             other_llama_index_vector_store_index_kwargs=other_llama_index_vector_store_index_kwargs,
         )
 
+        # batch and cache the query embeddings of the vector retriever
+        query_embed_model = other_llama_index_vector_index_retriever_kwargs.get(
+            "embed_model", self._index._embed_model
+        )
+        self._batched_query_embed_model = None
+        self._cached_query_embed_model = None
+        if query_embedding_batch_size > 0:
+            self._batched_query_embed_model = query_embed_model = BatchedQueryEmbedding(
+                embed_model=query_embed_model,
+                max_batch_size=query_embedding_batch_size,
+                max_wait=query_embedding_batch_wait,
+            )
+        if query_embedding_cache_size > 0:
+            self._cached_query_embed_model = query_embed_model = CachedQueryEmbedding(
+                embed_model=query_embed_model,
+                max_size=query_embedding_cache_size,
+                ttl=query_embedding_cache_ttl,
+            )
+        other_llama_index_vector_index_retriever_kwargs = {
+            **other_llama_index_vector_index_retriever_kwargs,
+            "embed_model": query_embed_model,
+        }
+
         # configure retriever
         if retriever_type == "hybrid":
             vector_retriever = VectorIndexRetriever(
                 index=self._index, **other_llama_index_vector_index_retriever_kwargs
             )
-            bm25_retriever = BM25Retriever.from_defaults(
-                index=self._index, **other_llama_index_bm25_retriever_kwargs
+            bm25_retriever = self._create_bm25_retriever(
+                bm25_retriever_type=bm25_retriever_type,
+                bm25_persist_dir=bm25_persist_dir,
+                other_llama_index_bm25_retriever_kwargs=other_llama_index_bm25_retriever_kwargs,
+            )
+            self._retriever = HybridORRetriever(
+                vector_retriever, bm25_retriever, **other_hybrid_or_retriever_kwargs
             )
-            self._retriever = HybridORRetriever(vector_retriever, bm25_retriever)
         elif retriever_type == "vector":
             self._retriever = VectorIndexRetriever(
                 index=self._index, **other_llama_index_vector_index_retriever_kwargs
             )
         elif retriever_type == "bm25":
-            self._retriever = BM25Retriever.from_defaults(
-                index=self._index, **other_llama_index_bm25_retriever_kwargs
+            self._retriever = self._create_bm25_retriever(
+                bm25_retriever_type=bm25_retriever_type,
+                bm25_persist_dir=bm25_persist_dir,
+                other_llama_index_bm25_retriever_kwargs=other_llama_index_bm25_retriever_kwargs,
             )
         else:
             raise ValueError(
@@ -570,10 +646,17 @@ class AutoRag(BaseModel):
             **other_llama_index_response_synthesizer_kwargs,
         )
 
-        # assemble query engine
+        # assemble query engine, keeping its postprocessors for `aquery_many`
+        other_llama_index_retriever_query_engine_kwargs = {
+            **other_llama_index_retriever_query_engine_kwargs
+        }
+        self._node_postprocessors = (
+            other_llama_index_retriever_query_engine_kwargs.pop("node_postprocessors", None) or []
+        )
         self._query_engine = RetrieverQueryEngine(
             retriever=self._retriever,
             response_synthesizer=self._response_synthesizer,
+            node_postprocessors=self._node_postprocessors,
             **other_llama_index_retriever_query_engine_kwargs,
         )
 
@@ -589,13 +672,58 @@ class AutoRag(BaseModel):
     def llm(self) -> LLM | None:
         return self._llm
 
+    @property
+    def query_embedding_cache_stats(self) -> dict[str, float] | None:
+        """Hits, misses, hit rate and size of the query embedding cache, or None if disabled."""
+        if self._cached_query_embed_model is None:
+            return None
+        return self._cached_query_embed_model.stats
+
+    @property
+    def query_embedding_batch_stats(self) -> dict[str, float] | None:
+        """Number of batches, queries and average batch size of the query embeddings, or None if
+        the batching is disabled."""
+        if self._batched_query_embed_model is None:
+            return None
+        return self._batched_query_embed_model.stats
+
+    @property
+    def files_update_stats(self) -> dict[str, int] | None:
+        """Number of added, modified, removed and unchanged files in the last incremental update of
+        the index, or None if it was not built incrementally."""
+        return self._files_update_stats
+
+    def _create_bm25_retriever(
+        self,
+        bm25_retriever_type: str = "rank-bm25",
+        bm25_persist_dir: Optional[str] = None,
+        other_llama_index_bm25_retriever_kwargs: dict = {},
+    ) -> BM25Retriever | SparseBM25Retriever:
+        if bm25_retriever_type == "rank-bm25":
+            return BM25Retriever.from_defaults(
+                index=self._index, **other_llama_index_bm25_retriever_kwargs
+            )
+        elif bm25_retriever_type == "sparse":
+            return SparseBM25Retriever.from_defaults(
+                index=self._index,
+                persist_dir=bm25_persist_dir or self._persist_dir,
+                **other_llama_index_bm25_retriever_kwargs,
+            )
+        raise ValueError(
+            f"`bm25_retriever_type` must be 'rank-bm25' or 'sparse'. Current value: {bm25_retriever_type}"
+        )
+
     def _set_index_from_vsi(
         self,
         vsi: str | VectorStoreIndex,
+        files_persist_dir: Optional[str] = None,
         other_llama_index_simple_directory_reader_kwargs: dict = {},
         other_llama_index_storage_context_kwargs: dict = {},
         other_llama_index_vector_store_index_kwargs: dict = {},
     ):
+        # folder of the persisted index, if any
+        self._persist_dir = None
+        self._files_update_stats = None
         if isinstance(vsi, VectorStoreIndex):
             # storage context to customize
             self._storage_context = StorageContext.from_defaults(
@@ -611,7 +739,18 @@ class AutoRag(BaseModel):
             path_type = "files"
             path_str = vsi
 
-        if path_type == "files":
+        if path_type == "files" and files_persist_dir is not None:
+            # index updated with the files modified since the last run
+            self._persist_dir = files_persist_dir
+            self._index, self._files_update_stats = update_index_from_files(
+                path_str,
+                persist_dir=files_persist_dir,
+                other_llama_index_simple_directory_reader_kwargs=other_llama_index_simple_directory_reader_kwargs,
+                other_llama_index_storage_context_kwargs=other_llama_index_storage_context_kwargs,
+                other_llama_index_vector_store_index_kwargs=other_llama_index_vector_store_index_kwargs,
+            )
+            self._storage_context = self._index.storage_context
+        elif path_type == "files":
             # index loaded from files in a folder
             docs_sdk = SimpleDirectoryReader(
                 path_str, recursive=True, **other_llama_index_simple_directory_reader_kwargs
@@ -630,8 +769,17 @@ class AutoRag(BaseModel):
             )
         elif path_type == "vsi":
             # index loaded from a persisted index
+            self._persist_dir = path_str
+            self._storage_context = StorageContext.from_defaults(
+                persist_dir=path_str,
+            )
+            self._index = load_index_from_storage(storage_context=self._storage_context)
+        elif path_type == "vsi-npy":
+            # index loaded from a persisted index with NumPy embeddings
+            self._persist_dir = path_str
             self._storage_context = StorageContext.from_defaults(
                 persist_dir=path_str,
+                vector_store=NumpyVectorStore.from_persist_dir(path_str),
             )
             self._index = load_index_from_storage(storage_context=self._storage_context)
         else:
@@ -728,6 +876,70 @@ class AutoRag(BaseModel):
 
         return await self._retriever.aretrieve(str_or_query_bundle)
 
+    def retrieve_many(self, queries: List[QueryType]) -> List[List[NodeWithScore]]:
+        """Obtains the closest nodes to several queries at once, e.g., for offline evaluations.
+
+        The queries are embedded as a single batch, and they are scored together against `vsi-npy:` indexes and the
+        sparse BM25 matrix with one matrix product each (see `gptstonks.wrappers.retrievers.retrieve_many`).
+
+        Args:
+            queries (`List[llama_index.indices.query.schema.QueryType]`):
+                Strings or query bundles to get most similar stored nodes.
+
+        Returns:
+            `List[List[llama_index.schema.NodeWithScore]]`: most similar nodes of each query and their similarity score.
+        """
+
+        return retrieve_many(self._retriever, queries)
+
+    async def aretrieve_many(self, queries: List[QueryType]) -> List[List[NodeWithScore]]:
+        """Async interface of `retrieve_many`. The CPU-bound retrieval runs in a thread to avoid
+        blocking the event loop.
+
+        Args:
+            queries (`List[llama_index.indices.query.schema.QueryType]`):
+                Strings or query bundles to get most similar stored nodes.
+
+        Returns:
+            `List[List[llama_index.schema.NodeWithScore]]`: most similar nodes of each query and their similarity score.
+        """
+
+        return await asyncio.to_thread(self.retrieve_many, queries)
+
+    async def aquery_many(
+        self, queries: List[QueryType], max_concurrency: int = 8
+    ) -> List[RESPONSE_TYPE]:
+        """Answers several queries, retrieving their nodes with `aretrieve_many` and running up to
+        `max_concurrency` synthesis calls to the LLM at the same time.
+
+        Args:
+            queries (`List[llama_index.indices.query.schema.QueryType]`):
+                Strings or query bundles with the queries to run.
+            max_concurrency (`int`): max. number of concurrent synthesis calls.
+
+        Returns:
+            `List[llama_index.response.schema.RESPONSE_TYPE]`: response from the LLM to each query, in order.
+        """
+
+        query_bundles = [
+            query if isinstance(query, QueryBundle) else QueryBundle(query) for query in queries
+        ]
+        nodes_per_query = await self.aretrieve_many(query_bundles)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def synthesize(query_bundle: QueryBundle, nodes: List[NodeWithScore]):
+            async with semaphore:
+                for node_postprocessor in self._node_postprocessors:
+                    nodes = node_postprocessor.postprocess_nodes(nodes, query_bundle=query_bundle)
+                return await self._query_engine.asynthesize(query_bundle, nodes)
+
+        return await asyncio.gather(
+            *(
+                synthesize(query_bundle, nodes)
+                for query_bundle, nodes in zip(query_bundles, nodes_per_query)
+            )
+        )
+
     def query_with_model(
         self,
         str_or_query_bundle: QueryType,
@@ -1 +1,3 @@
 from .chat_model_llm_iface import ChatModelWithLLMIface
+from .llamacpp_pool import LlamaCppPool
+from .scheduled_llm import LLMQueueFullError, ScheduledLLM
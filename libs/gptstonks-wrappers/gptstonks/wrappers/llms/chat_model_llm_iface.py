@@ -1,17 +1,36 @@
-from typing import Any
+import asyncio
+from typing import Any, AsyncIterator, Iterator
 
 from langchain.llms import BaseLLM
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.outputs import Generation, LLMResult
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatResult, Generation, GenerationChunk, LLMResult
 
 
 class ChatModelWithLLMIface(BaseLLM):
-    """Wrapper model to transform the ChatModel interface to a LLM interface."""
+    """Wrapper model to transform the ChatModel interface to a LLM interface.
+
+    In async mode, the prompts are generated concurrently with the async API of the chat model, up
+    to `max_concurrency` at the same time. Streaming uses the streaming API of the chat model, or
+    returns the whole generation as a single chunk (and new token) if the chat model does not
+    support it.
+    """
 
     chat_model: BaseChatModel
     system_message: str = "You write concise and complete answers."
+    max_concurrency: int | None = 8
+    """Maximum number of prompts generated concurrently in async mode, or None for no limit."""
+
+    def _to_messages(self, prompt: str) -> list[BaseMessage]:
+        return [SystemMessage(content=self.system_message), HumanMessage(content=prompt)]
+
+    @staticmethod
+    def _to_generations(chat_result: ChatResult) -> list[Generation]:
+        return [Generation(text=chat_gen.text) for chat_gen in chat_result.generations]
 
     def _generate(
         self,
@@ -23,14 +42,87 @@ class ChatModelWithLLMIface(BaseLLM):
         """Run the LLM on the given prompts."""
         outputs = []
         for prompt in prompts:
-            messages = [SystemMessage(content=self.system_message), HumanMessage(content=prompt)]
+            chat_result = self.chat_model._generate(
+                messages=self._to_messages(prompt), stop=stop, run_manager=run_manager, **kwargs
+            )
+            outputs.append(self._to_generations(chat_result))
+        return LLMResult(generations=outputs)
+
+    async def _agenerate(
+        self,
+        prompts: list[str],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Run the LLM on the given prompts concurrently, up to `max_concurrency` at a time."""
+        semaphore = asyncio.Semaphore(self.max_concurrency or len(prompts) or 1)
+
+        async def agenerate_prompt(prompt: str) -> list[Generation]:
+            async with semaphore:
+                chat_result = await self.chat_model._agenerate(
+                    messages=self._to_messages(prompt),
+                    stop=stop,
+                    run_manager=run_manager,
+                    **kwargs,
+                )
+            return self._to_generations(chat_result)
+
+        outputs = await asyncio.gather(*(agenerate_prompt(prompt) for prompt in prompts))
+        return LLMResult(generations=list(outputs))
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        """Stream the LLM on the given prompt."""
+        messages = self._to_messages(prompt)
+        if type(self.chat_model)._stream is BaseChatModel._stream:
+            # no streaming support in the chat model
             chat_result = self.chat_model._generate(
                 messages=messages, stop=stop, run_manager=run_manager, **kwargs
             )
-            outputs.append(
-                [Generation(text=chat_gen.text) for chat_gen in chat_result.generations]
+            chunk = GenerationChunk(text=chat_result.generations[0].text)
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+        # the chat model reports the new tokens to the run manager
+        for chunk in self.chat_model._stream(
+            messages=messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield GenerationChunk(text=chunk.text, generation_info=chunk.generation_info)
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        """Stream the LLM on the given prompt, with the async API of the chat model."""
+        messages = self._to_messages(prompt)
+        if (
+            type(self.chat_model)._astream is BaseChatModel._astream
+            and type(self.chat_model)._stream is BaseChatModel._stream
+        ):
+            # no streaming support in the chat model
+            chat_result = await self.chat_model._agenerate(
+                messages=messages, stop=stop, run_manager=run_manager, **kwargs
             )
-        return LLMResult(generations=outputs)
+            chunk = GenerationChunk(text=chat_result.generations[0].text)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+        # the chat model reports the new tokens to the run manager
+        async for chunk in self.chat_model._astream(
+            messages=messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield GenerationChunk(text=chunk.text, generation_info=chunk.generation_info)
 
     def _llm_type(self) -> str:
         """Return type of chat model."""
@@ -0,0 +1,201 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Type
+
+from langchain.llms import BaseLLM
+from langchain_community.llms import LlamaCpp
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.outputs import Generation, LLMResult
+from langchain_core.pydantic_v1 import PrivateAttr
+
+from .scheduled_llm import LLMQueueFullError
+
+# LLM of the worker process, created once by `_init_worker`
+_worker_llm: BaseLLM | None = None
+
+
+def _init_worker(llm_cls: Type[BaseLLM], llm_kwargs: dict):
+    global _worker_llm
+    _worker_llm = llm_cls(**llm_kwargs)
+
+
+def _generate_in_worker(
+    prompt: str, stop: list[str] | None, kwargs: dict
+) -> tuple[str, int, float]:
+    """Generate a prompt in the worker process.
+
+    Returns:
+        `tuple[str, int, float]`: generated text, its number of tokens and the generation seconds.
+    """
+    start = time.perf_counter()
+    text = _worker_llm._call(prompt, stop=stop, **kwargs)
+    seconds = time.perf_counter() - start
+    return text, _worker_llm.get_num_tokens(text), seconds
+
+
+class LlamaCppPool(BaseLLM):
+    """Pool of Llama.cpp replicas of the same model, each in its own process.
+
+    A `LlamaCpp` object decodes one sequence at a time, so `num_workers` processes are started,
+    each one with its own context and KV cache and `n_threads` threads. The GGUF weights are
+    memory-mapped (`use_mmap=True`), so the replicas share the same pages of the OS page cache
+    instead of loading one copy of the model each. Every prompt is sent to the replica with the
+    fewest prompts in progress, and new prompts are rejected with `LLMQueueFullError` when
+    `max_queue_size` prompts are waiting for a free replica. If the process of a replica dies
+    (e.g., killed by the OOM killer), its prompts fail with `BrokenProcessPool` and the replica is
+    started again.
+
+    The processes are started on the first call, or with `start`. The callbacks of each call
+    receive the start and end events, but not the new tokens.
+    """
+
+    model_path: str
+    num_workers: int = 2
+    """Number of replicas (processes)."""
+    n_threads: int | None = None
+    """Threads per replica, by default the CPUs split evenly among the replicas."""
+    max_queue_size: int = 64
+    """Maximum number of prompts waiting for a free replica."""
+    llama_cpp_kwargs: dict = {}
+    """Overrides the default values in LangChain's `LlamaCpp` (e.g., `temperature` or `n_ctx`)."""
+    llm_cls: Type[BaseLLM] = LlamaCpp
+    """LLM class created in each worker process."""
+
+    _executors: list[ProcessPoolExecutor] = PrivateAttr()
+    _llm_kwargs: dict = PrivateAttr()
+    _in_flight: list[int] = PrivateAttr()
+    _num_requests: list[int] = PrivateAttr()
+    _generated_tokens: list[int] = PrivateAttr()
+    _busy_seconds: list[float] = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._executors = []
+        self._in_flight = [0] * self.num_workers
+        self._num_requests = [0] * self.num_workers
+        self._generated_tokens = [0] * self.num_workers
+        self._busy_seconds = [0.0] * self.num_workers
+        self._lock = threading.Lock()
+        self._llm_kwargs = {
+            "model_path": self.model_path,
+            "n_threads": self.n_threads or max((os.cpu_count() or 1) // self.num_workers, 1),
+            "use_mmap": True,
+            **self.llama_cpp_kwargs,
+        }
+
+    @property
+    def stats(self) -> dict[str, int | float | list[int]]:
+        """Queue depth, prompts in progress and generated by each replica, generated tokens and
+        tokens per second of the whole pool while generating."""
+        with self._lock:
+            return {
+                "queue_depth": sum(max(in_flight - 1, 0) for in_flight in self._in_flight),
+                "in_flight": list(self._in_flight),
+                "requests": list(self._num_requests),
+                "generated_tokens": sum(self._generated_tokens),
+                "tokens_per_second": sum(
+                    tokens / seconds
+                    for tokens, seconds in zip(self._generated_tokens, self._busy_seconds)
+                    if seconds > 0
+                ),
+            }
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            # llama.cpp threads are not fork-safe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.llm_cls, self._llm_kwargs),
+        )
+
+    def _restart_replica(self, worker_idx: int, executor: ProcessPoolExecutor):
+        """Replace the executor of a replica whose process died, with the lock held."""
+        # another prompt of the same replica may have restarted it already
+        if len(self._executors) > 0 and self._executors[worker_idx] is executor:
+            executor.shutdown(wait=False)
+            self._executors[worker_idx] = self._create_executor()
+
+    def start(self):
+        """Start the worker processes and load the model in each of them."""
+        with self._lock:
+            if len(self._executors) > 0:
+                return
+            self._executors = [self._create_executor() for _ in range(self.num_workers)]
+
+    def shutdown(self):
+        """Stop the worker processes after the submitted prompts are generated."""
+        with self._lock:
+            executors, self._executors = self._executors, []
+        for executor in executors:
+            executor.shutdown()
+
+    def _submit(self, prompt: str, stop: list[str] | None, kwargs: dict) -> Future:
+        self.start()
+        with self._lock:
+            if sum(max(in_flight - 1, 0) for in_flight in self._in_flight) >= self.max_queue_size:
+                raise LLMQueueFullError(f"{self.max_queue_size} prompts are already waiting")
+            # least-loaded dispatch
+            worker_idx = min(range(self.num_workers), key=self._in_flight.__getitem__)
+            executor = self._executors[worker_idx]
+            try:
+                future = executor.submit(_generate_in_worker, prompt, stop, kwargs)
+            except BrokenProcessPool:
+                # the process died while idle
+                self._restart_replica(worker_idx, executor)
+                executor = self._executors[worker_idx]
+                future = executor.submit(_generate_in_worker, prompt, stop, kwargs)
+            self._in_flight[worker_idx] += 1
+
+        def on_done(future: Future):
+            with self._lock:
+                self._in_flight[worker_idx] -= 1
+                if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                    # the process died while generating
+                    self._restart_replica(worker_idx, executor)
+                elif not future.cancelled() and future.exception() is None:
+                    _, num_tokens, seconds = future.result()
+                    self._num_requests[worker_idx] += 1
+                    self._generated_tokens[worker_idx] += num_tokens
+                    self._busy_seconds[worker_idx] += seconds
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _generate(
+        self,
+        prompts: list[str],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Generate the prompts in parallel in the replicas."""
+        futures = [self._submit(prompt, stop, kwargs) for prompt in prompts]
+        return LLMResult(generations=[[Generation(text=future.result()[0])] for future in futures])
+
+    async def _agenerate(
+        self,
+        prompts: list[str],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Generate the prompts in parallel in the replicas, without blocking the event loop."""
+        outputs = await asyncio.gather(
+            *(asyncio.wrap_future(self._submit(prompt, stop, kwargs)) for prompt in prompts)
+        )
+        return LLMResult(generations=[[Generation(text=text)] for text, _, _ in outputs])
+
+    @property
+    def _llm_type(self) -> str:
+        """Return type of llm."""
+        return "llamacpp-pool"
@@ -0,0 +1,278 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from langchain.llms import BaseLLM
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.outputs import LLMResult
+from langchain_core.pydantic_v1 import PrivateAttr
+
+
+class LLMQueueFullError(RuntimeError):
+    """Raised when a `ScheduledLLM` has `max_queue_size` prompts waiting."""
+
+
+class _Request:
+    """Prompt waiting in the queue of a `ScheduledLLM`."""
+
+    def __init__(self, prompt: str, stop: list[str] | None, kwargs: dict):
+        self.prompt = prompt
+        self.stop = stop
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+    def is_batchable_with(self, other: "_Request") -> bool:
+        return self.stop == other.stop and self.kwargs == other.kwargs
+
+
+class ScheduledLLM(BaseLLM):
+    """Wrapper that queues the prompts of a local LLM (e.g., `LlamaCpp` or `HuggingFacePipeline`)
+    and runs them from a single worker thread.
+
+    The prompts of concurrent calls are collected for up to `max_wait` seconds, or until there are
+    `max_batch_size` of them, and generated with a single call to the wrapped LLM, which batches
+    them if it supports it (e.g., `HuggingFacePipeline`). Only prompts with the same stop words
+    and arguments are batched together. New prompts are rejected with `LLMQueueFullError` when
+    `max_queue_size` prompts are waiting, and prompts that waited more than `queue_timeout`
+    seconds fail with `TimeoutError` instead of being generated. Calls that wait more than
+    `timeout` seconds in total (e.g., if the wrapped LLM hangs) also fail with `TimeoutError`.
+
+    The async API does not block a thread while the prompts wait. The callbacks of each call
+    receive the start and end events, but not the new tokens.
+    """
+
+    llm: BaseLLM
+    max_queue_size: int = 64
+    """Maximum number of prompts waiting to be generated."""
+    max_batch_size: int = 1
+    """Maximum number of prompts generated with a single call to `llm`."""
+    max_wait: float = 0.01
+    """Maximum seconds that a prompt waits for more prompts to fill its batch."""
+    queue_timeout: float | None = None
+    """Maximum seconds that a prompt waits in the queue, or None for no limit."""
+    timeout: float | None = 600.0
+    """Maximum seconds that a call waits for its generations (queue included), or None."""
+    token_counter: Callable[[str], int] | None = None
+    """Function to count the generated tokens.
+
+    Defaults to the tokenizer of `llm.pipeline` (e.g., `HuggingFacePipeline`) or
+    `llm.get_num_tokens`.
+    """
+
+    _queue: queue.Queue = PrivateAttr()
+    _carry: list[_Request] = PrivateAttr()
+    _worker: threading.Thread | None = PrivateAttr()
+    _stopping: bool = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _stats_lock: threading.Lock = PrivateAttr()
+    _num_requests: int = PrivateAttr()
+    _num_batches: int = PrivateAttr()
+    _num_rejected: int = PrivateAttr()
+    _num_timed_out: int = PrivateAttr()
+    _generated_tokens: int = PrivateAttr()
+    _busy_seconds: float = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        # requests dequeued but not batchable with the previous batch
+        self._carry = []
+        self._worker = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        # not `_lock`, as `shutdown` holds it while the worker finishes the queued prompts
+        self._stats_lock = threading.Lock()
+        self._num_requests = 0
+        self._num_batches = 0
+        self._num_rejected = 0
+        self._num_timed_out = 0
+        self._generated_tokens = 0
+        self._busy_seconds = 0.0
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """Queue depth, number of requests, batches and rejections, average batch size, generated
+        tokens and tokens per second while generating."""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize() + len(self._carry),
+                "requests": self._num_requests,
+                "batches": self._num_batches,
+                "avg_batch_size": (
+                    self._num_requests / self._num_batches if self._num_batches > 0 else 0.0
+                ),
+                "rejected": self._num_rejected,
+                "timed_out": self._num_timed_out,
+                "generated_tokens": self._generated_tokens,
+                "tokens_per_second": (
+                    self._generated_tokens / self._busy_seconds if self._busy_seconds > 0 else 0.0
+                ),
+            }
+
+    def _submit(self, prompt: str, stop: list[str] | None, kwargs: dict) -> Future:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, daemon=True)
+                self._worker.start()
+        request = _Request(prompt, stop, kwargs)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            with self._stats_lock:
+                self._num_rejected += 1
+            raise LLMQueueFullError(f"{self.max_queue_size} prompts are already waiting")
+        return request.future
+
+    def _next_batch(self) -> list[_Request] | None:
+        """Wait for a request and collect the ones that can be batched with it."""
+        first = self._carry.pop(0) if len(self._carry) > 0 else self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        carry = []
+        for request in self._carry:
+            if len(batch) < self.max_batch_size and request.is_batchable_with(first):
+                batch.append(request)
+            else:
+                carry.append(request)
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if request is None:
+                # `shutdown` was called, the worker stops once the queue is empty
+                self._stopping = True
+                break
+            if request.is_batchable_with(first):
+                batch.append(request)
+            else:
+                carry.append(request)
+        self._carry = carry
+        return batch
+
+    def _run_worker(self):
+        while not self._stopping or not self._queue.empty() or len(self._carry) > 0:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            now = time.monotonic()
+            if self.queue_timeout is not None:
+                for request in batch:
+                    if (
+                        now - request.enqueued_at > self.queue_timeout
+                        and not request.future.done()
+                    ):
+                        with self._stats_lock:
+                            self._num_timed_out += 1
+                        request.future.set_exception(
+                            TimeoutError(f"Prompt waited more than {self.queue_timeout} seconds")
+                        )
+                batch = [request for request in batch if not request.future.done()]
+                if len(batch) == 0:
+                    continue
+            # the prompts of cancelled calls are not generated
+            batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+            if len(batch) == 0:
+                continue
+            start = time.perf_counter()
+            try:
+                try:
+                    result = self.llm._generate(
+                        [request.prompt for request in batch],
+                        stop=batch[0].stop,
+                        **batch[0].kwargs,
+                    )
+                finally:
+                    with self._stats_lock:
+                        self._busy_seconds += time.perf_counter() - start
+                if len(result.generations) != len(batch):
+                    raise ValueError(
+                        f"`llm` returned {len(result.generations)} generations for"
+                        f" {len(batch)} prompts"
+                    )
+                generated_tokens = sum(
+                    self._count_tokens(generation.text)
+                    for generations in result.generations
+                    for generation in generations
+                )
+                with self._stats_lock:
+                    self._num_batches += 1
+                    self._num_requests += len(batch)
+                    self._generated_tokens += generated_tokens
+                for request, generations in zip(batch, result.generations):
+                    request.future.set_result(generations)
+            except Exception as e:
+                # the worker keeps running, so no call waits for a batch that failed
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _count_tokens(self, text: str) -> int:
+        if self.token_counter is not None:
+            return self.token_counter(text)
+        tokenizer = getattr(getattr(self.llm, "pipeline", None), "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+        return self.llm.get_num_tokens(text)
+
+    def _timeout_error(self) -> TimeoutError:
+        with self._stats_lock:
+            self._num_timed_out += 1
+        return TimeoutError(f"The generations took more than {self.timeout} seconds")
+
+    def shutdown(self):
+        """Stop the worker thread after the queued prompts are generated."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+                self._worker.join()
+            self._worker = None
+            self._stopping = False
+
+    def _generate(
+        self,
+        prompts: list[str],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Queue the prompts and wait for their generations."""
+        futures = [self._submit(prompt, stop, kwargs) for prompt in prompts]
+        _, not_done = concurrent.futures.wait(futures, timeout=self.timeout)
+        if len(not_done) > 0:
+            for future in not_done:
+                # the prompts still in the queue are not generated
+                future.cancel()
+            raise self._timeout_error()
+        return LLMResult(generations=[future.result() for future in futures])
+
+    async def _agenerate(
+        self,
+        prompts: list[str],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Queue the prompts and await their generations."""
+        futures = [asyncio.wrap_future(self._submit(prompt, stop, kwargs)) for prompt in prompts]
+        try:
+            # on timeout, the futures are cancelled and their prompts not generated if still queued
+            generations = await asyncio.wait_for(asyncio.gather(*futures), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timeout_error() from None
+        return LLMResult(generations=list(generations))
+
+    @property
+    def _llm_type(self) -> str:
+        """Return type of the wrapped LLM."""
+        return self.llm._llm_type
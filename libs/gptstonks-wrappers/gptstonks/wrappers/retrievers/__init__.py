@@ -0,0 +1,3 @@
+from .batched_retrieval import retrieve_many as retrieve_many
+from .hybrid_or_retriever import HybridORRetriever as HybridORRetriever
+from .sparse_bm25_retriever import SparseBM25Retriever as SparseBM25Retriever
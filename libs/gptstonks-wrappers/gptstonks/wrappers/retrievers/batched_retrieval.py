@@ -0,0 +1,77 @@
+from typing import List
+
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.indices.query.schema import QueryType
+from llama_index.core.retrievers import VectorIndexRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from ..embeddings.batched_embedding import embed_queries
+
+
+def retrieve_many(retriever: BaseRetriever, queries: List[QueryType]) -> List[List[NodeWithScore]]:
+    """Retrieve the nodes of several queries, batching the work when the retriever supports it.
+
+    - Retrievers with a `retrieve_many` method (e.g., `SparseBM25Retriever` or `HybridORRetriever`)
+        use it.
+    - `VectorIndexRetriever` embeds all the queries in one batch (see `embed_queries`) and, if its
+        vector store has a `query_many` method (e.g., `NumpyVectorStore`), scores all of them with a
+        single matrix product.
+    - The rest of the retrievers are called once per query.
+
+    Args:
+        retriever (`BaseRetriever`): retriever to use.
+        queries (`List[QueryType]`): strings or query bundles.
+
+    Returns:
+        `List[List[NodeWithScore]]`: retrieved nodes of each query.
+    """
+    if hasattr(retriever, "retrieve_many"):
+        return retriever.retrieve_many(queries)
+    if (
+        not isinstance(retriever, VectorIndexRetriever)
+        or not retriever._vector_store.is_embedding_query
+    ):
+        return [retriever.retrieve(query) for query in queries]
+
+    query_bundles = [
+        query if isinstance(query, QueryBundle) else QueryBundle(query) for query in queries
+    ]
+    missing_idxs = [
+        i for i, query_bundle in enumerate(query_bundles) if query_bundle.embedding is None
+    ]
+    single_str_idxs = [i for i in missing_idxs if len(query_bundles[i].embedding_strs) == 1]
+    embeddings = {}
+    if len(single_str_idxs) > 0:
+        embeddings = dict(
+            zip(
+                single_str_idxs,
+                embed_queries(
+                    retriever._embed_model,
+                    [query_bundles[i].embedding_strs[0] for i in single_str_idxs],
+                ),
+            )
+        )
+    for i in missing_idxs:
+        embedding = embeddings.get(i)
+        if embedding is None:
+            # several embedding strings are aggregated, as in `VectorIndexRetriever`
+            embedding = retriever._embed_model.get_agg_embedding_from_queries(
+                query_bundles[i].embedding_strs
+            )
+        query_bundles[i] = QueryBundle(
+            query_bundles[i].query_str,
+            custom_embedding_strs=query_bundles[i].custom_embedding_strs,
+            embedding=embedding,
+        )
+    if not hasattr(retriever._vector_store, "query_many"):
+        return [retriever.retrieve(query_bundle) for query_bundle in query_bundles]
+
+    vector_store_queries = [
+        retriever._build_vector_store_query(query_bundle) for query_bundle in query_bundles
+    ]
+    return [
+        retriever._build_node_list_from_query_result(query_result)
+        for query_result in retriever._vector_store.query_many(
+            vector_store_queries, **retriever._kwargs
+        )
+    ]
@@ -1,5 +1,10 @@
+import asyncio
+
 from llama_index.core.indices.query.schema import QueryType
 from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from .batched_retrieval import retrieve_many
 
 
 class HybridORRetriever(BaseRetriever):
@@ -7,27 +12,115 @@ class HybridORRetriever(BaseRetriever):
     index.readthedocs.io/en/latest/examples/retrievers/bm25_retriever.html#custom-retriever-
     implementation.
 
+    By default, the nodes of both retrievers are concatenated, without duplicates. With a
+    `fusion_mode`, the nodes are ordered by a fused score instead:
+
+    - `rrf`: reciprocal rank fusion, `sum(weight / (rrf_k + rank))` over the retrievers.
+    - `weighted`: weighted sum of the scores of each retriever, min-max normalized.
+
+    In async mode both retrievers run concurrently, and the ones without native async support
+    run in a thread to avoid blocking the event loop.
+
     Args:
         retriever1 (`BaseRetriever`):
             First retriever to use. It must extend `llama_index.retrievers.BaseRetriever`.
         retriever2 (`BaseRetriever`):
             Second retriever to use. It must extend `llama_index.retrievers.BaseRetriever`.
+        fusion_mode (`str | None`): None, 'rrf' or 'weighted'.
+        weights (`tuple[float, float]`): weights of `retriever1` and `retriever2` in the fusion.
+        rrf_k (`int`): constant of the reciprocal rank fusion, which dampens the top ranks.
+        similarity_top_k (`int | None`): max. number of nodes returned. None for no limit.
     """
 
-    def __init__(self, retriever1: BaseRetriever, retriever2: BaseRetriever):
+    def __init__(
+        self,
+        retriever1: BaseRetriever,
+        retriever2: BaseRetriever,
+        fusion_mode: str | None = None,
+        weights: tuple[float, float] = (0.5, 0.5),
+        rrf_k: int = 60,
+        similarity_top_k: int | None = None,
+    ):
+        if fusion_mode not in (None, "rrf", "weighted"):
+            raise ValueError(
+                f"`fusion_mode` must be None, 'rrf' or 'weighted'. Current value: {fusion_mode}"
+            )
+        super().__init__()
         self.retriever1 = retriever1
         self.retriever2 = retriever2
+        self.fusion_mode = fusion_mode
+        self.weights = weights
+        self.rrf_k = rrf_k
+        self.similarity_top_k = similarity_top_k
+
+    @staticmethod
+    def _min_max_scores(nodes: list[NodeWithScore]) -> dict[str, float]:
+        scores = [n.score or 0.0 for n in nodes]
+        if len(scores) == 0:
+            return {}
+        min_score, max_score = min(scores), max(scores)
+        return {
+            n.node.node_id: (
+                (score - min_score) / (max_score - min_score) if max_score > min_score else 1.0
+            )
+            for n, score in zip(nodes, scores)
+        }
+
+    def _fuse(
+        self, nodes1: list[NodeWithScore], nodes2: list[NodeWithScore]
+    ) -> list[NodeWithScore]:
+        """Combine the nodes of both retrievers, according to `fusion_mode`."""
+        if self.fusion_mode is None:
+            # combine the two lists of nodes
+            all_nodes = []
+            node_ids = set()
+            for n in nodes2 + nodes1:
+                if n.node.node_id not in node_ids:
+                    all_nodes.append(n)
+                    node_ids.add(n.node.node_id)
+            return all_nodes[: self.similarity_top_k]
+
+        nodes_by_id = {n.node.node_id: n.node for n in nodes2 + nodes1}
+        fused_scores = dict.fromkeys(nodes_by_id, 0.0)
+        for weight, nodes in zip(self.weights, (nodes1, nodes2)):
+            if self.fusion_mode == "rrf":
+                for rank, n in enumerate(nodes, start=1):
+                    fused_scores[n.node.node_id] += weight / (self.rrf_k + rank)
+            else:
+                for node_id, score in self._min_max_scores(nodes).items():
+                    fused_scores[node_id] += weight * score
+        sorted_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)
+        return [
+            NodeWithScore(node=nodes_by_id[node_id], score=fused_scores[node_id])
+            for node_id in sorted_ids[: self.similarity_top_k]
+        ]
 
     def _retrieve(self, query: QueryType, **kwargs):
         """Override `_retrieve` from `BaseRetriever`."""
         nodes2 = self.retriever2.retrieve(query, **kwargs)
         nodes1 = self.retriever1.retrieve(query, **kwargs)
+        return self._fuse(nodes1, nodes2)
+
+    def retrieve_many(self, queries: list[QueryType]) -> list[list[NodeWithScore]]:
+        """Retrieve the nodes of several queries, batching each retriever when it supports it (see
+        `gptstonks.wrappers.retrievers.retrieve_many`)."""
+        nodes2 = retrieve_many(self.retriever2, queries)
+        nodes1 = retrieve_many(self.retriever1, queries)
+        return [self._fuse(n1, n2) for n1, n2 in zip(nodes1, nodes2)]
+
+    @staticmethod
+    async def _aretrieve_from_retriever(
+        retriever: BaseRetriever, query: QueryType
+    ) -> list[NodeWithScore]:
+        if type(retriever)._aretrieve is BaseRetriever._aretrieve:
+            # no native async support, so the CPU-bound retrieval runs in a thread
+            return await asyncio.to_thread(retriever.retrieve, query)
+        return await retriever.aretrieve(query)
 
-        # combine the two lists of nodes
-        all_nodes = []
-        node_ids = set()
-        for n in nodes2 + nodes1:
-            if n.node.node_id not in node_ids:
-                all_nodes.append(n)
-                node_ids.add(n.node.node_id)
-        return all_nodes
+    async def _aretrieve(self, query_bundle: QueryBundle, **kwargs):
+        """Override `_aretrieve` from `BaseRetriever`, running both retrievers concurrently."""
+        nodes1, nodes2 = await asyncio.gather(
+            self._aretrieve_from_retriever(self.retriever1, query_bundle),
+            self._aretrieve_from_retriever(self.retriever2, query_bundle),
+        )
+        return self._fuse(nodes1, nodes2)
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import os
+import warnings
+from collections import Counter
+from typing import Callable, List, Optional, cast
+
+import numpy as np
+import scipy.sparse as sp
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
+from llama_index.core.indices.query.schema import QueryType
+from llama_index.core.indices.vector_store.base import VectorStoreIndex
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.types import BaseDocumentStore
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+BM25_METADATA_FNAME = "bm25_metadata.json"
+BM25_ARRAYS_FNAMES = {
+    "data": "bm25_data.npy",
+    "indices": "bm25_indices.npy",
+    "indptr": "bm25_indptr.npy",
+}
+DEFAULT_BM25_PARAMS = {"k1": 1.5, "b": 0.75, "epsilon": 0.25}
+
+
+def get_tokenizer_name(tokenizer: Callable[[str], List[str]]) -> str:
+    """Name of a tokenizer function, to check that a persisted matrix was built with it."""
+    name = getattr(tokenizer, "__qualname__", type(tokenizer).__qualname__)
+    return f"{getattr(tokenizer, '__module__', None)}.{name}"
+
+
+def compute_nodes_hash(nodes: List[BaseNode]) -> str:
+    """SHA-256 of the IDs and texts of the nodes, independent of their order."""
+    nodes_hash = hashlib.sha256()
+    for node in sorted(nodes, key=lambda node: node.node_id):
+        nodes_hash.update(f"{node.node_id}\0{node.get_content()}\0".encode())
+    return nodes_hash.hexdigest()
+
+
+class SparseBM25Retriever(BaseRetriever):
+    """BM25 retriever whose term weights are precomputed in a SciPy sparse matrix.
+
+    The scores are the same as `BM25Retriever` (Okapi BM25 of `rank_bm25`), but the tokenization
+    and term statistics are computed once, when building the matrix, and the scores of a query are
+    a single sparse product with the columns of its terms. The matrix can be persisted, usually
+    next to the vector store index, and it is memory-mapped when loaded. The persisted matrix is
+    only reused if the texts of the nodes, the tokenizer and the BM25 parameters are the same. The
+    nodes are read from the docstore.
+
+    Args:
+        matrix (`scipy.sparse.csc_matrix`): BM25 weights, with shape (number of nodes, vocabulary size).
+        vocabulary (`dict[str, int]`): column of each term.
+        node_ids (`list[str]`): node ID of each row.
+        docstore (`BaseDocumentStore`): docstore containing the nodes.
+        tokenizer (`Callable[[str], List[str]] | None`): tokenizer used to build the matrix.
+            Defaults to the one of `BM25Retriever`.
+        similarity_top_k (`int`): number of nodes to retrieve.
+        build_info (`dict | None`): `compute_nodes_hash` of the nodes, name of the tokenizer and
+            BM25 parameters (`k1`, `b` and `epsilon`) used to build the matrix.
+    """
+
+    def __init__(
+        self,
+        matrix: sp.csc_matrix,
+        vocabulary: dict[str, int],
+        node_ids: list[str],
+        docstore: BaseDocumentStore,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        similarity_top_k: int = DEFAULT_SIMILARITY_TOP_K,
+        build_info: Optional[dict] = None,
+        verbose: bool = False,
+    ):
+        self._matrix = matrix
+        self._vocabulary = vocabulary
+        self._node_ids = node_ids
+        self._docstore = docstore
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
+        self._build_info = build_info
+        super().__init__(verbose=verbose)
+
+    @property
+    def node_ids(self) -> list[str]:
+        return self._node_ids
+
+    @property
+    def build_info(self) -> dict | None:
+        """Hash of the nodes, tokenizer and BM25 parameters used to build the matrix."""
+        return self._build_info
+
+    @staticmethod
+    def get_build_info(
+        nodes: List[BaseNode], tokenizer: Callable[[str], List[str]], bm25_params: dict
+    ) -> dict:
+        return {
+            "nodes_hash": compute_nodes_hash(nodes),
+            "tokenizer": get_tokenizer_name(tokenizer),
+            "bm25_params": {**DEFAULT_BM25_PARAMS, **bm25_params},
+        }
+
+    @staticmethod
+    def build_matrix(
+        corpus: list[list[str]],
+        k1: float = DEFAULT_BM25_PARAMS["k1"],
+        b: float = DEFAULT_BM25_PARAMS["b"],
+        epsilon: float = DEFAULT_BM25_PARAMS["epsilon"],
+    ) -> tuple[sp.csc_matrix, dict[str, int]]:
+        """Compute the BM25 weight of each term in each document, as `rank_bm25.BM25Okapi`.
+
+        Args:
+            corpus (`list[list[str]]`): tokens of each document.
+            k1 (`float`): term frequency saturation.
+            b (`float`): document length normalization.
+            epsilon (`float`): fraction of the average IDF assigned to the terms with negative IDF.
+
+        Returns:
+            `tuple[scipy.sparse.csc_matrix, dict[str, int]]`: weights matrix and the column of each term.
+        """
+        vocabulary: dict[str, int] = {}
+        rows, cols, term_freqs = [], [], []
+        doc_lens = np.zeros(len(corpus), dtype=np.float64)
+        for row, tokens in enumerate(corpus):
+            doc_lens[row] = len(tokens)
+            for term, term_freq in Counter(tokens).items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                term_freqs.append(term_freq)
+        rows, cols = np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32)
+        term_freqs = np.asarray(term_freqs, dtype=np.float64)
+
+        num_docs = len(corpus)
+        doc_freqs = np.bincount(cols, minlength=len(vocabulary))
+        idf = np.log(num_docs - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+        idf[idf < 0] = epsilon * idf.mean() if len(idf) > 0 else 0.0
+
+        avg_doc_len = doc_lens.mean() if num_docs > 0 else 0.0
+        norm = k1 * (1 - b + b * doc_lens[rows] / max(avg_doc_len, 1e-12))
+        weights = idf[cols] * term_freqs * (k1 + 1) / (term_freqs + norm)
+        matrix = sp.csc_matrix(
+            (weights.astype(np.float32), (rows, cols)), shape=(num_docs, len(vocabulary))
+        )
+        return matrix, vocabulary
+
+    @classmethod
+    def from_nodes(
+        cls,
+        nodes: List[BaseNode],
+        docstore: BaseDocumentStore,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        similarity_top_k: int = DEFAULT_SIMILARITY_TOP_K,
+        **bm25_kwargs,
+    ) -> "SparseBM25Retriever":
+        """Build the retriever tokenizing the nodes."""
+        tokenizer = tokenizer or tokenize_remove_stopwords
+        bm25_params = {**DEFAULT_BM25_PARAMS, **bm25_kwargs}
+        matrix, vocabulary = cls.build_matrix(
+            [tokenizer(node.get_content()) for node in nodes], **bm25_params
+        )
+        return cls(
+            matrix=matrix,
+            vocabulary=vocabulary,
+            node_ids=[node.node_id for node in nodes],
+            docstore=docstore,
+            tokenizer=tokenizer,
+            similarity_top_k=similarity_top_k,
+            build_info=cls.get_build_info(nodes, tokenizer, bm25_params),
+        )
+
+    @classmethod
+    def from_defaults(
+        cls,
+        index: Optional[VectorStoreIndex] = None,
+        docstore: Optional[BaseDocumentStore] = None,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        similarity_top_k: int = DEFAULT_SIMILARITY_TOP_K,
+        persist_dir: Optional[str] = None,
+        **bm25_kwargs,
+    ) -> "SparseBM25Retriever":
+        """Load the retriever from `persist_dir` if it was built from the same nodes, tokenizer and
+        BM25 parameters, or build it and persist it there otherwise.
+
+        Args:
+            index (`VectorStoreIndex | None`): index whose docstore is used.
+            docstore (`BaseDocumentStore | None`): docstore with the nodes, if `index` is not given.
+            tokenizer (`Callable[[str], List[str]] | None`): tokenizer of the texts.
+            similarity_top_k (`int`): number of nodes to retrieve.
+            persist_dir (`str | None`): folder to load or save the matrix. None to always build it in memory.
+            **bm25_kwargs: `k1`, `b` and `epsilon` of BM25.
+
+        Returns:
+            `SparseBM25Retriever`: the retriever.
+        """
+        if (index is None) == (docstore is None):
+            raise ValueError("Please pass exactly one of index or docstore.")
+        if index is not None:
+            docstore = index.docstore
+        nodes = cast(List[BaseNode], list(docstore.docs.values()))
+
+        if persist_dir is not None and os.path.exists(
+            os.path.join(persist_dir, BM25_METADATA_FNAME)
+        ):
+            retriever = cls.from_persist_dir(
+                persist_dir,
+                docstore=docstore,
+                tokenizer=tokenizer,
+                similarity_top_k=similarity_top_k,
+            )
+            if retriever.build_info == cls.get_build_info(
+                nodes, tokenizer or tokenize_remove_stopwords, bm25_kwargs
+            ):
+                return retriever
+            warnings.warn(
+                "The persisted BM25 matrix does not match the nodes or parameters, rebuilding it"
+            )
+
+        retriever = cls.from_nodes(
+            nodes,
+            docstore=docstore,
+            tokenizer=tokenizer,
+            similarity_top_k=similarity_top_k,
+            **bm25_kwargs,
+        )
+        if persist_dir is not None:
+            try:
+                retriever.persist(persist_dir)
+            except OSError as e:
+                warnings.warn(f"BM25 matrix not persisted: {e}")
+        return retriever
+
+    def persist(self, persist_dir: str):
+        """Save the matrix as NumPy arrays and the vocabulary, node IDs and build information as
+        JSON.
+
+        The files are written with temporary names and renamed, and the metadata, which marks the
+        persisted matrix as complete, is removed first and written last, so a failure never leaves
+        a matrix that looks complete.
+        """
+        os.makedirs(persist_dir, exist_ok=True)
+        tmp_suffix = f".{os.getpid()}.tmp"
+        tmp_paths = {}
+        for name, fname in BM25_ARRAYS_FNAMES.items():
+            tmp_paths[fname] = os.path.join(persist_dir, fname + tmp_suffix)
+            with open(tmp_paths[fname], "wb") as f:
+                np.save(f, getattr(self._matrix, name))
+        metadata_path = os.path.join(persist_dir, BM25_METADATA_FNAME)
+        tmp_paths[BM25_METADATA_FNAME] = metadata_path + tmp_suffix
+        with open(tmp_paths[BM25_METADATA_FNAME], "w") as f:
+            json.dump(
+                {
+                    "shape": list(self._matrix.shape),
+                    "vocabulary": self._vocabulary,
+                    "node_ids": self._node_ids,
+                    "build_info": self._build_info,
+                },
+                f,
+            )
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        for fname, tmp_path in tmp_paths.items():
+            os.replace(tmp_path, os.path.join(persist_dir, fname))
+
+    @classmethod
+    def from_persist_dir(
+        cls,
+        persist_dir: str,
+        docstore: BaseDocumentStore,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        similarity_top_k: int = DEFAULT_SIMILARITY_TOP_K,
+    ) -> "SparseBM25Retriever":
+        """Load a persisted retriever, memory-mapping the matrix."""
+        with open(os.path.join(persist_dir, BM25_METADATA_FNAME)) as f:
+            metadata = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(persist_dir, fname), mmap_mode="r")
+            for name, fname in BM25_ARRAYS_FNAMES.items()
+        }
+        matrix = sp.csc_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(metadata["shape"]),
+            copy=False,
+        )
+        return cls(
+            matrix=matrix,
+            vocabulary=metadata["vocabulary"],
+            node_ids=metadata["node_ids"],
+            docstore=docstore,
+            tokenizer=tokenizer,
+            similarity_top_k=similarity_top_k,
+            build_info=metadata.get("build_info"),
+        )
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """BM25 score of each node for the query."""
+        term_counts = Counter(
+            self._vocabulary[token]
+            for token in self._tokenizer(query)
+            if token in self._vocabulary
+        )
+        if len(term_counts) == 0:
+            return np.zeros(len(self._node_ids), dtype=np.float32)
+        cols = list(term_counts.keys())
+        return self._matrix[:, cols] @ np.asarray(list(term_counts.values()), dtype=np.float32)
+
+    def get_scores_many(self, queries: list[str]) -> np.ndarray:
+        """BM25 scores of several queries, computed with a single sparse matrix product.
+
+        Returns:
+            `np.ndarray`: scores with shape (number of queries, number of nodes).
+        """
+        rows, cols, counts = [], [], []
+        for row, query in enumerate(queries):
+            term_counts = Counter(
+                self._vocabulary[token]
+                for token in self._tokenizer(query)
+                if token in self._vocabulary
+            )
+            rows.extend([row] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+        query_matrix = sp.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(queries), len(self._vocabulary)),
+        )
+        return np.asarray((query_matrix @ self._matrix.T).todense())
+
+    def _get_top_nodes(self, scores: np.ndarray) -> List[NodeWithScore]:
+        top_k = min(self._similarity_top_k, len(scores))
+        if top_k == 0:
+            return []
+        top_idxs = np.argpartition(-scores, top_k - 1)[:top_k]
+        top_idxs = top_idxs[np.argsort(-scores[top_idxs], kind="stable")]
+        nodes = self._docstore.get_nodes([self._node_ids[i] for i in top_idxs])
+        return [
+            NodeWithScore(node=node, score=float(scores[i])) for node, i in zip(nodes, top_idxs)
+        ]
+
+    def retrieve_many(self, queries: List[QueryType]) -> List[List[NodeWithScore]]:
+        """Retrieve the nodes of several queries, scoring all of them together."""
+        query_strs = [
+            query.query_str if isinstance(query, QueryBundle) else query for query in queries
+        ]
+        return [self._get_top_nodes(scores) for scores in self.get_scores_many(query_strs)]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self._get_top_nodes(self.get_scores(query_bundle.query_str))
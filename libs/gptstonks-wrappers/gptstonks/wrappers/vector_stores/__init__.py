@@ -0,0 +1,2 @@
+from .numpy_vector_store import NumpyVectorStore as NumpyVectorStore
+from .numpy_vector_store import convert_vsi_to_npy as convert_vsi_to_npy
@@ -0,0 +1,256 @@
+import json
+import os
+from typing import Any, List, Optional
+
+import fsspec
+import numpy as np
+from llama_index.core import StorageContext
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.simple import SimpleVectorStore
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+DEFAULT_PERSIST_FNAME = "default__vector_store"
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """In-memory vector store backed by a contiguous float32 NumPy matrix.
+
+    The embeddings are L2-normalized when added, so the cosine similarity of a query against the
+    whole store is a single matrix-vector product, and the top-k is selected with
+    `np.argpartition`. It is persisted as a `.npy` file, which is memory-mapped when loaded, and a
+    JSON table with the node and document IDs of each row. The texts are kept in the docstore.
+
+    Args:
+        embeddings (`np.ndarray | None`): normalized embeddings, one per row.
+        node_ids (`list[str] | None`): node ID of each row.
+        ref_doc_ids (`list[str | None] | None`): document ID of each row.
+    """
+
+    stores_text: bool = False
+
+    _embeddings: np.ndarray | None = PrivateAttr()
+    _node_ids: list[str] = PrivateAttr()
+    _ref_doc_ids: list[str | None] = PrivateAttr()
+
+    def __init__(
+        self,
+        embeddings: np.ndarray | None = None,
+        node_ids: list[str] | None = None,
+        ref_doc_ids: list[str | None] | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self._embeddings = embeddings
+        self._node_ids = node_ids or []
+        self._ref_doc_ids = ref_doc_ids or [None] * len(self._node_ids)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def __len__(self) -> int:
+        return len(self._node_ids)
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Add the embeddings of the nodes to the store."""
+        if len(nodes) == 0:
+            return []
+        new_embeddings = self._normalize(
+            np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        )
+        self._embeddings = (
+            new_embeddings
+            if self._embeddings is None
+            else np.concatenate([self._embeddings, new_embeddings])
+        )
+        self._node_ids.extend(node.node_id for node in nodes)
+        self._ref_doc_ids.extend(node.ref_doc_id for node in nodes)
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Delete the embeddings of the nodes of a document."""
+        keep = [i for i, doc_id in enumerate(self._ref_doc_ids) if doc_id != ref_doc_id]
+        if len(keep) == len(self._node_ids):
+            return
+        self._embeddings = self._embeddings[keep]
+        self._node_ids = [self._node_ids[i] for i in keep]
+        self._ref_doc_ids = [self._ref_doc_ids[i] for i in keep]
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Get the most similar nodes by cosine similarity."""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"Query mode {query.mode} not supported by NumpyVectorStore")
+        if query.filters is not None:
+            raise ValueError("Metadata filters are not supported by NumpyVectorStore")
+        if self._embeddings is None or len(self._node_ids) == 0:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+
+        rows = np.arange(len(self._node_ids))
+        if query.node_ids is not None or query.doc_ids is not None:
+            node_ids = set(query.node_ids or self._node_ids)
+            doc_ids = set(query.doc_ids) if query.doc_ids is not None else None
+            rows = np.asarray(
+                [
+                    i
+                    for i in rows
+                    if self._node_ids[i] in node_ids
+                    and (doc_ids is None or self._ref_doc_ids[i] in doc_ids)
+                ],
+                dtype=np.int64,
+            )
+            if len(rows) == 0:
+                return VectorStoreQueryResult(similarities=[], ids=[])
+            embeddings = self._embeddings[rows]
+        else:
+            embeddings = self._embeddings
+
+        query_embedding = self._normalize(np.asarray(query.query_embedding, dtype=np.float32))
+        similarities = np.asarray(embeddings @ query_embedding)
+        top_k = min(query.similarity_top_k, len(similarities))
+        top_idxs = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top_idxs = top_idxs[np.argsort(-similarities[top_idxs])]
+        return VectorStoreQueryResult(
+            similarities=similarities[top_idxs].tolist(),
+            ids=[self._node_ids[rows[i]] for i in top_idxs],
+        )
+
+    def query_many(
+        self, queries: List[VectorStoreQuery], **kwargs: Any
+    ) -> List[VectorStoreQueryResult]:
+        """Get the most similar nodes of several queries, scoring all of them with a single matrix
+        product.
+
+        Queries with node, document or metadata filters are run one by one.
+        """
+        batch_idxs = [
+            i
+            for i, query in enumerate(queries)
+            if query.mode == VectorStoreQueryMode.DEFAULT
+            and query.filters is None
+            and query.node_ids is None
+            and query.doc_ids is None
+        ]
+        batch_idxs_set = set(batch_idxs)
+        results = [
+            self.query(query, **kwargs) if i not in batch_idxs_set else None
+            for i, query in enumerate(queries)
+        ]
+        if len(batch_idxs) == 0:
+            return results
+        if self._embeddings is None or len(self._node_ids) == 0:
+            for i in batch_idxs:
+                results[i] = VectorStoreQueryResult(similarities=[], ids=[])
+            return results
+
+        query_embeddings = self._normalize(
+            np.asarray([queries[i].query_embedding for i in batch_idxs], dtype=np.float32)
+        )
+        # (num. queries, num. nodes)
+        similarities = np.asarray(query_embeddings @ self._embeddings.T)
+        for row, i in enumerate(batch_idxs):
+            top_k = min(queries[i].similarity_top_k, similarities.shape[1])
+            top_idxs = np.argpartition(-similarities[row], top_k - 1)[:top_k]
+            top_idxs = top_idxs[np.argsort(-similarities[row, top_idxs])]
+            results[i] = VectorStoreQueryResult(
+                similarities=similarities[row, top_idxs].tolist(),
+                ids=[self._node_ids[j] for j in top_idxs],
+            )
+        return results
+
+    def persist(
+        self,
+        persist_path: str,
+        fs: Optional[fsspec.AbstractFileSystem] = None,
+    ) -> None:
+        """Persist the store as `{persist_path}.npy` and `{persist_path}_ids.json`.
+
+        A `.json` extension in `persist_path`, as given by `StorageContext.persist`, is removed.
+        """
+        base_path = persist_path.removesuffix(".json")
+        dirpath = os.path.dirname(base_path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        embeddings = self._embeddings if self._embeddings is not None else np.zeros((0, 0))
+        np.save(f"{base_path}.npy", np.ascontiguousarray(embeddings, dtype=np.float32))
+        with open(f"{base_path}_ids.json", "w") as f:
+            json.dump({"node_ids": self._node_ids, "ref_doc_ids": self._ref_doc_ids}, f)
+
+    @classmethod
+    def from_persist_path(cls, persist_path: str, mmap: bool = True) -> "NumpyVectorStore":
+        """Load a store persisted with `persist`.
+
+        Args:
+            persist_path (`str`): same path given to `persist`.
+            mmap (`bool`): whether to memory-map the embeddings instead of reading them.
+
+        Returns:
+            `NumpyVectorStore`: the loaded store.
+        """
+        base_path = persist_path.removesuffix(".json")
+        embeddings = np.load(f"{base_path}.npy", mmap_mode="r" if mmap else None)
+        with open(f"{base_path}_ids.json") as f:
+            ids = json.load(f)
+        return cls(
+            embeddings=embeddings if embeddings.size > 0 else None,
+            node_ids=ids["node_ids"],
+            ref_doc_ids=ids["ref_doc_ids"],
+        )
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str, mmap: bool = True) -> "NumpyVectorStore":
+        """Load the default store persisted in a folder by `StorageContext.persist`."""
+        return cls.from_persist_path(os.path.join(persist_dir, DEFAULT_PERSIST_FNAME), mmap=mmap)
+
+    @classmethod
+    def from_simple_vector_store(cls, vector_store: SimpleVectorStore) -> "NumpyVectorStore":
+        """Create the store from the embeddings of LlamaIndex's `SimpleVectorStore`."""
+        data = vector_store.to_dict()
+        node_ids = list(data["embedding_dict"].keys())
+        embeddings = (
+            cls._normalize(
+                np.asarray([data["embedding_dict"][i] for i in node_ids], dtype=np.float32)
+            )
+            if len(node_ids) > 0
+            else None
+        )
+        return cls(
+            embeddings=embeddings,
+            node_ids=node_ids,
+            ref_doc_ids=[data["text_id_to_ref_doc_id"].get(i) for i in node_ids],
+        )
+
+
+def convert_vsi_to_npy(vsi_dir: str, output_dir: str):
+    """Convert a persisted Vector Store Index (`vsi:` in `AutoRag`) to the `vsi-npy:` format.
+
+    The docstore and index store are kept as they are, and the JSON embeddings of the
+    `SimpleVectorStore` are stored as a NumPy matrix.
+
+    Args:
+        vsi_dir (`str`): folder of the persisted index.
+        output_dir (`str`): folder where the converted index is persisted.
+    """
+    storage_context = StorageContext.from_defaults(persist_dir=vsi_dir)
+    StorageContext(
+        docstore=storage_context.docstore,
+        index_store=storage_context.index_store,
+        vector_stores={
+            "default": NumpyVectorStore.from_simple_vector_store(storage_context.vector_store)
+        },
+        graph_store=storage_context.graph_store,
+    ).persist(persist_dir=output_dir)
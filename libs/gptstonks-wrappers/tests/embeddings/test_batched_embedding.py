@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from gptstonks.wrappers.embeddings import BatchedQueryEmbedding
+
+
+@pytest.mark.asyncio
+async def test_batched_query_embedding():
+    batches, threads = [], set()
+
+    def batch_embed_fn(embed_model, queries):
+        batches.append(queries)
+        threads.add(threading.get_ident())
+        return [[float(len(query)), 0.0] for query in queries]
+
+    batched_embed_model = BatchedQueryEmbedding(
+        MockEmbedding(embed_dim=2), max_batch_size=4, max_wait=0.05, batch_embed_fn=batch_embed_fn
+    )
+    queries = [f"query {'x' * i}" for i in range(6)]
+    embeddings = await asyncio.gather(
+        *[batched_embed_model.aget_query_embedding(query) for query in queries]
+    )
+
+    # the first batch is sent when full, the second one after `max_wait`
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert embeddings == [[float(len(query)), 0.0] for query in queries]
+    assert threading.get_ident() not in threads
+    assert batched_embed_model.stats == {"num_batches": 2, "num_queries": 6, "avg_batch_size": 3.0}
+    batched_embed_model.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batched_query_embedding_error():
+    def batch_embed_fn(embed_model, queries):
+        raise ValueError("embedding failed")
+
+    batched_embed_model = BatchedQueryEmbedding(
+        MockEmbedding(embed_dim=2), max_wait=0.001, batch_embed_fn=batch_embed_fn
+    )
+    with pytest.raises(ValueError, match="embedding failed"):
+        await batched_embed_model.aget_query_embedding("AAPL price")
+    # the default batch function falls back to the wrapped model
+    assert len(BatchedQueryEmbedding(MockEmbedding(embed_dim=2)).get_query_embedding("AAPL")) == 2
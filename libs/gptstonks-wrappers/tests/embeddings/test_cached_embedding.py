@@ -0,0 +1,70 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+
+from gptstonks.wrappers.embeddings import CachedQueryEmbedding
+from gptstonks.wrappers.kernels import AutoRag
+
+
+def test_cached_query_embedding():
+    embed_model = MockEmbedding(embed_dim=4)
+    cached_embed_model = CachedQueryEmbedding(embed_model, max_size=2)
+
+    with patch.object(
+        MockEmbedding, "_get_query_embedding", return_value=[1.0, 0, 0, 0]
+    ) as mocked_embedding:
+        cached_embed_model.get_query_embedding("AAPL price")
+        cached_embed_model.get_query_embedding("  aapl   PRICE ")
+        assert mocked_embedding.call_count == 1
+        # evict "aapl price", the least recently used
+        cached_embed_model.get_query_embedding("MSFT price")
+        cached_embed_model.get_query_embedding("TSLA price")
+        cached_embed_model.get_query_embedding("AAPL price")
+        assert mocked_embedding.call_count == 4
+
+    assert cached_embed_model.stats == {"hits": 1, "misses": 4, "hit_rate": 0.2, "size": 2}
+    # text embeddings are not cached
+    assert len(cached_embed_model.get_text_embedding("some text")) == 4
+    assert cached_embed_model.stats["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_query_embedding_ttl():
+    cached_embed_model = CachedQueryEmbedding(MockEmbedding(embed_dim=4), ttl=0.01)
+
+    await cached_embed_model.aget_query_embedding("AAPL price")
+    await cached_embed_model.aget_query_embedding("AAPL price")
+    time.sleep(0.02)
+    await cached_embed_model.aget_query_embedding("AAPL price")
+
+    assert cached_embed_model.stats["hits"] == 1
+    assert cached_embed_model.stats["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_auto_rag_query_embedding_cache():
+    embed_model = MockEmbedding(embed_dim=4)
+    index = VectorStoreIndex(
+        [TextNode(text="obb.equity.price.quote"), TextNode(text="obb.news.company")],
+        embed_model=embed_model,
+    )
+    auto_rag = AutoRag(
+        vsi=index,
+        embedding_model_id=embed_model,
+        llm_model=MockLLM(),
+        retriever_type="hybrid",
+        query_embedding_cache_size=8,
+        query_embedding_batch_size=4,
+    )
+
+    assert len(await auto_rag.aretrieve("AAPL price")) > 0
+    assert len(auto_rag.retrieve("AAPL price")) > 0
+    assert auto_rag.query_embedding_cache_stats["hits"] == 1
+    assert auto_rag.query_embedding_cache_stats["misses"] == 1
+    # only the async miss is embedded by the batcher
+    assert auto_rag.query_embedding_batch_stats["num_queries"] == 1
@@ -0,0 +1,40 @@
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from gptstonks.wrappers.embeddings import resolve_embed_model
+from gptstonks.wrappers.embeddings.onnx_embedding import get_default_query_instruction
+
+
+def test_resolve_embed_model():
+    embed_model = MockEmbedding(embed_dim=4)
+    assert resolve_embed_model(embed_model) is embed_model
+
+
+def test_get_default_query_instruction():
+    hf_utils = pytest.importorskip("llama_index.embeddings.huggingface.utils")
+    assert (
+        get_default_query_instruction("BAAI/bge-base-en-v1.5")
+        == hf_utils.DEFAULT_QUERY_BGE_INSTRUCTION_EN
+    )
+    assert get_default_query_instruction("sentence-transformers/all-MiniLM-L6-v2") is None
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_onnx_embedding(tmp_path, quantize):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum.onnxruntime")
+    from gptstonks.wrappers.embeddings import OnnxEmbedding
+
+    embed_model = resolve_embed_model(
+        "onnx:sentence-transformers/all-MiniLM-L6-v2",
+        quantize=quantize,
+        intra_op_num_threads=1,
+        pooling="mean",
+        cache_folder=str(tmp_path),
+    )
+
+    assert isinstance(embed_model, OnnxEmbedding)
+    query_embeddings = embed_model._get_query_embeddings(["AAPL price", "news about TSLA"])
+    assert len(query_embeddings) == 2
+    assert query_embeddings[0] == pytest.approx(embed_model.get_query_embedding("AAPL price"))
+    assert sum(x**2 for x in embed_model.get_text_embedding("AAPL price")) == pytest.approx(1.0)
@@ -0,0 +1,103 @@
+import json
+from typing import List
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+
+from gptstonks.wrappers.ingestion import update_index_from_files
+from gptstonks.wrappers.kernels import AutoRag
+
+
+class CountingEmbedding(MockEmbedding):
+    """Mock embedding model that records the embedded texts."""
+
+    embedded_texts: List[str] = []
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        self.embedded_texts.append(text)
+        return super()._get_text_embedding(text)
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs_dir = tmp_path / "docs"
+    (docs_dir / "equity").mkdir(parents=True)
+    (docs_dir / "equity" / "historical.md").write_text("obb.equity.price.historical: stock prices")
+    (docs_dir / "equity" / "quote.md").write_text("obb.equity.price.quote: latest quote")
+    (docs_dir / "news.md").write_text("obb.news.company: company news")
+    return docs_dir
+
+
+def test_update_index_from_files(docs_dir, tmp_path):
+    persist_dir = str(tmp_path / "vsi")
+    embed_model = CountingEmbedding(embed_dim=4)
+    kwargs = {"other_llama_index_vector_store_index_kwargs": {"embed_model": embed_model}}
+
+    index, stats = update_index_from_files(str(docs_dir), persist_dir, **kwargs)
+    assert stats == {"added": 3, "modified": 0, "removed": 0, "unchanged": 0}
+    assert len(embed_model.embedded_texts) == 3
+    with open(f"{persist_dir}/files_manifest.json") as f:
+        assert set(json.load(f)["files"]) == {"equity/historical.md", "equity/quote.md", "news.md"}
+
+    # nothing is embedded if the files did not change
+    embed_model.embedded_texts.clear()
+    index, stats = update_index_from_files(str(docs_dir), persist_dir, **kwargs)
+    assert stats == {"added": 0, "modified": 0, "removed": 0, "unchanged": 3}
+    assert embed_model.embedded_texts == []
+    assert len(index.docstore.docs) == 3
+
+    # only the new and modified files are embedded, and the removed ones are deleted
+    (docs_dir / "equity" / "quote.md").write_text(
+        "obb.equity.price.quote: latest quote of a stock"
+    )
+    (docs_dir / "news.md").unlink()
+    (docs_dir / "etf.md").write_text("obb.etf.holdings: holdings of an ETF")
+    index, stats = update_index_from_files(str(docs_dir), persist_dir, **kwargs)
+    assert stats == {"added": 1, "modified": 1, "removed": 1, "unchanged": 1}
+    assert len(embed_model.embedded_texts) == 2
+    texts = sorted(node.get_content() for node in index.docstore.docs.values())
+    assert texts == [
+        "obb.equity.price.historical: stock prices",
+        "obb.equity.price.quote: latest quote of a stock",
+        "obb.etf.holdings: holdings of an ETF",
+    ]
+    assert len(index.vector_store.to_dict()["embedding_dict"]) == 3
+
+
+def test_update_index_from_files_new_embed_model(docs_dir, tmp_path):
+    persist_dir = str(tmp_path / "vsi")
+    update_index_from_files(
+        str(docs_dir),
+        persist_dir,
+        other_llama_index_vector_store_index_kwargs={"embed_model": MockEmbedding(embed_dim=4)},
+    )
+    embed_model = CountingEmbedding(embed_dim=4, model_name="other-model")
+    with pytest.warns(UserWarning, match="rebuilding"):
+        _, stats = update_index_from_files(
+            str(docs_dir),
+            persist_dir,
+            other_llama_index_vector_store_index_kwargs={"embed_model": embed_model},
+        )
+    assert stats["added"] == 3
+
+
+def test_auto_rag_files_persist_dir(docs_dir, tmp_path):
+    persist_dir = str(tmp_path / "vsi")
+    auto_rag_kwargs = {
+        "vsi": f"files:{docs_dir}",
+        "embedding_model_id": MockEmbedding(embed_dim=4),
+        "llm_model": MockLLM(),
+        "retriever_type": "hybrid",
+        "bm25_retriever_type": "sparse",
+        "files_persist_dir": persist_dir,
+    }
+    auto_rag = AutoRag(**auto_rag_kwargs)
+    assert auto_rag.files_update_stats["added"] == 3
+
+    (docs_dir / "etf.md").write_text("obb.etf.holdings: holdings of an ETF")
+    auto_rag = AutoRag(**auto_rag_kwargs)
+    assert auto_rag.files_update_stats == {"added": 1, "modified": 0, "removed": 0, "unchanged": 3}
+    # the persisted BM25 matrix is rebuilt with the new nodes
+    nodes = auto_rag.retrieve("ETF holdings")
+    assert any("etf.holdings" in n.node.get_content() for n in nodes)
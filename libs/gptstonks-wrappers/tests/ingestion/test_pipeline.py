@@ -0,0 +1,94 @@
+import pytest
+from llama_index.core import (
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.node_parser import SentenceSplitter
+
+from gptstonks.wrappers.ingestion import ingest_files
+from gptstonks.wrappers.kernels import AutoRag
+
+TEXTS = {
+    "historical.md": "obb.equity.price.historical: historical stock prices of a company. " * 50,
+    "quote.md": "obb.equity.price.quote: latest quote of a stock",
+    "crypto/historical.md": "obb.crypto.price.historical: historical prices of a cryptocurrency",
+    "news.md": "obb.news.company: news about a company",
+}
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs_dir = tmp_path / "docs"
+    for path, text in TEXTS.items():
+        (docs_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (docs_dir / path).write_text(text)
+    return docs_dir
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_ingest_files_same_nodes(docs_dir, tmp_path, num_workers):
+    output_dir = str(tmp_path / "vsi")
+    report = ingest_files(
+        str(docs_dir),
+        output_dir,
+        embed_model=MockEmbedding(embed_dim=4),
+        num_workers=num_workers,
+        embed_batch_size=2,
+        chunk_size=64,
+        chunk_overlap=0,
+    )
+    assert report["num_files"] == 4
+    assert report["num_docs"] == 4
+    assert report["num_nodes"] > 4
+    assert report["nodes_per_second"] > 0
+
+    index = load_index_from_storage(
+        StorageContext.from_defaults(persist_dir=output_dir),
+        embed_model=MockEmbedding(embed_dim=4),
+    )
+    expected_index = VectorStoreIndex.from_documents(
+        SimpleDirectoryReader(str(docs_dir), recursive=True).load_data(),
+        embed_model=MockEmbedding(embed_dim=4),
+        transformations=[SentenceSplitter(chunk_size=64, chunk_overlap=0)],
+    )
+    assert sorted(n.get_content() for n in index.docstore.docs.values()) == sorted(
+        n.get_content() for n in expected_index.docstore.docs.values()
+    )
+    assert len(index.vector_store.to_dict()["embedding_dict"]) == report["num_nodes"]
+    assert len(index.ref_doc_info) == 4
+
+
+def test_ingest_files_vsi_npy(docs_dir, tmp_path):
+    output_dir = str(tmp_path / "vsi_npy")
+    embed_model = MockEmbedding(embed_dim=4, embed_batch_size=10)
+    report = ingest_files(
+        str(docs_dir),
+        output_dir,
+        embed_model=embed_model,
+        output_format="vsi-npy",
+        num_workers=1,
+        embed_batch_size=2,
+        persist_bm25=True,
+    )
+    assert report["output"] == f"vsi-npy:{output_dir}"
+    # the given model is not modified
+    assert embed_model.embed_batch_size == 10
+
+    auto_rag = AutoRag(
+        vsi=f"vsi-npy:{output_dir}",
+        embedding_model_id=MockEmbedding(embed_dim=4),
+        llm_model=MockLLM(),
+        retriever_type="bm25",
+        bm25_retriever_type="sparse",
+    )
+    nodes = auto_rag.retrieve("latest quote")
+    assert nodes[0].node.get_content() == TEXTS["quote.md"]
+
+
+def test_ingest_files_wrong_format(docs_dir, tmp_path):
+    with pytest.raises(ValueError, match="output_format"):
+        ingest_files(str(docs_dir), str(tmp_path), output_format="json")
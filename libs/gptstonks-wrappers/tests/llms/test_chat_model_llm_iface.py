@@ -1,8 +1,18 @@
+import asyncio
 import os
+import time
 from collections import namedtuple
 from unittest.mock import patch
 
+import pytest
 from langchain.chat_models import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import (
+    FakeMessagesListChatModel,
+    GenericFakeChatModel,
+)
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 
 from gptstonks.wrappers.llms.chat_model_llm_iface import ChatModelWithLLMIface
 
@@ -14,3 +24,80 @@ def test_chat_model_llm_iface(mocked_generate):
     chat._generate(["Generate some random story"])
 
     mocked_generate.assert_called_once()
+
+
+class NewTokensHandler(BaseCallbackHandler):
+    """Callback handler that records the new tokens."""
+
+    def __init__(self):
+        self.tokens = []
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self.tokens.append(token)
+
+
+class SlowChatModel(FakeMessagesListChatModel):
+    """Chat model that echoes the prompt after a delay, recording the maximum concurrent calls."""
+
+    delay: float = 0.05
+    num_running: int = 0
+    max_running: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.num_running += 1
+        self.max_running = max(self.max_running, self.num_running)
+        await asyncio.sleep(self.delay)
+        self.num_running -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(messages[-1].content))])
+
+
+@pytest.mark.asyncio
+async def test_chat_model_llm_iface_agenerate():
+    chat_model = SlowChatModel(responses=[])
+    llm = ChatModelWithLLMIface(chat_model=chat_model, max_concurrency=3)
+    prompts = [f"prompt {i}" for i in range(6)]
+
+    start = time.perf_counter()
+    result = await llm.agenerate(prompts)
+    elapsed = time.perf_counter() - start
+
+    assert [generations[0].text for generations in result.generations] == prompts
+    assert chat_model.max_running == 3
+    # two rounds of concurrent calls instead of six sequential ones
+    assert elapsed < 5 * chat_model.delay
+
+
+def test_chat_model_llm_iface_stream():
+    llm = ChatModelWithLLMIface(
+        chat_model=GenericFakeChatModel(messages=iter([AIMessage(content="hello big world")]))
+    )
+    assert list(llm.stream("Say hello")) == ["hello", " ", "big", " ", "world"]
+
+    # chat models without streaming return a single chunk, reported as a new token
+    llm = ChatModelWithLLMIface(
+        chat_model=FakeMessagesListChatModel(responses=[AIMessage(content="hello world")])
+    )
+    tokens_handler = NewTokensHandler()
+    assert list(llm.stream("Say hello", config={"callbacks": [tokens_handler]})) == ["hello world"]
+    assert tokens_handler.tokens == ["hello world"]
+
+
+@pytest.mark.asyncio
+async def test_chat_model_llm_iface_astream():
+    llm = ChatModelWithLLMIface(
+        chat_model=GenericFakeChatModel(messages=iter([AIMessage(content="hello big world")]))
+    )
+    assert [chunk async for chunk in llm.astream("Say hello")] == [
+        "hello",
+        " ",
+        "big",
+        " ",
+        "world",
+    ]
+
+    llm = ChatModelWithLLMIface(chat_model=SlowChatModel(responses=[]))
+    tokens_handler = NewTokensHandler()
+    assert [
+        chunk async for chunk in llm.astream("Say hello", config={"callbacks": [tokens_handler]})
+    ] == ["Say hello"]
+    assert tokens_handler.tokens == ["Say hello"]
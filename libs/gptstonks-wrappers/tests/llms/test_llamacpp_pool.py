@@ -0,0 +1,112 @@
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from langchain_core.language_models.llms import LLM
+
+from gptstonks.wrappers.llms import LlamaCppPool, LLMQueueFullError
+
+
+class EchoLLM(LLM):
+    """LLM that echoes the prompt with the PID of its process after a delay."""
+
+    model_path: str
+    n_threads: int
+    use_mmap: bool
+    delay: float = 0.5
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        time.sleep(self.delay)
+        return f"{os.getpid()} {prompt}"
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+
+@pytest.fixture(scope="module")
+def llm_pool():
+    llm_pool = LlamaCppPool(
+        model_path="model.gguf", num_workers=2, max_queue_size=2, llm_cls=EchoLLM
+    )
+    # wait until the model is loaded in both processes
+    llm_pool.batch(["warmup", "warmup"])
+    yield llm_pool
+    llm_pool.shutdown()
+
+
+def test_llamacpp_pool_dispatches_to_least_loaded(llm_pool):
+    async def run():
+        return await asyncio.gather(*(llm_pool.ainvoke(f"prompt {i}") for i in range(4)))
+
+    start = time.perf_counter()
+    outputs = asyncio.run(run())
+
+    # 4 prompts of 0.5 seconds in 2 replicas
+    assert time.perf_counter() - start < 1.5
+    assert [output.split(" ", 1)[1] for output in outputs] == [f"prompt {i}" for i in range(4)]
+    assert len({output.split(" ")[0] for output in outputs}) == 2
+    stats = llm_pool.stats
+    assert stats["requests"] == [3, 3]
+    assert stats["in_flight"] == [0, 0]
+    assert stats["generated_tokens"] == 16
+    assert stats["tokens_per_second"] > 0
+
+
+def test_llamacpp_pool_rejects_when_queue_is_full(llm_pool):
+    async def run():
+        return await asyncio.gather(*(llm_pool.ainvoke(f"prompt {i}") for i in range(5)))
+
+    with pytest.raises(LLMQueueFullError):
+        asyncio.run(run())
+
+
+def wait_until_idle(llm_pool: LlamaCppPool, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while llm_pool.stats["in_flight"] != [0] * llm_pool.num_workers:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_llamacpp_pool_restarts_killed_workers():
+    llm_pool = LlamaCppPool(model_path="model.gguf", num_workers=2, llm_cls=EchoLLM)
+    try:
+        pids = {int(output.split(" ")[0]) for output in llm_pool.batch(["warmup", "warmup"])}
+
+        async def run(return_exceptions: bool = False):
+            return await asyncio.gather(
+                *(llm_pool.ainvoke(f"prompt {i}") for i in range(2)),
+                return_exceptions=return_exceptions,
+            )
+
+        async def kill_while_generating():
+            task = asyncio.ensure_future(run(return_exceptions=True))
+            await asyncio.sleep(0.2)
+            for pid in pids:
+                os.kill(pid, signal.SIGKILL)
+            return await task
+
+        # wait for both prompts, so the next ones are dispatched to both replicas
+        outputs = asyncio.run(kill_while_generating())
+        assert all(isinstance(output, BrokenProcessPool) for output in outputs)
+        wait_until_idle(llm_pool)
+
+        outputs = asyncio.run(run())
+        new_pids = {int(output.split(" ")[0]) for output in outputs}
+        assert len(new_pids) == 2
+        assert new_pids.isdisjoint(pids)
+
+        # killed while idle
+        os.kill(new_pids.pop(), signal.SIGKILL)
+        time.sleep(1)
+        outputs = asyncio.run(run())
+        assert [output.split(" ", 1)[1] for output in outputs] == ["prompt 0", "prompt 1"]
+        assert llm_pool.stats["in_flight"] == [0, 0]
+    finally:
+        llm_pool.shutdown()
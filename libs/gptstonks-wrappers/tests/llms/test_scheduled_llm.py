@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.outputs import Generation, LLMResult
+
+from gptstonks.wrappers.llms import LLMQueueFullError, ScheduledLLM
+
+
+class EchoBatchLLM(FakeListLLM):
+    """LLM that echoes the prompts after a delay, recording the size of each batch."""
+
+    responses: list = []
+    delay: float = 0.05
+    batch_sizes: list = []
+
+    def _generate(self, prompts, stop=None, run_manager=None, **kwargs) -> LLMResult:
+        self.batch_sizes.append(len(prompts))
+        time.sleep(self.delay)
+        return LLMResult(generations=[[Generation(text=f"echo {prompt}")] for prompt in prompts])
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def test_scheduled_llm_sync():
+    llm = ScheduledLLM(llm=EchoBatchLLM(delay=0), token_counter=count_words)
+    assert llm.invoke("hello") == "echo hello"
+    assert llm._llm_type == "fake-list"
+    assert llm.stats["requests"] == 1
+    assert llm.stats["generated_tokens"] == 2
+    llm.shutdown()
+
+
+def test_scheduled_llm_batches_concurrent_prompts():
+    inner_llm = EchoBatchLLM()
+    llm = ScheduledLLM(llm=inner_llm, max_batch_size=4, max_wait=0.05, token_counter=count_words)
+
+    async def run():
+        return await asyncio.gather(*(llm.ainvoke(f"prompt {i}") for i in range(8)))
+
+    outputs = asyncio.run(run())
+
+    assert outputs == [f"echo prompt {i}" for i in range(8)]
+    assert inner_llm.batch_sizes == [4, 4]
+    stats = llm.stats
+    assert stats["batches"] == 2
+    assert stats["avg_batch_size"] == 4
+    assert stats["generated_tokens"] == 24
+    assert stats["tokens_per_second"] > 0
+    assert stats["queue_depth"] == 0
+    llm.shutdown()
+
+
+def test_scheduled_llm_does_not_batch_different_stop_words():
+    inner_llm = EchoBatchLLM(delay=0)
+    llm = ScheduledLLM(llm=inner_llm, max_batch_size=4, max_wait=0.05, token_counter=count_words)
+
+    async def run():
+        return await asyncio.gather(
+            llm.ainvoke("a", stop=["\n"]),
+            llm.ainvoke("b", stop=["Observation:"]),
+            llm.ainvoke("c", stop=["\n"]),
+        )
+
+    assert asyncio.run(run()) == ["echo a", "echo b", "echo c"]
+    assert sorted(inner_llm.batch_sizes) == [1, 2]
+    llm.shutdown()
+
+
+def test_scheduled_llm_rejects_when_queue_is_full():
+    inner_llm = EchoBatchLLM(delay=0.2)
+    llm = ScheduledLLM(llm=inner_llm, max_queue_size=1, token_counter=count_words)
+    # the first prompt is being generated and the second one waits in the queue
+    threads = [threading.Thread(target=llm.invoke, args=(prompt,)) for prompt in ("a", "b")]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+
+    with pytest.raises(LLMQueueFullError):
+        llm.invoke("c")
+    assert llm.stats["rejected"] == 1
+    for thread in threads:
+        thread.join()
+    llm.shutdown()
+
+
+def test_scheduled_llm_queue_timeout():
+    inner_llm = EchoBatchLLM(delay=0.2)
+    llm = ScheduledLLM(llm=inner_llm, queue_timeout=0.1, token_counter=count_words)
+    first = threading.Thread(target=llm.invoke, args=("a",))
+    first.start()
+    time.sleep(0.05)
+
+    with pytest.raises(TimeoutError):
+        llm.invoke("b")
+    assert llm.stats["timed_out"] == 1
+    first.join()
+    llm.shutdown()
+
+
+def test_scheduled_llm_propagates_errors():
+    class FailingLLM(EchoBatchLLM):
+        def _generate(self, prompts, stop=None, run_manager=None, **kwargs) -> LLMResult:
+            raise ValueError("out of memory")
+
+    llm = ScheduledLLM(llm=FailingLLM(), token_counter=count_words)
+    with pytest.raises(ValueError, match="out of memory"):
+        llm.invoke("a")
+    # the worker keeps serving prompts
+    with pytest.raises(ValueError, match="out of memory"):
+        llm.invoke("b")
+    llm.shutdown()
+
+
+def test_scheduled_llm_fails_batch_on_worker_errors():
+    def failing_counter(text: str) -> int:
+        raise OSError("tokenizer not available")
+
+    llm = ScheduledLLM(llm=EchoBatchLLM(delay=0), token_counter=failing_counter, timeout=5)
+    with pytest.raises(OSError, match="tokenizer not available"):
+        llm.invoke("a")
+
+    class MissingGenerationsLLM(EchoBatchLLM):
+        def _generate(self, prompts, stop=None, run_manager=None, **kwargs) -> LLMResult:
+            return LLMResult(generations=[])
+
+    llm = ScheduledLLM(llm=MissingGenerationsLLM(), token_counter=count_words, timeout=5)
+    with pytest.raises(ValueError, match="0 generations for 1 prompts"):
+        asyncio.run(llm.ainvoke("a"))
+    # the worker keeps serving prompts
+    with pytest.raises(ValueError, match="0 generations for 1 prompts"):
+        llm.invoke("b")
+    llm.shutdown()
+
+
+def test_scheduled_llm_timeout():
+    llm = ScheduledLLM(llm=EchoBatchLLM(delay=0.5), token_counter=count_words, timeout=0.1)
+
+    with pytest.raises(TimeoutError):
+        llm.invoke("a")
+    with pytest.raises(TimeoutError):
+        asyncio.run(llm.ainvoke("b"))
+    assert llm.stats["timed_out"] == 2
+    llm.shutdown()
+
+
+def test_scheduled_llm_counts_tokens_with_pipeline_tokenizer():
+    class Tokenizer:
+        def encode(self, text: str, add_special_tokens: bool = True) -> list[int]:
+            return [0] * len(text) + ([1] if add_special_tokens else [])
+
+    class Pipeline:
+        tokenizer = Tokenizer()
+
+    class PipelineLLM(EchoBatchLLM):
+        pipeline: Any = Pipeline()
+
+    llm = ScheduledLLM(llm=PipelineLLM(delay=0))
+    llm.invoke("a")
+    # "echo a", without special tokens
+    assert llm.stats["generated_tokens"] == 6
+    llm.shutdown()
@@ -0,0 +1,128 @@
+import zlib
+from typing import List
+
+import numpy as np
+import pytest
+from llama_index.core import StorageContext, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import TextNode
+
+from gptstonks.wrappers.kernels import AutoRag
+from gptstonks.wrappers.retrievers import SparseBM25Retriever
+from gptstonks.wrappers.vector_stores import NumpyVectorStore
+
+TEXTS = [
+    "obb.equity.price.historical: historical stock prices of a company",
+    "obb.equity.price.quote: latest quote of a stock",
+    "obb.news.company: news about a company",
+    "obb.crypto.price.historical: historical prices of a cryptocurrency",
+    "obb.economy.cpi: consumer price index of a country",
+    "obb.etf.holdings: holdings of an ETF",
+]
+QUERIES = ["historical prices of a stock", "crypto news", "ETF holdings", "unknown words"]
+
+
+class KeepTopNodes(BaseNodePostprocessor):
+    """Postprocessor that keeps the first `top_n` nodes."""
+
+    top_n: int = 1
+
+    def _postprocess_nodes(self, nodes, query_bundle=None):
+        return nodes[: self.top_n]
+
+
+class BagOfWordsEmbedding(MockEmbedding):
+    """Deterministic embeddings that count the hashed words, recording the batches of queries."""
+
+    query_batches: List[List[str]] = []
+
+    def _get_vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.embed_dim)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.embed_dim] += 1
+        return vector.tolist()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_vector(text)
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._get_vector(query)
+
+    def _get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        self.query_batches.append(queries)
+        return [self._get_vector(query) for query in queries]
+
+
+@pytest.fixture
+def index() -> VectorStoreIndex:
+    return VectorStoreIndex(
+        [TextNode(id_=f"node_{i}", text=text) for i, text in enumerate(TEXTS)],
+        storage_context=StorageContext.from_defaults(vector_store=NumpyVectorStore()),
+        embed_model=BagOfWordsEmbedding(embed_dim=16),
+    )
+
+
+def test_sparse_bm25_get_scores_many(index):
+    retriever = SparseBM25Retriever.from_defaults(index=index, similarity_top_k=3)
+    scores = retriever.get_scores_many(QUERIES)
+    assert scores.shape == (len(QUERIES), len(TEXTS))
+    for query, query_scores in zip(QUERIES, scores):
+        assert np.allclose(query_scores, retriever.get_scores(query))
+    for query, nodes in zip(QUERIES, retriever.retrieve_many(QUERIES)):
+        assert [n.node.node_id for n in nodes] == [
+            n.node.node_id for n in retriever.retrieve(query)
+        ]
+
+
+@pytest.mark.parametrize("retriever_type", ["hybrid", "vector", "bm25"])
+@pytest.mark.parametrize("query_embedding_cache_size", [0, 16])
+def test_auto_rag_retrieve_many(index, retriever_type, query_embedding_cache_size):
+    embed_model = BagOfWordsEmbedding(embed_dim=16)
+    auto_rag = AutoRag(
+        vsi=index,
+        embedding_model_id=embed_model,
+        llm_model=MockLLM(),
+        retriever_type=retriever_type,
+        bm25_retriever_type="sparse",
+        other_llama_index_vector_index_retriever_kwargs={
+            "similarity_top_k": 2,
+            "embed_model": embed_model,
+        },
+        other_hybrid_or_retriever_kwargs={"fusion_mode": "rrf"},
+        query_embedding_cache_size=query_embedding_cache_size,
+    )
+    nodes_per_query = auto_rag.retrieve_many(QUERIES)
+    if retriever_type != "bm25":
+        # all the queries are embedded as one batch
+        assert embed_model.query_batches == [QUERIES]
+
+    assert len(nodes_per_query) == len(QUERIES)
+    for query, nodes in zip(QUERIES, nodes_per_query):
+        expected_nodes = auto_rag.retrieve(query)
+        assert [n.node.node_id for n in nodes] == [n.node.node_id for n in expected_nodes]
+        assert [n.score for n in nodes] == pytest.approx([n.score for n in expected_nodes])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("top_n", [None, 1])
+async def test_auto_rag_aquery_many(index, top_n):
+    auto_rag = AutoRag(
+        vsi=index,
+        embedding_model_id=BagOfWordsEmbedding(embed_dim=16),
+        llm_model=MockLLM(),
+        retriever_type="hybrid",
+        bm25_retriever_type="sparse",
+        other_llama_index_retriever_query_engine_kwargs=(
+            {} if top_n is None else {"node_postprocessors": [KeepTopNodes(top_n=top_n)]}
+        ),
+    )
+    nodes_per_query = await auto_rag.aretrieve_many(QUERIES)
+    responses = await auto_rag.aquery_many(QUERIES, max_concurrency=2)
+    assert len(responses) == len(QUERIES)
+    for response, nodes in zip(responses, nodes_per_query):
+        # the postprocessors of the query engine are applied
+        assert [n.node.node_id for n in response.source_nodes] == [
+            n.node.node_id for n in nodes[:top_n]
+        ]
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import pytest
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from gptstonks.wrappers.retrievers import HybridORRetriever
+
+
+class FixedRetriever(BaseRetriever):
+    def __init__(self, scores: dict[str, float]):
+        super().__init__()
+        self.scores = scores
+        self.threads = []
+
+    def _retrieve(self, query_bundle):
+        self.threads.append(threading.current_thread())
+        return [
+            NodeWithScore(node=TextNode(id_=node_id, text=node_id), score=score)
+            for node_id, score in self.scores.items()
+        ]
+
+
+class AsyncFixedRetriever(FixedRetriever):
+    async def _aretrieve(self, query_bundle):
+        await asyncio.sleep(0)
+        return self._retrieve(query_bundle)
+
+
+def node_ids(nodes: list[NodeWithScore]) -> list[str]:
+    return [n.node.node_id for n in nodes]
+
+
+def test_hybrid_or_retriever_fusion_modes():
+    vector_retriever = FixedRetriever({"a": 0.9, "b": 0.8, "c": 0.1})
+    bm25_retriever = FixedRetriever({"c": 12.0, "d": 3.0})
+
+    # union, without duplicates
+    retriever = HybridORRetriever(vector_retriever, bm25_retriever)
+    assert node_ids(retriever.retrieve("query")) == ["c", "d", "a", "b"]
+
+    # "c" is retrieved by both, so it goes first
+    retriever = HybridORRetriever(vector_retriever, bm25_retriever, fusion_mode="rrf")
+    assert node_ids(retriever.retrieve("query"))[0] == "c"
+
+    retriever = HybridORRetriever(
+        vector_retriever,
+        bm25_retriever,
+        fusion_mode="weighted",
+        weights=(0.9, 0.1),
+        similarity_top_k=2,
+    )
+    nodes = retriever.retrieve("query")
+    assert node_ids(nodes) == ["a", "b"]
+    assert nodes[0].score == pytest.approx(0.9)
+
+    with pytest.raises(ValueError):
+        HybridORRetriever(vector_retriever, bm25_retriever, fusion_mode="max")
+
+
+@pytest.mark.asyncio
+async def test_hybrid_or_retriever_async():
+    vector_retriever = AsyncFixedRetriever({"a": 0.9, "b": 0.8})
+    bm25_retriever = FixedRetriever({"b": 5.0, "c": 1.0})
+    retriever = HybridORRetriever(vector_retriever, bm25_retriever, fusion_mode="rrf")
+
+    nodes = await retriever.aretrieve("query")
+    assert node_ids(nodes) == node_ids(retriever.retrieve("query"))
+    assert node_ids(nodes)[0] == "b"
+    # the sync-only retriever ran outside the event loop's thread
+    assert bm25_retriever.threads[0] is not threading.main_thread()
+    assert vector_retriever.threads[0] is threading.main_thread()
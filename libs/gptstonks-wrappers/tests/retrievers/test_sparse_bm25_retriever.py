@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+from llama_index.core import VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+from llama_index.retrievers.bm25 import BM25Retriever
+
+from gptstonks.wrappers.kernels import AutoRag
+from gptstonks.wrappers.retrievers import HybridORRetriever, SparseBM25Retriever
+
+TEXTS = [
+    "obb.equity.price.historical: historical stock prices of a company",
+    "obb.equity.price.quote: latest quote of a stock",
+    "obb.news.company: news about a company",
+    "obb.crypto.price.historical: historical prices of a cryptocurrency",
+    "obb.economy.cpi: consumer price index of a country",
+]
+
+
+@pytest.fixture
+def index() -> VectorStoreIndex:
+    return VectorStoreIndex(
+        [TextNode(id_=f"node_{i}", text=text) for i, text in enumerate(TEXTS)],
+        embed_model=MockEmbedding(embed_dim=4),
+    )
+
+
+def test_sparse_bm25_same_scores(index):
+    sparse_retriever = SparseBM25Retriever.from_defaults(index=index, similarity_top_k=3)
+    retriever = BM25Retriever.from_defaults(index=index, similarity_top_k=3)
+
+    for query in ["historical prices of a stock", "crypto news", "unknown words"]:
+        expected_nodes = retriever.retrieve(query)
+        nodes = sparse_retriever.retrieve(query)
+        assert [n.score for n in nodes] == pytest.approx([n.score for n in expected_nodes])
+    assert sparse_retriever.retrieve("historical stock prices")[0].node.node_id == "node_0"
+
+
+def test_sparse_bm25_persistence(index, tmp_path):
+    retriever = SparseBM25Retriever.from_defaults(index=index, persist_dir=str(tmp_path))
+    assert os.path.exists(tmp_path / "bm25_metadata.json")
+
+    loaded_retriever = SparseBM25Retriever.from_defaults(index=index, persist_dir=str(tmp_path))
+    # memory-mapped, so read-only
+    assert not loaded_retriever._matrix.data.flags.writeable
+    assert np.allclose(
+        loaded_retriever.get_scores("historical prices"), retriever.get_scores("historical prices")
+    )
+
+    # rebuilt if the docstore changes
+    index.insert_nodes([TextNode(id_="node_new", text="obb.etf.holdings: holdings of an ETF")])
+    with pytest.warns(UserWarning, match="does not match"):
+        rebuilt_retriever = SparseBM25Retriever.from_defaults(
+            index=index, persist_dir=str(tmp_path)
+        )
+    assert "node_new" in rebuilt_retriever.node_ids
+
+    # rebuilt if the text of a node or the BM25 parameters change
+    index.docstore.add_documents([TextNode(id_="node_new", text="obb.etf.info: info of an ETF")])
+    with pytest.warns(UserWarning, match="does not match"):
+        SparseBM25Retriever.from_defaults(index=index, persist_dir=str(tmp_path))
+    with pytest.warns(UserWarning, match="does not match"):
+        SparseBM25Retriever.from_defaults(index=index, persist_dir=str(tmp_path), k1=1.2)
+    assert sorted(os.listdir(tmp_path)) == [
+        "bm25_data.npy",
+        "bm25_indices.npy",
+        "bm25_indptr.npy",
+        "bm25_metadata.json",
+    ]
+
+
+def test_sparse_bm25_in_auto_rag(index, tmp_path):
+    index.storage_context.persist(persist_dir=str(tmp_path))
+    embed_model = MockEmbedding(embed_dim=4)
+    auto_rag = AutoRag(
+        vsi=f"vsi:{tmp_path}",
+        embedding_model_id=embed_model,
+        llm_model=MockLLM(),
+        retriever_type="hybrid",
+        bm25_retriever_type="sparse",
+        other_hybrid_or_retriever_kwargs={"fusion_mode": "rrf"},
+    )
+
+    assert isinstance(auto_rag._retriever, HybridORRetriever)
+    assert isinstance(auto_rag._retriever.retriever2, SparseBM25Retriever)
+    assert os.path.exists(tmp_path / "bm25_metadata.json")
+    assert len(auto_rag.retrieve("historical stock prices")) > 0
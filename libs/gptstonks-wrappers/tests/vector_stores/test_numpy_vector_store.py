@@ -0,0 +1,90 @@
+import numpy as np
+from llama_index.core import (
+    MockEmbedding,
+    QueryBundle,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores import SimpleVectorStore, VectorStoreQuery
+
+from gptstonks.wrappers.vector_stores import NumpyVectorStore, convert_vsi_to_npy
+
+
+def create_nodes(num_nodes: int = 20, dim: int = 8) -> list[TextNode]:
+    rng = np.random.default_rng(0)
+    return [
+        TextNode(
+            id_=f"node_{i}",
+            text=f"text {i}",
+            embedding=rng.normal(size=dim).tolist(),
+        )
+        for i in range(num_nodes)
+    ]
+
+
+def test_numpy_vector_store_matches_simple_vector_store(tmp_path):
+    nodes = create_nodes()
+    simple_store = SimpleVectorStore()
+    simple_store.add(nodes)
+    numpy_store = NumpyVectorStore()
+    numpy_store.add(nodes)
+
+    query = VectorStoreQuery(query_embedding=nodes[3].embedding, similarity_top_k=5)
+    simple_res = simple_store.query(query)
+    numpy_res = numpy_store.query(query)
+    assert numpy_res.ids == simple_res.ids
+    assert np.allclose(numpy_res.similarities, simple_res.similarities, atol=1e-5)
+    assert numpy_res.ids[0] == "node_3"
+
+    # persisted and memory-mapped
+    numpy_store.persist(str(tmp_path / "default__vector_store.json"))
+    loaded_store = NumpyVectorStore.from_persist_dir(str(tmp_path))
+    assert isinstance(loaded_store._embeddings, np.memmap)
+    assert loaded_store.query(query).ids == numpy_res.ids
+
+    # restricted to some nodes
+    query.node_ids = ["node_1", "node_2"]
+    assert set(loaded_store.query(query).ids) == {"node_1", "node_2"}
+
+
+def test_convert_vsi_to_npy(tmp_path):
+    nodes = create_nodes()
+    index = VectorStoreIndex(nodes, embed_model=MockEmbedding(embed_dim=8))
+    index.storage_context.persist(persist_dir=str(tmp_path / "vsi"))
+
+    convert_vsi_to_npy(str(tmp_path / "vsi"), str(tmp_path / "vsi_npy"))
+    storage_context = StorageContext.from_defaults(
+        persist_dir=str(tmp_path / "vsi_npy"),
+        vector_store=NumpyVectorStore.from_persist_dir(str(tmp_path / "vsi_npy")),
+    )
+    loaded_index = load_index_from_storage(
+        storage_context=storage_context, embed_model=MockEmbedding(embed_dim=8)
+    )
+    retrieved_nodes = loaded_index.as_retriever(similarity_top_k=2).retrieve(
+        QueryBundle(query_str="text 5", embedding=nodes[5].embedding)
+    )
+    assert retrieved_nodes[0].node.node_id == "node_5"
+    assert retrieved_nodes[0].node.text == "text 5"
+
+
+def test_numpy_vector_store_query_many():
+    nodes = create_nodes()
+    numpy_store = NumpyVectorStore()
+    numpy_store.add(nodes)
+
+    queries = [
+        VectorStoreQuery(query_embedding=nodes[i].embedding, similarity_top_k=3) for i in range(5)
+    ]
+    queries.append(
+        VectorStoreQuery(
+            query_embedding=nodes[0].embedding, similarity_top_k=3, node_ids=["node_1", "node_2"]
+        )
+    )
+    results = numpy_store.query_many(queries)
+    for query, result in zip(queries, results):
+        expected_result = numpy_store.query(query)
+        assert result.ids == expected_result.ids
+        assert np.allclose(result.similarities, expected_result.similarities, atol=1e-5)
+    assert set(results[-1].ids) == {"node_1", "node_2"}
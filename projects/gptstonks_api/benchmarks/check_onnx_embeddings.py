@@ -0,0 +1,172 @@
+"""Check that an `onnx:` embedding model retrieves the same OpenBB nodes as its float model.
+
+The queries are embedded with both models and run against the bundled OpenBB vector store index.
+The cosine similarity between the query embeddings and the overlap of the top-k retrieved nodes
+are compared with the tolerances, exiting with code 1 if they are not met. The results, including
+the embedding latency of both models, are saved as JSON.
+
+Usage (from `projects/gptstonks_api`, with the `onnx` extra of `gptstonks-wrappers` installed):
+
+    python benchmarks/check_onnx_embeddings.py --reference local:BAAI/bge-base-en-v1.5 \
+        --candidate onnx:BAAI/bge-base-en-v1.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from llama_index.core import QueryBundle, StorageContext, load_index_from_storage
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+from gptstonks.wrappers.embeddings import resolve_embed_model
+
+DEFAULT_VSI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "gptstonks",
+    "api",
+    "data",
+    "openbb_v4.1.0_historical_vectorstoreindex_bgebaseen",
+)
+# typical inputs of the OpenBB tool sent by the agent
+DEFAULT_QUERIES = [
+    "historical stock prices of AAPL",
+    "latest quote of TSLA",
+    "income statement of MSFT",
+    "balance sheet of NVDA",
+    "cash flow statement of AMZN",
+    "company news about GOOGL",
+    "historical prices of Bitcoin in USD",
+    "EUR/USD exchange rate history",
+    "US treasury rates",
+    "options chains of SPY",
+    "insider trading of META",
+    "dividends paid by KO",
+    "market cap and key metrics of JPM",
+    "ETF holdings of QQQ",
+    "consumer price index of the United States",
+    "short interest of GME",
+    "earnings calendar",
+    "analyst price targets of NFLX",
+    "institutional ownership of AMD",
+    "historical prices of the S&P 500 index",
+]
+
+
+def embed_queries(embed_model: BaseEmbedding, queries: list[str]) -> tuple[np.ndarray, float]:
+    """Embed the queries one by one, as the API does, returning the embeddings and the mean latency
+    in seconds."""
+    embeddings = []
+    start = time.perf_counter()
+    for query in queries:
+        embeddings.append(embed_model.get_query_embedding(query))
+    mean_latency = (time.perf_counter() - start) / len(queries)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=-1, keepdims=True), mean_latency
+
+
+def check_onnx_embeddings(args: argparse.Namespace) -> dict:
+    reference_model = resolve_embed_model(args.reference)
+    candidate_model = resolve_embed_model(
+        args.candidate, quantize=not args.no_quantize, intra_op_num_threads=args.num_threads
+    )
+    queries = DEFAULT_QUERIES
+    if args.queries_file is not None:
+        with open(args.queries_file) as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    # warm up, so the latencies do not include lazy initializations
+    reference_model.get_query_embedding(queries[0])
+    candidate_model.get_query_embedding(queries[0])
+    reference_embeddings, reference_latency = embed_queries(reference_model, queries)
+    candidate_embeddings, candidate_latency = embed_queries(candidate_model, queries)
+    cosine_similarities = (reference_embeddings * candidate_embeddings).sum(axis=-1)
+
+    # the embeddings are given to the retriever, so the embedding model of the index is not used
+    index = load_index_from_storage(
+        StorageContext.from_defaults(persist_dir=args.vsi_path), embed_model=reference_model
+    )
+    retriever = index.as_retriever(similarity_top_k=args.top_k)
+    overlaps, top1_matches = [], []
+    for query, reference_embedding, candidate_embedding in zip(
+        queries, reference_embeddings, candidate_embeddings
+    ):
+        reference_ids = [
+            n.node.node_id
+            for n in retriever.retrieve(QueryBundle(query, embedding=reference_embedding.tolist()))
+        ]
+        candidate_ids = [
+            n.node.node_id
+            for n in retriever.retrieve(QueryBundle(query, embedding=candidate_embedding.tolist()))
+        ]
+        overlaps.append(len(set(reference_ids) & set(candidate_ids)) / max(len(reference_ids), 1))
+        top1_matches.append(reference_ids[:1] == candidate_ids[:1])
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": vars(args),
+        "num_queries": len(queries),
+        "query_cosine_similarity": {
+            "mean": float(cosine_similarities.mean()),
+            "min": float(cosine_similarities.min()),
+        },
+        "top_k_overlap": {"mean": float(np.mean(overlaps)), "min": float(np.min(overlaps))},
+        "top1_agreement": float(np.mean(top1_matches)),
+        "mean_query_latency_seconds": {
+            "reference": reference_latency,
+            "candidate": candidate_latency,
+        },
+    }
+    report["passed"] = (
+        report["query_cosine_similarity"]["min"] >= args.min_cosine
+        and report["top_k_overlap"]["mean"] >= args.min_overlap
+    )
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--reference", default="local:BAAI/bge-base-en-v1.5")
+    parser.add_argument("--candidate", default="onnx:BAAI/bge-base-en-v1.5")
+    parser.add_argument("--no-quantize", action="store_true", help="Use the float ONNX model.")
+    parser.add_argument("--num-threads", type=int, default=None, help="ONNX intra-op threads.")
+    parser.add_argument("--vsi-path", default=DEFAULT_VSI_PATH)
+    parser.add_argument("--queries-file", default=None, help="Text file with one query per line.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--min-cosine",
+        type=float,
+        default=0.98,
+        help="Min. cosine similarity between the query embeddings of both models.",
+    )
+    parser.add_argument(
+        "--min-overlap",
+        type=float,
+        default=0.8,
+        help="Min. mean fraction of shared nodes in the top-k of both models.",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSON file to save the results. Default: benchmarks/results/onnx_check_{timestamp}.json",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = check_onnx_embeddings(args)
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        f"onnx_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results saved to {output}")
+    sys.exit(0 if report["passed"] else 1)
@@ -0,0 +1,164 @@
+"""Deterministic stand-ins for the external services used by the API, for offline benchmarks."""
+
+import asyncio
+import re
+import time
+from typing import Any
+
+from langchain.agents import AgentExecutor, Tool, create_react_agent
+from langchain_core.language_models.llms import LLM
+from langchain_core.prompts import PromptTemplate
+
+from gptstonks.api.constants import REACT_PROMPT_TEMPLATE
+from gptstonks.api.executors import OpenBBCodeExecutor
+from gptstonks.api.models import AppData
+
+# Queries can choose the tool called by the fake LLM with this tag, e.g. "[tool:OpenBB] AAPL price"
+TOOL_TAG_REGEX = re.compile(r"\[tool:(\w+)\]")
+
+
+class ScriptedReActLLM(LLM):
+    """Fake LLM that follows the ReAct format with scripted tool choices.
+
+    The first call of each query selects the tool in the query's `[tool:{name}]` tag (or
+    `default_tool`). Once there is an observation in the prompt, it gives the final answer. The tag
+    `[tool:none]` gives the final answer directly.
+
+    Args:
+        latency (`float`): seconds to wait in each call, simulating the generation.
+        default_tool (`str`): tool used when the query has no tag.
+    """
+
+    latency: float = 0.0
+    default_tool: str = "world_knowledge"
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-react"
+
+    def _generate_text(self, prompt: str) -> str:
+        scratchpad = prompt.split("Begin!")[-1]
+        if "Observation:" in scratchpad:
+            return "Thought: I now know the final answer\nFinal Answer: Scripted answer."
+        question = scratchpad.split("Question:")[-1].split("\n")[0].strip()
+        tool_match = TOOL_TAG_REGEX.search(question)
+        tool = tool_match.group(1) if tool_match is not None else self.default_tool
+        if tool == "none":
+            return "Thought: I now know the final answer\nFinal Answer: Scripted answer."
+        return f"Thought: I should use {tool}\nAction: {tool}\nAction Input: {question}"
+
+    def _call(self, prompt: str, stop: list[str] | None = None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self._generate_text(prompt)
+
+    async def _acall(self, prompt: str, stop: list[str] | None = None, **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency)
+        return self._generate_text(prompt)
+
+
+class StubCodeExecutor(OpenBBCodeExecutor):
+    """Code executor that returns fixed OpenBB data after `latency` seconds, without workers."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(num_workers=0)
+        self.latency = latency
+
+    def start(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    async def arun(self, code: str, openbb_pat: str | None = None) -> str:
+        await asyncio.sleep(self.latency)
+        return '[{"date": "2024-01-02", "close": 185.64}, {"date": "2024-01-03", "close": 184.25}]'
+
+
+def create_stub_tools(latency: float = 0.0) -> list[Tool]:
+    """Create the agent's tools (OpenBB and world_knowledge) with fixed outputs."""
+
+    async def openbb_tool(query: str) -> str:
+        await asyncio.sleep(latency)
+        return "```python\nres = obb.equity.price.historical('AAPL', provider='yfinance')\n```"
+
+    async def world_knowledge_tool(query: str) -> str:
+        await asyncio.sleep(latency)
+        return "Scripted search results about the query."
+
+    return [
+        Tool(
+            name="OpenBB",
+            func=None,
+            coroutine=openbb_tool,
+            description="useful to get financial and investing data.",
+            return_direct=False,
+        ),
+        Tool(
+            name="world_knowledge",
+            func=None,
+            coroutine=world_knowledge_tool,
+            description="useful to search on the Internet current events and news.",
+            return_direct=False,
+        ),
+    ]
+
+
+class InMemoryCollection:
+    """Minimal async stand-in of a `motor` collection, enough for the tokens."""
+
+    def __init__(self):
+        self.documents: list[dict] = []
+
+    async def find_one(self, filter: dict | None = None, projection: dict | None = None):
+        if len(self.documents) == 0:
+            return None
+        return {k: v for k, v in self.documents[0].items() if k != "_id"}
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False):
+        if len(self.documents) == 0:
+            if not upsert:
+                return
+            self.documents.append({})
+        self.documents[0].update(update.get("$set", {}))
+
+
+class InMemoryDatabase:
+    """Minimal async stand-in of a `motor` database."""
+
+    def __init__(self):
+        self._collections: dict[str, InMemoryCollection] = {}
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, InMemoryCollection())
+
+    async def command(self, command: str) -> dict:
+        return {"ok": 1.0}
+
+
+def init_fake_api(
+    app_data: AppData,
+    llm_latency: float = 0.0,
+    tool_latency: float = 0.0,
+    code_latency: float = 0.0,
+):
+    """Replacement of `init_api` that uses the fake LLM, tools and code executor.
+
+    Args:
+        app_data (`AppData`): global application data.
+        llm_latency (`float`): seconds per LLM call.
+        tool_latency (`float`): seconds per tool call.
+        code_latency (`float`): seconds per OpenBB code execution.
+    """
+    llm = ScriptedReActLLM(latency=llm_latency)
+    tools = create_stub_tools(latency=tool_latency)
+    agent = create_react_agent(
+        tools=tools, llm=llm, prompt=PromptTemplate.from_template(REACT_PROMPT_TEMPLATE)
+    )
+    app_data.agent_executor = AgentExecutor(
+        agent=agent,
+        tools=tools,
+        return_intermediate_steps=True,
+    )
+    app_data.code_executor = StubCodeExecutor(latency=code_latency)
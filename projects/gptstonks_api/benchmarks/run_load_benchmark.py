@@ -0,0 +1,221 @@
+"""Offline load test of the API.
+
+The FastAPI app is served with uvicorn using a fake LLM, stubbed tools and an in-memory MongoDB
+(see `fakes.py`), so no external service is called. N concurrent clients send queries and the
+latency percentiles, throughput and event-loop lag of the server are saved as JSON.
+
+Usage (from `projects/gptstonks_api`):
+
+    python benchmarks/run_load_benchmark.py --num-requests 500 --concurrency 32 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+# Required env variables, before importing the API
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DBNAME", "mongodb")
+os.environ.setdefault("AUTOLLAMAINDEX_VSI_PATH", "vsi:./unused")
+os.environ.setdefault("OPENBBCHAT_TOOL_DESCRIPTION", "useful to get financial data.")
+os.environ.setdefault("WORLD_KNOWLEDGE_TOOL_DESCRIPTION", "useful to search on the Internet.")
+os.environ.setdefault("LLM_MODEL_ID", "fake:scripted-react")
+
+import httpx
+import numpy as np
+import uvicorn
+from fakes import InMemoryDatabase, init_fake_api
+
+import gptstonks.api.databases.tokens as tokens_db
+import gptstonks.api.main as main
+
+
+def summarize(values: list[float]) -> dict[str, float | None]:
+    """Compute the mean, maximum and p50/p95/p99 percentiles of a list of values."""
+    if len(values) == 0:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+    return {"mean": float(np.mean(values)), "p50": p50, "p95": p95, "p99": p99, "max": max(values)}
+
+
+async def monitor_event_loop_lag(lags: list[float], stop: threading.Event, interval: float):
+    """Measure how late the event loop wakes up from a sleep, until `stop` is set."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(time.perf_counter() - start - interval, 0.0))
+
+
+async def send_query(
+    client: httpx.AsyncClient, endpoint: str, query: str, poll_interval: float
+) -> dict:
+    """Send one query, polling the job if needed, and measure its latency."""
+    start = time.perf_counter()
+    res = await client.post(f"/{endpoint}", json={"query": query})
+    res.raise_for_status()
+    job = res.json()
+    if endpoint == "process_query_async":
+        while job["status"] in ("pending", "running"):
+            await asyncio.sleep(poll_interval)
+            res = await client.get(f"/jobs/{job['job_id']}")
+            res.raise_for_status()
+            job = res.json()
+        response = job["result"]
+    else:
+        response = job
+    return {
+        "latency": time.perf_counter() - start,
+        "error": response is None or response["type"] == "error",
+        "queue_time": job.get("queue_time_seconds"),
+        "run_time": job.get("run_time_seconds"),
+    }
+
+
+async def run_clients(args: argparse.Namespace, base_url: str) -> tuple[list[dict], float]:
+    """Run `concurrency` clients until `num_requests` queries are sent."""
+    tools = args.tools.split(",")
+    queries = [
+        f"[tool:{tools[i % len(tools)]}] query number {i}" for i in range(args.num_requests)
+    ]
+    results = []
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.concurrency),
+    ) as client:
+
+        async def client_worker():
+            while len(queries) > 0:
+                query = queries.pop()
+                try:
+                    results.append(
+                        await send_query(client, args.endpoint, query, args.poll_interval)
+                    )
+                except Exception as e:
+                    print(f"Request failed: {e!r}")
+                    results.append({"latency": None, "error": True})
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client_worker() for _ in range(args.concurrency)])
+        return results, time.perf_counter() - start
+
+
+def start_server(host: str, port: int) -> tuple[uvicorn.Server, asyncio.AbstractEventLoop]:
+    """Start uvicorn in a background thread, returning the server and its event loop."""
+    server = uvicorn.Server(
+        uvicorn.Config(main.app, host=host, port=port, log_level="warning", lifespan="on")
+    )
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_until_complete, args=(server.serve(),), daemon=True).start()
+    return server, loop
+
+
+def wait_until_ready(base_url: str, timeout: float = 60):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            if httpx.get(f"{base_url}/health/ready").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError("The API did not become ready")
+
+
+def main_load_test(args: argparse.Namespace) -> dict:
+    # Replace the external services with the fakes
+    tokens_db.db = InMemoryDatabase()
+    main.init_api = partial(
+        init_fake_api,
+        llm_latency=args.llm_latency,
+        tool_latency=args.tool_latency,
+        code_latency=args.code_latency,
+    )
+
+    base_url = f"http://{args.host}:{args.port}"
+    server, server_loop = start_server(args.host, args.port)
+    wait_until_ready(base_url)
+
+    lags = []
+    stop_monitor = threading.Event()
+    asyncio.run_coroutine_threadsafe(
+        monitor_event_loop_lag(lags, stop_monitor, args.lag_interval), server_loop
+    )
+    try:
+        results, elapsed = asyncio.run(run_clients(args, base_url))
+    finally:
+        stop_monitor.set()
+        server.should_exit = True
+
+    latencies = [r["latency"] for r in results if not r["error"]]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "platform": {"python": platform.python_version(), "machine": platform.machine()},
+        "config": vars(args),
+        "num_requests": len(results),
+        "num_errors": sum(r["error"] for r in results),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "latency_seconds": summarize(latencies),
+        "job_queue_time_seconds": summarize(
+            [r["queue_time"] for r in results if r.get("queue_time") is not None]
+        ),
+        "job_run_time_seconds": summarize(
+            [r["run_time"] for r in results if r.get("run_time") is not None]
+        ),
+        "event_loop_lag_seconds": summarize(lags),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="No. concurrent clients.")
+    parser.add_argument(
+        "--endpoint",
+        choices=["process_query_async", "process_query"],
+        default="process_query_async",
+    )
+    parser.add_argument(
+        "--tools",
+        default="OpenBB,world_knowledge,none",
+        help="Comma-separated tools chosen by the fake LLM, cycled over the queries.",
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per LLM call.")
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Seconds per tool call.")
+    parser.add_argument(
+        "--code-latency", type=float, default=0.05, help="Seconds per OpenBB code execution."
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.01)
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSON file to save the results. Default: benchmarks/results/load_test_{timestamp}.json",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = main_load_test(args)
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results saved to {output}")
@@ -1 +1,2 @@
 from .run_background import run_agent_in_background as run_agent_in_background
+from .stream_events import stream_agent_events as stream_agent_events
@@ -1,16 +1,76 @@
 import json
+import time
 
-from ..databases import db
+from gptstonks.wrappers.llms import LLMQueueFullError
+
+from ..databases import get_openbb_pat
 from ..explicability import add_context_to_output
+from ..metrics import (
+    RequestTimings,
+    create_agent_callbacks,
+    current_request_timings,
+    observe_agent_callbacks,
+    time_stage,
+)
 from ..models import AppData, BaseAgentResponse, DataAgentResponse
 from ..utils import run_repl_over_openbb
 
 
+async def process_agent_output(
+    agent_res: dict, openbb_pat: str | None, app_data: AppData
+) -> BaseAgentResponse | DataAgentResponse:
+    """Build the API response from the output of the agent.
+
+    If the last step of the agent is OpenBB, the generated code is run to retrieve the data.
+    Otherwise, the context is added to the agent's output.
+
+    Args:
+        agent_res (dict): Output of the `AgentExecutor`, including the intermediate steps.
+        openbb_pat (str | None): User's OpenBB PAT.
+        app_data (AppData): Objects needed to run the agent successfully.
+
+    Returns:
+        BaseAgentResponse | DataAgentResponse: Response to the query.
+    """
+
+    # If last step is OpenBB, run code
+    if (
+        len(agent_res["intermediate_steps"]) > 0
+        and agent_res["intermediate_steps"][-1][0].tool == "OpenBB"
+    ):
+        output_str = await run_repl_over_openbb(
+            openbb_chat_output=agent_res["intermediate_steps"][-1][1],
+            code_executor=app_data.code_executor,
+            openbb_pat=openbb_pat,
+        )
+        if "```json" in output_str:
+            try:
+                with time_stage("json_parsing"):
+                    result_data_str = output_str.split("```json")[1].split("```")[0].strip()
+                    result_data = json.loads(result_data_str)
+                    body_data_str = output_str.split("```json")[0].strip()
+
+                return DataAgentResponse(type="data", result_data=result_data, body=body_data_str)
+            except Exception as e:
+                return BaseAgentResponse(type="data", body=output_str)
+    else:
+        output_str = add_context_to_output(
+            output=agent_res["output"],
+            tools_executed=[step[0].tool for step in agent_res["intermediate_steps"]],
+        )
+    return BaseAgentResponse(type="data", body=output_str)
+
+
 async def run_agent_in_background(
     query: str, app_data: AppData
 ) -> BaseAgentResponse | DataAgentResponse:
     """Background task to process the query using the `langchain` agent.
 
+    The time spent in each stage of the request is returned in the `timings` field of the
+    response: `agent` (whole agent run), `llm` (LLM calls planning the agent steps), `tool.{name}`
+    (e.g., `tool.world_knowledge` for the search), `retrieval` and `synthesis` (RAG of the OpenBB
+    tool), `code_execution`, `json_parsing` and `total`.
+
     Args:
         query (str): User query to process.
         app_data (AppData): Objects needed to run the agent successfully.
@@ -19,44 +79,56 @@ async def run_agent_in_background(
         BaseAgentResponse | DataAgentResponse: Response to the query.
     """
 
+    start_time = time.perf_counter()
+    request_timings = RequestTimings()
+    timings_token = current_request_timings.set(request_timings)
     try:
-        openbb_pat_mongo = db.tokens.find_one({}, {"_id": 0, "openbb": 1}).get("openbb")
-        openbb_pat = (
-            str(openbb_pat_mongo) if openbb_pat_mongo is not None else openbb_pat_mongo
-        )  # Retrieve OpenBB PAT from database
+        response = await _run_agent(query=query, app_data=app_data)
+    except LLMQueueFullError:
+        response = BaseAgentResponse(
+            type="error", body="The model is busy right now, try again later."
+        )
+    except Exception as e:
+        print("Overall exception happened: " + str(e))
+        response = BaseAgentResponse(type="error", body="Sorry, something went wrong!")
+    finally:
+        current_request_timings.reset(timings_token)
+    request_timings.add("total", time.perf_counter() - start_time)
+    return response.model_copy(update={"timings": request_timings.to_dict()})
+
+
+async def _run_agent(query: str, app_data: AppData) -> BaseAgentResponse | DataAgentResponse:
+    # Reuse the response of an equivalent query, if any
+    if app_data.response_cache is not None:
+        with time_stage("cache_lookup"):
+            query_embedding = await app_data.response_cache.aembed_query(query)
+            cached_response = app_data.response_cache.get(query_embedding)
+        if cached_response is not None:
+            return cached_response
 
-        # Run agent. Best responses but high quality LLMs needed (e.g., Claude Instant or GPT-3.5)
+    openbb_pat = await get_openbb_pat()  # Retrieve OpenBB PAT from cache or database
+
+    # Run agent. Best responses but high quality LLMs needed (e.g., Claude Instant or GPT-3.5)
+    agent_callbacks = create_agent_callbacks()
+    with time_stage("agent"):
         agent_res = await app_data.agent_executor.ainvoke(
             {"input": query},
+            config={"callbacks": list(agent_callbacks)},
         )
+    observe_agent_callbacks(*agent_callbacks)
+    request_timings = current_request_timings.get()
+    llm_time_callback, tool_time_callback, _ = agent_callbacks
+    request_timings.add("llm", llm_time_callback.total_llm_execution_time_seconds)
+    for tool_name, tool_time_seconds in tool_time_callback.tools_executions_times_seconds:
+        request_timings.add(f"tool.{tool_name}", tool_time_seconds)
 
-        # If last step is OpenBB, run code
-        if (
-            len(agent_res["intermediate_steps"]) > 0
-            and agent_res["intermediate_steps"][-1][0].tool == "OpenBB"
-        ):
-            output_str = run_repl_over_openbb(
-                openbb_chat_output=agent_res["intermediate_steps"][-1][1],
-                python_repl_utility=app_data.python_repl_utility,
-                openbb_pat=openbb_pat,
-            )
-            if "```json" in output_str:
-                try:
-                    result_data_str = output_str.split("```json")[1].split("```")[0].strip()
-                    result_data = json.loads(result_data_str)
-                    body_data_str = output_str.split("```json")[0].strip()
-
-                    return DataAgentResponse(
-                        type="data", result_data=result_data, body=body_data_str
-                    )
-                except Exception as e:
-                    return BaseAgentResponse(type="data", body=output_str)
-        else:
-            output_str = add_context_to_output(
-                output=agent_res["output"],
-                tools_executed=[step[0].tool for step in agent_res["intermediate_steps"]],
-            )
-        return BaseAgentResponse(type="data", body=output_str)
-    except Exception as e:
-        print("Overall exception happened: " + str(e))
-        return BaseAgentResponse(type="error", body="Sorry, something went wrong!")
+    response = await process_agent_output(
+        agent_res=agent_res, openbb_pat=openbb_pat, app_data=app_data
+    )
+    if app_data.response_cache is not None:
+        app_data.response_cache.put(
+            query_embedding,
+            response,
+            tools_executed=[step[0].tool for step in agent_res["intermediate_steps"]],
+        )
+    return response
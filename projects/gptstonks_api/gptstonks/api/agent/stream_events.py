@@ -0,0 +1,91 @@
+import json
+from typing import AsyncIterator
+
+from ..databases import get_openbb_pat
+from ..metrics import create_agent_callbacks, observe_agent_callbacks
+from ..models import AppData, BaseAgentResponse
+from .run_background import process_agent_output
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Event (SSE) frame.
+
+    Args:
+        event (str): Name of the event.
+        data (dict): JSON-serializable payload of the event.
+
+    Returns:
+        str: SSE frame, ending with a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_agent_events(query: str, app_data: AppData) -> AsyncIterator[str]:
+    """Process the query using the `langchain` agent, streaming its progress as SSE frames.
+
+    The following events are sent:
+
+    - `token`: new token generated by an LLM.
+    - `tool_start`: a tool (e.g., OpenBB or world_knowledge) started running, with its input.
+    - `tool_end`: a tool finished running, with its output.
+    - `response`: final `BaseAgentResponse` or `DataAgentResponse`. It is always the last event.
+
+    Args:
+        query (str): User query to process.
+        app_data (AppData): Objects needed to run the agent successfully.
+
+    Yields:
+        str: SSE frames.
+    """
+
+    try:
+        # Reuse the response of an equivalent query, if any
+        if app_data.response_cache is not None:
+            query_embedding = await app_data.response_cache.aembed_query(query)
+            cached_response = app_data.response_cache.get(query_embedding)
+            if cached_response is not None:
+                yield format_sse("response", cached_response.model_dump())
+                return
+
+        openbb_pat = await get_openbb_pat()  # Retrieve OpenBB PAT from cache or database
+
+        root_run_id = None
+        agent_res = None
+        agent_callbacks = create_agent_callbacks()
+        async for event in app_data.agent_executor.astream_events(
+            {"input": query}, config={"callbacks": list(agent_callbacks)}, version="v1"
+        ):
+            if root_run_id is None:
+                # the first event is the start of the agent executor
+                root_run_id = event["run_id"]
+            event_type = event["event"]
+            if event_type in ("on_llm_stream", "on_chat_model_stream"):
+                chunk = event["data"].get("chunk")
+                token = getattr(chunk, "content", None) or getattr(chunk, "text", None)
+                if token:
+                    yield format_sse("token", {"token": token})
+            elif event_type == "on_tool_start":
+                yield format_sse(
+                    "tool_start", {"tool": event["name"], "input": event["data"].get("input")}
+                )
+            elif event_type == "on_tool_end":
+                yield format_sse(
+                    "tool_end", {"tool": event["name"], "output": str(event["data"].get("output"))}
+                )
+            elif event_type == "on_chain_end" and event["run_id"] == root_run_id:
+                agent_res = event["data"].get("output")
+        observe_agent_callbacks(*agent_callbacks)
+
+        response = await process_agent_output(
+            agent_res=agent_res, openbb_pat=openbb_pat, app_data=app_data
+        )
+        if app_data.response_cache is not None:
+            app_data.response_cache.put(
+                query_embedding,
+                response,
+                tools_executed=[step[0].tool for step in agent_res["intermediate_steps"]],
+            )
+    except Exception as e:
+        print("Overall exception happened: " + str(e))
+        response = BaseAgentResponse(type="error", body="Sorry, something went wrong!")
+    yield format_sse("response", response.model_dump())
@@ -0,0 +1,2 @@
+from .semantic_response_cache import SemanticResponseCache as SemanticResponseCache
+from .semantic_response_cache import is_us_market_open as is_us_market_open
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from datetime import time as dt_time
+from datetime import timezone
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+if TYPE_CHECKING:
+    # only used in type hints, as the models import this module
+    from ..models.response import BaseAgentResponse, DataAgentResponse
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _NEW_YORK_TZ = ZoneInfo("America/New_York")
+except Exception:
+    # tz database not available, market is always considered open
+    _NEW_YORK_TZ = None
+
+
+def is_us_market_open(now: datetime | None = None) -> bool:
+    """Check whether the US stock market is in regular trading hours (Mon-Fri, 9:30-16:00 ET).
+
+    Holidays are not taken into account.
+
+    Args:
+        now (`datetime | None`): timezone-aware datetime to check. Defaults to the current time.
+
+    Returns:
+        `bool`: whether the market is open.
+    """
+    if _NEW_YORK_TZ is None:
+        return True
+    now_ny = (now or datetime.now(timezone.utc)).astimezone(_NEW_YORK_TZ)
+    return now_ny.weekday() < 5 and dt_time(9, 30) <= now_ny.time() < dt_time(16, 0)
+
+
+class SemanticResponseCache:
+    """LRU cache of the API responses, keyed by the embedding of the query.
+
+    A query hits the cache when the cosine similarity between its embedding and the embedding of a
+    cached query is above `similarity_threshold`. Responses with data (`DataAgentResponse`, or any
+    response of an agent run that used OpenBB) expire sooner while the US market is open, as prices
+    change constantly; the rest use `default_ttl`. Errors and OpenBB runs whose output is not valid
+    JSON (e.g., the code failed) are never cached.
+
+    Args:
+        embed_model (`BaseEmbedding`): LlamaIndex embedding model, usually the one used in `AutoRag`.
+        max_size (`int`): max. number of cached responses. The least recently used are evicted.
+        similarity_threshold (`float`): min. cosine similarity to consider two queries equivalent.
+        market_open_data_ttl (`float`): seconds to keep data responses while the market is open.
+        market_closed_data_ttl (`float`): seconds to keep data responses while the market is closed.
+        default_ttl (`float`): seconds to keep the other responses, e.g., world knowledge answers.
+    """
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        max_size: int = 1000,
+        similarity_threshold: float = 0.97,
+        market_open_data_ttl: float = 300,
+        market_closed_data_ttl: float = 3600,
+        default_ttl: float = 3600,
+    ):
+        self.embed_model = embed_model
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.market_open_data_ttl = market_open_data_ttl
+        self.market_closed_data_ttl = market_closed_data_ttl
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._next_key = 0
+        # key -> (normalized query embedding, response, creation time, expiration time)
+        self._entries: OrderedDict[
+            int, tuple[np.ndarray, BaseAgentResponse | DataAgentResponse, float, float]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """Compute the normalized embedding of the query.
+
+        Args:
+            query (`str`): user query.
+
+        Returns:
+            `np.ndarray`: L2-normalized embedding.
+        """
+        embedding = np.asarray(
+            await self.embed_model.aget_query_embedding(query), dtype=np.float32
+        )
+        return embedding / max(np.linalg.norm(embedding), 1e-12)
+
+    def _ttl(
+        self, response: BaseAgentResponse | DataAgentResponse, tools_executed: Sequence[str]
+    ) -> float | None:
+        """Seconds to cache the response, or None if it must not be cached."""
+        # imported here, as the models import this module
+        from ..models.response import DataAgentResponse
+
+        if isinstance(response, DataAgentResponse):
+            return (
+                self.market_open_data_ttl if is_us_market_open() else self.market_closed_data_ttl
+            )
+        if response.type == "error" or (
+            len(tools_executed) > 0 and tools_executed[-1] == "OpenBB"
+        ):
+            # the code of the OpenBB tool failed or its output could not be parsed
+            return None
+        if "OpenBB" in tools_executed:
+            return (
+                self.market_open_data_ttl if is_us_market_open() else self.market_closed_data_ttl
+            )
+        return self.default_ttl
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry[3] <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, embedding: np.ndarray) -> BaseAgentResponse | DataAgentResponse | None:
+        """Get the cached response of the most similar query, if similar enough.
+
+        Args:
+            embedding (`np.ndarray`): normalized embedding of the query, from `aembed_query`.
+
+        Returns:
+            `BaseAgentResponse | DataAgentResponse | None`: copy of the cached response, with the
+                cache information in its `metadata`, or None if there is no hit.
+        """
+        self._purge_expired()
+        if len(self._entries) == 0:
+            self.misses += 1
+            return None
+        keys = list(self._entries.keys())
+        similarities = np.stack([entry[0] for entry in self._entries.values()]) @ embedding
+        best_idx = int(np.argmax(similarities))
+        if similarities[best_idx] < self.similarity_threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(keys[best_idx])
+        _, response, created_at, _ = self._entries[keys[best_idx]]
+        return response.model_copy(
+            update={
+                "metadata": {
+                    **(response.metadata or {}),
+                    "cache_hit": True,
+                    "cache_similarity": float(similarities[best_idx]),
+                    "cache_age_seconds": time.monotonic() - created_at,
+                }
+            }
+        )
+
+    def put(
+        self,
+        embedding: np.ndarray,
+        response: BaseAgentResponse | DataAgentResponse,
+        tools_executed: Sequence[str] = (),
+    ):
+        """Store a response in the cache, unless it is an error or a failed OpenBB run.
+
+        Args:
+            embedding (`np.ndarray`): normalized embedding of the query, from `aembed_query`.
+            response (`BaseAgentResponse | DataAgentResponse`): response to the query.
+            tools_executed (`Sequence[str]`): names of the tools the agent ran, in order.
+        """
+        ttl = self._ttl(response, tools_executed)
+        if ttl is None or self.max_size <= 0:
+            return
+        now = time.monotonic()
+        self._entries[self._next_key] = (embedding, response, now, now + ttl)
+        self._next_key += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,2 +1,3 @@
 from .callbacks import LLMTimeCallback as LLMTimeCallback
 from .callbacks import ToolExecutionOrderCallback as ToolExecutionOrderCallback
+from .callbacks import ToolTimeCallback as ToolTimeCallback
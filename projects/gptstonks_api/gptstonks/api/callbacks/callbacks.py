@@ -6,7 +6,7 @@ import numpy as np
 from langchain.callbacks.base import AsyncCallbackHandler
 from langchain_core.agents import AgentAction
 from langchain_core.outputs import LLMResult
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, PrivateAttr, computed_field
 
 
 class ToolExecutionOrderCallback(BaseModel, AsyncCallbackHandler):
@@ -26,11 +26,63 @@ class ToolExecutionOrderCallback(BaseModel, AsyncCallbackHandler):
         self.tools_used.append(action.tool)
 
 
+class ToolTimeCallback(BaseModel, AsyncCallbackHandler):
+    """Callback to get the agent's tool execution times, by tool name."""
+
+    _start_times: dict[UUID, tuple[str, float]] = PrivateAttr(default_factory=dict)
+    tools_executions_times_seconds: list[tuple[str, float]] = []
+
+    async def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        tags: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Run when a tool starts running."""
+        self._start_times[run_id] = (serialized.get("name", "unknown"), time.perf_counter())
+
+    async def on_tool_end(
+        self,
+        output: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        tags: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Run when a tool ends running."""
+        self._record(run_id)
+
+    async def on_tool_error(
+        self,
+        error: BaseException,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        tags: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Run when a tool errors."""
+        self._record(run_id)
+
+    def _record(self, run_id: UUID):
+        if run_id in self._start_times:
+            name, start_time = self._start_times.pop(run_id)
+            self.tools_executions_times_seconds.append((name, time.perf_counter() - start_time))
+
+
 class LLMTimeCallback(BaseModel, AsyncCallbackHandler):
     """Callback to get the agent's LLM execution times."""
 
     _last_start_time: float | None = None
     llm_executions_times_ns: list[float] = []
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
 
     @computed_field
     @property
@@ -83,3 +135,7 @@ class LLMTimeCallback(BaseModel, AsyncCallbackHandler):
         """Run when LLM ends running."""
         end_time = time.time_ns()
         self.llm_executions_times_ns.append(end_time - self._last_start_time)
+        # only reported by some providers (e.g., OpenAI)
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        self.prompt_tokens += token_usage.get("prompt_tokens", 0)
+        self.completion_tokens += token_usage.get("completion_tokens", 0)
@@ -1,10 +1,37 @@
 from .constants import AI_PREFIX as AI_PREFIX
 from .constants import API_DESCRIPTION as API_DESCRIPTION
+from .constants import OPENBB_CACHE_DEFAULT_TTLS as OPENBB_CACHE_DEFAULT_TTLS
+from .constants import REACT_PROMPT_TEMPLATE as REACT_PROMPT_TEMPLATE
 from .env import AGENT_EARLY_STOPPING_METHOD as AGENT_EARLY_STOPPING_METHOD
 from .env import AGENT_REQUEST_TIMEOUT as AGENT_REQUEST_TIMEOUT
+from .env import AUTOLLAMAINDEX_BM25_PERSIST_DIR as AUTOLLAMAINDEX_BM25_PERSIST_DIR
+from .env import (
+    AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE as AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE,
+)
 from .env import AUTOLLAMAINDEX_EMBEDDING_MODEL_ID as AUTOLLAMAINDEX_EMBEDDING_MODEL_ID
+from .env import AUTOLLAMAINDEX_FILES_PERSIST_DIR as AUTOLLAMAINDEX_FILES_PERSIST_DIR
+from .env import AUTOLLAMAINDEX_HYBRID_FUSION_MODE as AUTOLLAMAINDEX_HYBRID_FUSION_MODE
+from .env import (
+    AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K as AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K,
+)
 from .env import AUTOLLAMAINDEX_LLM_CONTEXT_WINDOW as AUTOLLAMAINDEX_LLM_CONTEXT_WINDOW
+from .env import (
+    AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION as AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION,
+)
+from .env import AUTOLLAMAINDEX_ONNX_NUM_THREADS as AUTOLLAMAINDEX_ONNX_NUM_THREADS
 from .env import AUTOLLAMAINDEX_QA_TEMPLATE as AUTOLLAMAINDEX_QA_TEMPLATE
+from .env import (
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE as AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE,
+)
+from .env import (
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT as AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT,
+)
+from .env import (
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE as AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE,
+)
+from .env import (
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL as AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL,
+)
 from .env import AUTOLLAMAINDEX_REFINE_TEMPLATE as AUTOLLAMAINDEX_REFINE_TEMPLATE
 from .env import (
     AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY as AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY,
@@ -35,6 +62,15 @@ from .env import (
 )
 from .env import CUSTOM_GPTSTONKS_PREFIX as CUSTOM_GPTSTONKS_PREFIX
 from .env import DEBUG_API as DEBUG_API
+from .env import HTTP_CLIENT_DISABLE_HTTP2 as HTTP_CLIENT_DISABLE_HTTP2
+from .env import HTTP_CLIENT_KEEPALIVE_EXPIRY as HTTP_CLIENT_KEEPALIVE_EXPIRY
+from .env import HTTP_CLIENT_MAX_CONNECTIONS as HTTP_CLIENT_MAX_CONNECTIONS
+from .env import (
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS as HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+)
+from .env import JOBS_NUM_WORKERS as JOBS_NUM_WORKERS
+from .env import JOBS_QUEUE_MAX_SIZE as JOBS_QUEUE_MAX_SIZE
+from .env import JOBS_RESULT_TTL as JOBS_RESULT_TTL
 from .env import LLM_CHAT_MODEL_SYSTEM_MESSAGE as LLM_CHAT_MODEL_SYSTEM_MESSAGE
 from .env import LLM_HF_BITS as LLM_HF_BITS
 from .env import LLM_HF_DEVICE as LLM_HF_DEVICE
@@ -43,14 +79,46 @@ from .env import LLM_HF_DISABLE_EXLLAMA as LLM_HF_DISABLE_EXLLAMA
 from .env import LLM_HF_DISABLE_SAMPLING as LLM_HF_DISABLE_SAMPLING
 from .env import LLM_HF_TRUST_REMOTE_CODE as LLM_HF_TRUST_REMOTE_CODE
 from .env import LLM_LLAMACPP_CONTEXT_WINDOW as LLM_LLAMACPP_CONTEXT_WINDOW
+from .env import LLM_LLAMACPP_POOL_NUM_WORKERS as LLM_LLAMACPP_POOL_NUM_WORKERS
+from .env import (
+    LLM_LLAMACPP_POOL_THREADS_PER_WORKER as LLM_LLAMACPP_POOL_THREADS_PER_WORKER,
+)
+from .env import LLM_LOCAL_BATCH_WAIT as LLM_LOCAL_BATCH_WAIT
+from .env import LLM_LOCAL_MAX_BATCH_SIZE as LLM_LOCAL_MAX_BATCH_SIZE
+from .env import LLM_LOCAL_QUEUE_MAX_SIZE as LLM_LOCAL_QUEUE_MAX_SIZE
+from .env import LLM_LOCAL_QUEUE_TIMEOUT as LLM_LOCAL_QUEUE_TIMEOUT
+from .env import LLM_LOCAL_TIMEOUT as LLM_LOCAL_TIMEOUT
 from .env import LLM_MAX_TOKENS as LLM_MAX_TOKENS
 from .env import LLM_MODEL_ID as LLM_MODEL_ID
 from .env import LLM_TEMPERATURE as LLM_TEMPERATURE
 from .env import LLM_TOP_P as LLM_TOP_P
 from .env import LLM_VERTEXAI_CLOUD_LOCATION as LLM_VERTEXAI_CLOUD_LOCATION
 from .env import MONGO_DBNAME as MONGO_DBNAME
+from .env import MONGO_MAX_IDLE_TIME_MS as MONGO_MAX_IDLE_TIME_MS
+from .env import MONGO_MAX_POOL_SIZE as MONGO_MAX_POOL_SIZE
+from .env import MONGO_MIN_POOL_SIZE as MONGO_MIN_POOL_SIZE
+from .env import MONGO_SERVER_SELECTION_TIMEOUT_MS as MONGO_SERVER_SELECTION_TIMEOUT_MS
+from .env import MONGO_TOKENS_CACHE_TTL as MONGO_TOKENS_CACHE_TTL
 from .env import MONGO_URI as MONGO_URI
+from .env import OPENBB_CACHE_DEFAULT_TTL as OPENBB_CACHE_DEFAULT_TTL
+from .env import OPENBB_CACHE_DIR as OPENBB_CACHE_DIR
+from .env import OPENBB_CACHE_MAX_SIZE as OPENBB_CACHE_MAX_SIZE
+from .env import OPENBB_CACHE_TTLS as OPENBB_CACHE_TTLS
+from .env import OPENBB_EXECUTOR_MEMORY_LIMIT_MB as OPENBB_EXECUTOR_MEMORY_LIMIT_MB
+from .env import OPENBB_EXECUTOR_NUM_WORKERS as OPENBB_EXECUTOR_NUM_WORKERS
+from .env import OPENBB_EXECUTOR_TIMEOUT as OPENBB_EXECUTOR_TIMEOUT
 from .env import OPENBBCHAT_TOOL_DESCRIPTION as OPENBBCHAT_TOOL_DESCRIPTION
+from .env import RESPONSE_CACHE_DEFAULT_TTL as RESPONSE_CACHE_DEFAULT_TTL
+from .env import (
+    RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL as RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL,
+)
+from .env import (
+    RESPONSE_CACHE_MARKET_OPEN_DATA_TTL as RESPONSE_CACHE_MARKET_OPEN_DATA_TTL,
+)
+from .env import RESPONSE_CACHE_MAX_SIZE as RESPONSE_CACHE_MAX_SIZE
+from .env import (
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD as RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+)
 from .env import SEARCH_TOOL_DESCRIPTION as SEARCH_TOOL_DESCRIPTION
 from .env import WIKIPEDIA_TOOL_DESCRIPTION as WIKIPEDIA_TOOL_DESCRIPTION
 from .env import WORLD_KNOWLEDGE_TOOL_DESCRIPTION as WORLD_KNOWLEDGE_TOOL_DESCRIPTION
@@ -4,6 +4,8 @@ They include:
 
 - **API_DESCRIPTION:** rendered when /docs is called on the API.
 - **AI_PREFIX:** prefix to use by the agent when generating the response.
+- **REACT_PROMPT_TEMPLATE:** local copy of the `hwchase17/react` prompt of LangChain Hub.
+- **OPENBB_CACHE_DEFAULT_TTLS:** seconds to cache the results of OpenBB endpoints, by path prefix.
 """
 
 API_DESCRIPTION = """GPTStonks API allows interacting with financial data sources using natural language.
@@ -28,3 +30,35 @@ The following models are supported:
 """
 
 AI_PREFIX = "GPTSTONKS_RESPONSE"
+
+REACT_PROMPT_TEMPLATE = """Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+
+OPENBB_CACHE_DEFAULT_TTLS = {
+    "equity.price.quote": 30,
+    "crypto.price.quote": 30,
+    "equity.price.historical": 3600,
+    "crypto.price.historical": 3600,
+    "currency.price.historical": 3600,
+    "news": 300,
+    "equity.fundamental": 86400,
+    "equity.profile": 86400,
+    "etf.info": 86400,
+}
@@ -7,6 +7,7 @@ The list of env variables is provided in [Configuration with environment variabl
 ///
 """
 
+import json
 import os
 import warnings
 
@@ -20,6 +21,13 @@ try:
 except KeyError:
     warnings.warn("MONGO_DBNAME env variable not provided")
     MONGO_DBNAME = None
+MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS: int | None = (
+    int(os.environ["MONGO_MAX_IDLE_TIME_MS"]) if "MONGO_MAX_IDLE_TIME_MS" in os.environ else None
+)
+MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000))
+MONGO_TOKENS_CACHE_TTL: float = float(os.getenv("MONGO_TOKENS_CACHE_TTL", 60))
 DEBUG_API: str | None = os.getenv("DEBUG_API")
 AUTOLLAMAINDEX_VSI_GDRIVE_URI: str | None = os.getenv("AUTOLLAMAINDEX_VSI_GDRIVE_URI")
 AUTOLLAMAINDEX_EMBEDDING_MODEL_ID: str = os.getenv(
@@ -41,6 +49,35 @@ AUTOLLAMAINDEX_QA_TEMPLATE: str | None = os.getenv("AUTOLLAMAINDEX_QA_TEMPLATE")
 AUTOLLAMAINDEX_REFINE_TEMPLATE: str | None = os.getenv("AUTOLLAMAINDEX_REFINE_TEMPLATE")
 AUTOLLAMAINDEX_VIR_SIMILARITY_TOP_K: int = int(os.getenv("AUTOLLAMAINDEX_VIR_SIMILARITY_TOP_K", 3))
 AUTOLLAMAINDEX_RETRIEVER_TYPE: str | None = os.getenv("AUTOLLAMAINDEX_RETRIEVER_TYPE")
+AUTOLLAMAINDEX_HYBRID_FUSION_MODE: str | None = os.getenv("AUTOLLAMAINDEX_HYBRID_FUSION_MODE")
+AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K: int | None = (
+    int(os.environ["AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K"])
+    if "AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K" in os.environ
+    else None
+)
+AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE: int = int(
+    os.getenv("AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE", 1024)
+)
+AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL: float = float(
+    os.getenv("AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL", 86400)
+)
+AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE: int = int(
+    os.getenv("AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE", 16)
+)
+AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT: float = float(
+    os.getenv("AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT", 0.005)
+)
+AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE: str = os.getenv("AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE", "sparse")
+AUTOLLAMAINDEX_BM25_PERSIST_DIR: str | None = os.getenv("AUTOLLAMAINDEX_BM25_PERSIST_DIR")
+AUTOLLAMAINDEX_FILES_PERSIST_DIR: str | None = os.getenv("AUTOLLAMAINDEX_FILES_PERSIST_DIR")
+AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION: bool = bool(
+    os.getenv("AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION", False)
+)
+AUTOLLAMAINDEX_ONNX_NUM_THREADS: int | None = (
+    int(os.environ["AUTOLLAMAINDEX_ONNX_NUM_THREADS"])
+    if "AUTOLLAMAINDEX_ONNX_NUM_THREADS" in os.environ
+    else None
+)
 try:
     AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY: str = os.environ[
         "AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY"
@@ -62,6 +99,15 @@ AUTOMULTISTEPQUERYENGINE_INDEX_SUMMARY: str = os.getenv(
 )
 AGENT_REQUEST_TIMEOUT: float = float(os.getenv("AGENT_REQUEST_TIMEOUT", 20))
 AGENT_EARLY_STOPPING_METHOD: str = os.getenv("AGENT_EARLY_STOPPING_METHOD", "force")
+HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = int(
+    os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 20)
+)
+HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", 30))
+HTTP_CLIENT_DISABLE_HTTP2: bool = bool(os.getenv("HTTP_CLIENT_DISABLE_HTTP2", False))
+JOBS_NUM_WORKERS: int = int(os.getenv("JOBS_NUM_WORKERS", 4))
+JOBS_QUEUE_MAX_SIZE: int = int(os.getenv("JOBS_QUEUE_MAX_SIZE", 100))
+JOBS_RESULT_TTL: float = float(os.getenv("JOBS_RESULT_TTL", 3600))
 LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", 0.1))
 LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", 256))
 LLM_TOP_P: float = float(os.getenv("LLM_TOP_P", 1.0))
@@ -75,17 +121,50 @@ LLM_CHAT_MODEL_SYSTEM_MESSAGE: str = os.getenv(
 )
 LLM_VERTEXAI_CLOUD_LOCATION: str | None = os.getenv("LLM_VERTEXAI_CLOUD_LOCATION")
 LLM_LLAMACPP_CONTEXT_WINDOW: int | None = int(os.getenv("LLM_LLAMACPP_CONTEXT_WINDOW", 4000))
+LLM_LLAMACPP_POOL_NUM_WORKERS: int = int(os.getenv("LLM_LLAMACPP_POOL_NUM_WORKERS", 2))
+LLM_LLAMACPP_POOL_THREADS_PER_WORKER: int | None = (
+    int(os.environ["LLM_LLAMACPP_POOL_THREADS_PER_WORKER"])
+    if "LLM_LLAMACPP_POOL_THREADS_PER_WORKER" in os.environ
+    else None
+)
 LLM_HF_DEVICE: int = int(os.getenv("LLM_HF_DEVICE", -1))
 LLM_HF_DISABLE_SAMPLING: str | None = bool(os.getenv("LLM_HF_DISABLE_SAMPLING", False))
 LLM_HF_DEVICE_MAP: str | None = os.getenv("LLM_HF_DEVICE_MAP")
 LLM_HF_BITS: int = int(os.getenv("LLM_HF_GPTQ_BITS", 4))
 LLM_HF_DISABLE_EXLLAMA: bool = bool(os.getenv("LLM_HF_DISABLE_EXLLAMA", False))
 LLM_HF_TRUST_REMOTE_CODE: bool = bool(os.getenv("LLM_HF_TRUST_REMOTE_CODE"))
+LLM_LOCAL_QUEUE_MAX_SIZE: int = int(os.getenv("LLM_LOCAL_QUEUE_MAX_SIZE", 64))
+LLM_LOCAL_MAX_BATCH_SIZE: int = int(os.getenv("LLM_LOCAL_MAX_BATCH_SIZE", 4))
+LLM_LOCAL_BATCH_WAIT: float = float(os.getenv("LLM_LOCAL_BATCH_WAIT", 0.01))
+LLM_LOCAL_QUEUE_TIMEOUT: float = float(os.getenv("LLM_LOCAL_QUEUE_TIMEOUT", 30))
+LLM_LOCAL_TIMEOUT: float = float(os.getenv("LLM_LOCAL_TIMEOUT", 600))
 try:
     OPENBBCHAT_TOOL_DESCRIPTION: str = os.environ["OPENBBCHAT_TOOL_DESCRIPTION"]
 except KeyError:
     warnings.warn("OPENBBCHAT_TOOL_DESCRIPTION env variable not provided")
     OPENBBCHAT_TOOL_DESCRIPTION = None
+OPENBB_EXECUTOR_NUM_WORKERS: int = int(os.getenv("OPENBB_EXECUTOR_NUM_WORKERS", 2))
+OPENBB_EXECUTOR_TIMEOUT: float = float(os.getenv("OPENBB_EXECUTOR_TIMEOUT", 60))
+OPENBB_EXECUTOR_MEMORY_LIMIT_MB: int | None = (
+    int(os.environ["OPENBB_EXECUTOR_MEMORY_LIMIT_MB"])
+    if "OPENBB_EXECUTOR_MEMORY_LIMIT_MB" in os.environ
+    else None
+)
+OPENBB_CACHE_MAX_SIZE: int = int(os.getenv("OPENBB_CACHE_MAX_SIZE", 256))
+OPENBB_CACHE_DEFAULT_TTL: float = float(os.getenv("OPENBB_CACHE_DEFAULT_TTL", 600))
+OPENBB_CACHE_TTLS: dict[str, float] = json.loads(os.getenv("OPENBB_CACHE_TTLS", "{}"))
+OPENBB_CACHE_DIR: str | None = os.getenv("OPENBB_CACHE_DIR")
+RESPONSE_CACHE_MAX_SIZE: int = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", 0))
+RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = float(
+    os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", 0.97)
+)
+RESPONSE_CACHE_MARKET_OPEN_DATA_TTL: float = float(
+    os.getenv("RESPONSE_CACHE_MARKET_OPEN_DATA_TTL", 300)
+)
+RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL: float = float(
+    os.getenv("RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL", 3600)
+)
+RESPONSE_CACHE_DEFAULT_TTL: float = float(os.getenv("RESPONSE_CACHE_DEFAULT_TTL", 3600))
 SEARCH_TOOL_DESCRIPTION: str | None = os.getenv("SEARCH_TOOL_DESCRIPTION")
 WIKIPEDIA_TOOL_DESCRIPTION: str | None = os.getenv("WIKIPEDIA_TOOL_DESCRIPTION")
 CUSTOM_GPTSTONKS_PREFIX: str | None = os.getenv("CUSTOM_GPTSTONKS_PREFIX")
@@ -1 +1,4 @@
 from .mongodb import db as db
+from .tokens import get_openbb_pat as get_openbb_pat
+from .tokens import invalidate_openbb_pat_cache as invalidate_openbb_pat_cache
+from .tokens import update_openbb_pat as update_openbb_pat
@@ -1,16 +1,32 @@
 import traceback
 
-from pymongo import MongoClient
-from pymongo.database import Database
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
-from ..constants import MONGO_DBNAME, MONGO_URI
+from ..constants import (
+    MONGO_DBNAME,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_URI,
+)
 
 
-def init_mongo_db() -> Database:
-    """Connect to MongoDB database."""
+def init_mongo_db() -> AsyncIOMotorDatabase:
+    """Connect to MongoDB database.
+
+    The client is asynchronous (based on `motor`), so database calls can be awaited without blocking
+    the event loop. The connection pool is configured with the `MONGO_*` env variables.
+    """
 
     try:
-        client = MongoClient(MONGO_URI)
+        client = AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        )
         return client[MONGO_DBNAME]
     except Exception:
         raise RuntimeError(f"Error creating MongoDB client. Trace:\n{traceback.format_exc()}")
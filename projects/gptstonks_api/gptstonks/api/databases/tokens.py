@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from ..constants import MONGO_TOKENS_CACHE_TTL
+from ..models import TokenData
+from .mongodb import db
+
+_openbb_pat_cache: dict = {}
+_openbb_pat_lock = asyncio.Lock()
+# incremented on each invalidation, so a read started before it does not fill the cache
+_openbb_pat_generation = 0
+
+
+def invalidate_openbb_pat_cache():
+    """Remove the cached OpenBB Personal Access Token (PAT), so the next read goes to MongoDB.
+
+    Only the cache of the current process is removed. The other API workers read the new PAT
+    once their cache expires (`MONGO_TOKENS_CACHE_TTL`).
+    """
+    global _openbb_pat_generation
+    _openbb_pat_generation += 1
+    _openbb_pat_cache.clear()
+
+
+def _is_openbb_pat_cached() -> bool:
+    """Check whether the cached PAT exists and has not expired (`MONGO_TOKENS_CACHE_TTL`)."""
+    if "openbb" not in _openbb_pat_cache:
+        return False
+    return time.monotonic() - _openbb_pat_cache["cached_at"] < MONGO_TOKENS_CACHE_TTL
+
+
+async def get_openbb_pat() -> str | None:
+    """Get the OpenBB PAT, reading from MongoDB only when the in-memory cache is empty or expired.
+
+    Concurrent cache misses are collapsed into a single database call.
+
+    Returns:
+        `str | None`: OpenBB PAT, or None if it has not been set.
+    """
+    if _is_openbb_pat_cached():
+        return _openbb_pat_cache["openbb"]
+    async with _openbb_pat_lock:
+        # another coroutine may have filled the cache while waiting for the lock
+        if _is_openbb_pat_cached():
+            return _openbb_pat_cache["openbb"]
+        generation = _openbb_pat_generation
+        token = await db.tokens.find_one({}, {"_id": 0, "openbb": 1})
+        openbb_pat = token.get("openbb") if token else None
+        openbb_pat = str(openbb_pat) if openbb_pat is not None else None
+        if generation == _openbb_pat_generation:
+            # not updated while reading, otherwise the PAT read may be the previous one
+            _openbb_pat_cache.update({"openbb": openbb_pat, "cached_at": time.monotonic()})
+        return openbb_pat
+
+
+async def update_openbb_pat(token_data: TokenData):
+    """Store the tokens in MongoDB and invalidate the cached OpenBB PAT.
+
+    Args:
+        token_data (`TokenData`): Token data information to update the database.
+    """
+    await db.tokens.update_one({}, {"$set": token_data.model_dump()}, upsert=True)
+    invalidate_openbb_pat_cache()
@@ -0,0 +1 @@
+from .openbb_code_executor import OpenBBCodeExecutor as OpenBBCodeExecutor
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import time
+import warnings
+from collections import OrderedDict
+from typing import Any
+
+# Paths that change the state of the session or are not data, so they are never cached
+_UNCACHEABLE_PREFIXES = ("account", "user", "system", "coverage")
+
+
+class CachedOBBject:
+    """Lightweight replacement of OpenBB's `OBBject` for results loaded from the disk cache.
+
+    It supports the attributes commonly used by the generated code: `results`, `provider`,
+    `to_dataframe`/`to_df` and `to_dict`.
+    """
+
+    def __init__(self, results: list[dict], provider: str | None = None):
+        self.results = results
+        self.provider = provider
+
+    def to_dataframe(self, **kwargs):
+        import pandas as pd
+
+        return pd.DataFrame.from_records(self.results)
+
+    def to_df(self, **kwargs):
+        return self.to_dataframe(**kwargs)
+
+    def to_dict(self, orient: str = "list", **kwargs):
+        return self.to_dataframe().to_dict(orient=orient)
+
+
+class OpenBBResultCache:
+    """Two-tier cache for the results of OpenBB Platform calls.
+
+    The first tier is an in-memory LRU. The second, optional, tier stores the results as Parquet
+    files in `cache_dir`, so they are shared between worker processes and restarts (it requires
+    `pyarrow`). Entries expire after the TTL of the longest matching prefix in `ttls`, or
+    `default_ttl` if none matches.
+
+    Args:
+        max_size (`int`): max. number of results kept in memory. 0 disables the cache.
+        default_ttl (`float`): seconds to keep the results of endpoints not in `ttls`.
+        ttls (`dict[str, float] | None`): TTL in seconds per endpoint path prefix (e.g., `equity.price.quote`).
+        cache_dir (`str | None`): folder for the Parquet tier. None to disable it.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        default_ttl: float = 600,
+        ttls: dict[str, float] | None = None,
+        cache_dir: str | None = None,
+    ):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            try:
+                import pyarrow  # noqa: F401
+
+                os.makedirs(cache_dir, exist_ok=True)
+            except ModuleNotFoundError:
+                warnings.warn("pyarrow not installed, so the OpenBB disk cache is disabled")
+                self.cache_dir = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        # key -> (result, expiration time)
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def is_cacheable(path: str) -> bool:
+        """Whether the results of the endpoint can be cached."""
+        return not path.startswith(_UNCACHEABLE_PREFIXES)
+
+    @staticmethod
+    def make_key(path: str, args: tuple, kwargs: dict) -> str:
+        """Build the cache key from the normalized endpoint path, arguments and provider."""
+        return json.dumps(
+            {
+                "path": path,
+                "provider": kwargs.get("provider"),
+                "args": list(args),
+                "kwargs": {k: v for k, v in kwargs.items() if k != "provider"},
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+    def ttl(self, path: str) -> float:
+        """TTL of the longest prefix in `ttls` matching the path."""
+        matches = [
+            prefix for prefix in self.ttls if path == prefix or path.startswith(f"{prefix}.")
+        ]
+        return self.ttls[max(matches, key=len)] if matches else self.default_ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(key.encode()).hexdigest()}.parquet")
+
+    def get(self, path: str, key: str) -> Any | None:
+        """Get a cached result, looking first in memory and then on disk."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            del self._entries[key]
+        if self.cache_dir is not None:
+            disk_path = self._disk_path(key)
+            try:
+                if time.time() - os.path.getmtime(disk_path) < self.ttl(path):
+                    import pandas as pd
+
+                    result = CachedOBBject(
+                        results=pd.read_parquet(disk_path).to_dict(orient="records"),
+                        provider=json.loads(key)["provider"],
+                    )
+                    self._put_memory(path, key, result)
+                    self.stats["disk_hits"] += 1
+                    return result
+            except (OSError, ValueError):
+                pass
+        self.stats["misses"] += 1
+        return None
+
+    def _put_memory(self, path: str, key: str, result: Any):
+        self._entries[key] = (result, time.monotonic() + self.ttl(path))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put(self, path: str, key: str, result: Any):
+        """Store a result in memory and, if enabled, on disk."""
+        self._put_memory(path, key, result)
+        results = getattr(result, "results", None)
+        if self.cache_dir is not None and isinstance(results, list) and len(results) > 0:
+            try:
+                import pandas as pd
+
+                df = pd.DataFrame.from_records([dict(r) for r in results])
+                # write and rename to avoid other workers reading incomplete files
+                tmp_path = f"{self._disk_path(key)}.{os.getpid()}.tmp"
+                df.to_parquet(tmp_path)
+                os.replace(tmp_path, self._disk_path(key))
+            except Exception as e:
+                warnings.warn(f"OpenBB result not stored on disk: {e}")
+
+
+class CachedOpenBBProxy:
+    """Proxy of the `obb` object that serves the results of the calls from an `OpenBBResultCache`.
+
+    Args:
+        target (`Any`): `obb` object or one of its routers.
+        cache (`OpenBBResultCache`): cache to use.
+        path (`str`): path of `target` from `obb` (e.g., `equity.price`).
+    """
+
+    def __init__(self, target: Any, cache: OpenBBResultCache, path: str = ""):
+        self._target = target
+        self._cache = cache
+        self._path = path
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not (callable(attr) or hasattr(attr, "__dict__")):
+            return attr
+        path = f"{self._path}.{name}" if self._path else name
+        if not OpenBBResultCache.is_cacheable(path):
+            return attr
+        return CachedOpenBBProxy(attr, self._cache, path)
+
+    def __dir__(self):
+        return dir(self._target)
+
+    def __repr__(self) -> str:
+        return repr(self._target)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        if not self._cache.enabled:
+            return self._target(*args, **kwargs)
+        key = OpenBBResultCache.make_key(self._path, args, kwargs)
+        result = self._cache.get(self._path, key)
+        if result is None:
+            result = self._target(*args, **kwargs)
+            self._cache.put(self._path, key, result)
+        return result
@@ -0,0 +1,192 @@
+import asyncio
+import io
+import multiprocessing
+import signal
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+
+from .openbb_cache import CachedOpenBBProxy, OpenBBResultCache
+
+# OpenBB PAT used to log in the current worker process, to avoid logging in on every call
+_worker_openbb_pat: str | None = None
+# Cache of the OpenBB calls made in the current worker process
+_worker_cache: OpenBBResultCache | None = None
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("Code execution timed out")
+
+
+def _init_worker(memory_limit_mb: int | None = None, cache_kwargs: dict | None = None):
+    """Initialize a worker process: apply the memory limit and pre-import OpenBB and pandas.
+
+    Args:
+        memory_limit_mb (`int | None`): max. address space of the worker in MB. None to disable.
+        cache_kwargs (`dict | None`): arguments of `OpenBBResultCache`. None to disable the cache.
+    """
+    global _worker_cache
+    if memory_limit_mb is not None:
+        import resource
+
+        memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    import openbb
+    import pandas  # noqa: F401
+
+    if cache_kwargs is not None and cache_kwargs.get("max_size", 0) > 0:
+        # the generated code runs `from openbb import obb`, so it gets the cached proxy
+        _worker_cache = OpenBBResultCache(**cache_kwargs)
+        openbb.obb = CachedOpenBBProxy(openbb.obb, _worker_cache)
+
+
+def _login_openbb(openbb_pat: str | None):
+    """Log in (or out) of OpenBB Hub in the worker process if the PAT changed since last call."""
+    global _worker_openbb_pat
+    if openbb_pat == _worker_openbb_pat:
+        return
+    from openbb import obb
+
+    if openbb_pat is not None:
+        obb.account.login(pat=openbb_pat)
+    else:
+        obb.account.logout()
+    _worker_openbb_pat = openbb_pat
+
+
+def _warm_up() -> bool:
+    """No-op task used to start the worker processes."""
+    return True
+
+
+def _run_code(code: str, openbb_pat: str | None = None, timeout: float | None = None) -> str:
+    """Run code in a fresh namespace, returning its stdout.
+
+    Args:
+        code (`str`): Python code to run.
+        openbb_pat (`str | None`): user's OpenBB PAT.
+        timeout (`float | None`): seconds after which the execution is interrupted.
+
+    Returns:
+        `str`: stdout of the code or the representation of the exception raised.
+    """
+    use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    stdout = io.StringIO()
+    try:
+        _login_openbb(openbb_pat)
+        with redirect_stdout(stdout):
+            exec(code, {"__name__": "__main__"})
+        return stdout.getvalue()
+    except BaseException as e:
+        return repr(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _run_code_with_cache_stats(
+    code: str, openbb_pat: str | None = None, timeout: float | None = None
+) -> tuple[str, dict[str, int]]:
+    """Run `_run_code`, also returning the increase of the worker's OpenBB cache counters."""
+    stats_before = dict(_worker_cache.stats) if _worker_cache is not None else {}
+    output = _run_code(code, openbb_pat=openbb_pat, timeout=timeout)
+    if _worker_cache is None:
+        return output, {}
+    return output, {
+        key: value - stats_before.get(key, 0) for key, value in _worker_cache.stats.items()
+    }
+
+
+class OpenBBCodeExecutor:
+    """Pool of pre-warmed worker processes to run the code generated for OpenBB.
+
+    Each worker imports OpenBB and pandas once at startup. Every call runs in a fresh namespace
+    with a hard timeout, so concurrent requests do not share variables nor stdout, and they do
+    not block the event loop. The timeout is applied by the worker itself with `SIGALRM` (only
+    available on Unix), so the time waiting for a free worker does not count. The results of the OpenBB calls can be cached in each worker with
+    an `OpenBBResultCache`; its hit/miss counters, aggregated over all workers, are in `cache_stats`.
+
+    Args:
+        num_workers (`int`): number of worker processes.
+        timeout (`float`): max. seconds to run the code of one request, once a worker takes it.
+        memory_limit_mb (`int | None`): max. address space of each worker in MB. None to disable.
+        cache_kwargs (`dict | None`): arguments of the `OpenBBResultCache` of each worker. None to
+            disable the cache.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        timeout: float = 60,
+        memory_limit_mb: int | None = None,
+        cache_kwargs: dict | None = None,
+    ):
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cache_kwargs = cache_kwargs
+        self.cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb, self.cache_kwargs),
+        )
+
+    def _wait_for_workers(self, pool: ProcessPoolExecutor):
+        """Start the workers of the pool and wait until all of them have imported OpenBB."""
+        warm_up_futures = [pool.submit(_warm_up) for _ in range(self.num_workers)]
+        for future in warm_up_futures:
+            future.result()
+
+    def start(self):
+        """Create the pool and wait until all the workers have imported OpenBB.
+
+        It blocks, so it must be called during the application startup and not from the event loop.
+        """
+        self._pool = self._create_pool()
+        self._wait_for_workers(self._pool)
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def arun(self, code: str, openbb_pat: str | None = None) -> str:
+        """Run the code in a worker process.
+
+        Args:
+            code (`str`): Python code to run.
+            openbb_pat (`str | None`): user's OpenBB PAT.
+
+        Returns:
+            `str`: stdout of the code or the representation of the exception raised.
+        """
+        if self._pool is None:
+            raise RuntimeError("The OpenBB code executor is not started, call `start` first")
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        try:
+            output, cache_stats = await loop.run_in_executor(
+                pool, _run_code_with_cache_stats, code, openbb_pat, self.timeout
+            )
+        except BrokenProcessPool as e:
+            # a worker died (e.g., killed by the OOM killer), so the pool is unusable
+            print(f"OpenBB worker died. Trace:\n{traceback.format_exc()}")
+            # the concurrent requests of the same pool fail too, but only one restarts it
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+                await asyncio.to_thread(self._wait_for_workers, self._pool)
+            return repr(e)
+        for key, value in cache_stats.items():
+            self.cache_stats[key] = self.cache_stats.get(key, 0) + value
+        return output
@@ -1 +1,3 @@
 from .app import init_api as init_api
+from .http_clients import HTTPClientRegistry as HTTPClientRegistry
+from .http_clients import http_client_registry as http_client_registry
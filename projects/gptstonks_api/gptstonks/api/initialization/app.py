@@ -1,25 +1,19 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 import gdown
-from langchain import hub
 from langchain.agents import AgentExecutor, Tool, create_react_agent
 from langchain.agents.format_scratchpad.openai_tools import (
     format_to_openai_tool_messages,
 )
 from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
 from langchain.globals import set_debug
-from langchain_community.llms import (
-    Bedrock,
-    HuggingFacePipeline,
-    LlamaCpp,
-    OpenAI,
-    VertexAI,
-)
+from langchain_community.llms import Bedrock, HuggingFacePipeline, LlamaCpp, VertexAI
 from langchain_community.tools import DuckDuckGoSearchResults, WikipediaQueryRun
 from langchain_community.utilities import (
     DuckDuckGoSearchAPIWrapper,
-    PythonREPL,
     WikipediaAPIWrapper,
 )
 from langchain_core.language_models.llms import LLM
@@ -28,9 +22,10 @@ from langchain_core.prompts import (
     MessagesPlaceholder,
     PromptTemplate,
 )
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAI
 from llama_index.core import PromptTemplate as LlamaIndexPromptTemplate
-from llama_index.core import VectorStoreIndex
+from llama_index.core import StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.langchain_helpers.agents import IndexToolConfig, LlamaIndexTool
 from llama_index.core.llms.llm import LLM as LlamaIndexLLM
 from llama_index.core.postprocessor import (
@@ -40,19 +35,33 @@ from llama_index.core.postprocessor import (
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
 from llama_index.embeddings.openai import OpenAIEmbedding, OpenAIEmbeddingModelType
 from llama_index.llms.langchain import LangChainLLM
-from llama_index.llms.openai import OpenAI as LlamaIndexOpenAI
 from llama_index.vector_stores.pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from transformers import GPTQConfig
 
+from gptstonks.wrappers.embeddings import resolve_embed_model
 from gptstonks.wrappers.kernels import AutoMultiStepQueryEngine, AutoRag
+from gptstonks.wrappers.llms import LlamaCppPool, ScheduledLLM
+from gptstonks.wrappers.vector_stores import NumpyVectorStore
 
+from ..caches import SemanticResponseCache
 from ..constants import (
     AGENT_EARLY_STOPPING_METHOD,
     AGENT_REQUEST_TIMEOUT,
+    AUTOLLAMAINDEX_BM25_PERSIST_DIR,
+    AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE,
     AUTOLLAMAINDEX_EMBEDDING_MODEL_ID,
+    AUTOLLAMAINDEX_FILES_PERSIST_DIR,
+    AUTOLLAMAINDEX_HYBRID_FUSION_MODE,
+    AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K,
     AUTOLLAMAINDEX_LLM_CONTEXT_WINDOW,
+    AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION,
+    AUTOLLAMAINDEX_ONNX_NUM_THREADS,
     AUTOLLAMAINDEX_QA_TEMPLATE,
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE,
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT,
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE,
+    AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL,
     AUTOLLAMAINDEX_REFINE_TEMPLATE,
     AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY,
     AUTOLLAMAINDEX_REMOVE_METADATA_POSTPROCESSOR,
@@ -75,18 +84,42 @@ from ..constants import (
     LLM_HF_DISABLE_SAMPLING,
     LLM_HF_TRUST_REMOTE_CODE,
     LLM_LLAMACPP_CONTEXT_WINDOW,
+    LLM_LLAMACPP_POOL_NUM_WORKERS,
+    LLM_LLAMACPP_POOL_THREADS_PER_WORKER,
+    LLM_LOCAL_BATCH_WAIT,
+    LLM_LOCAL_MAX_BATCH_SIZE,
+    LLM_LOCAL_QUEUE_MAX_SIZE,
+    LLM_LOCAL_QUEUE_TIMEOUT,
+    LLM_LOCAL_TIMEOUT,
     LLM_MAX_TOKENS,
     LLM_MODEL_ID,
     LLM_TEMPERATURE,
     LLM_TOP_P,
     LLM_VERTEXAI_CLOUD_LOCATION,
+    OPENBB_CACHE_DEFAULT_TTL,
+    OPENBB_CACHE_DEFAULT_TTLS,
+    OPENBB_CACHE_DIR,
+    OPENBB_CACHE_MAX_SIZE,
+    OPENBB_CACHE_TTLS,
+    OPENBB_EXECUTOR_MEMORY_LIMIT_MB,
+    OPENBB_EXECUTOR_NUM_WORKERS,
+    OPENBB_EXECUTOR_TIMEOUT,
     OPENBBCHAT_TOOL_DESCRIPTION,
+    REACT_PROMPT_TEMPLATE,
+    RESPONSE_CACHE_DEFAULT_TTL,
+    RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL,
+    RESPONSE_CACHE_MARKET_OPEN_DATA_TTL,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD,
     SEARCH_TOOL_DESCRIPTION,
     WIKIPEDIA_TOOL_DESCRIPTION,
     WORLD_KNOWLEDGE_TOOL_DESCRIPTION,
 )
+from ..executors import OpenBBCodeExecutor
+from ..metrics import register_local_llm_metrics
 from ..models import AppData
 from ..utils import get_openbb_chat_output
+from .http_clients import http_client_registry
 
 
 def set_api_debug():
@@ -109,19 +142,79 @@ def download_vsi(vsi_path: str):
         print(f"{vsi_path} already exists, assuming it was already downloaded")
 
 
-def load_embed_model() -> str | OpenAIEmbedding:
-    """Get LlamaIndex embedding model.
+def load_embed_model() -> BaseEmbedding:
+    """Get LlamaIndex embedding model, already loaded.
 
     Returns:
-        `str | OpenAIEmbedding`: ID of the model or the LangChain's OpenAI Embedding object.
+        `BaseEmbedding`: OpenAI's Ada 2 embeddings by default or the model given by ID. IDs
+            starting with `onnx:` are run with ONNX Runtime.
     """
 
     if AUTOLLAMAINDEX_EMBEDDING_MODEL_ID == "default":
         return OpenAIEmbedding(
             model=OpenAIEmbeddingModelType.TEXT_EMBED_ADA_002,
             timeout=AGENT_REQUEST_TIMEOUT,
+            http_client=http_client_registry.get_client("openai"),
+            async_http_client=http_client_registry.get_async_client("openai"),
         )
-    return AUTOLLAMAINDEX_EMBEDDING_MODEL_ID
+    return resolve_embed_model(
+        AUTOLLAMAINDEX_EMBEDDING_MODEL_ID,
+        quantize=not AUTOLLAMAINDEX_ONNX_DISABLE_QUANTIZATION,
+        intra_op_num_threads=AUTOLLAMAINDEX_ONNX_NUM_THREADS,
+    )
+
+
+def load_vector_store_index(embed_model: BaseEmbedding) -> str | VectorStoreIndex:
+    """Load the Vector Store Index (VSI) used by the OpenBB tool.
+
+    Remote (Pinecone) and persisted (`vsi:{path}` or `vsi-npy:{path}`) indexes are loaded, so
+    that it can be done while the LLM loads. Other paths (e.g., `files:{path}`) are returned as
+    they are, to be processed by `AutoRag`.
+
+    Args:
+        embed_model (`BaseEmbedding`): embedding model of the VSI.
+
+    Returns:
+        `str | VectorStoreIndex`: the loaded VSI or its path.
+    """
+
+    if AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY:
+        # Initialize connection to Pinecone
+        # NOTE: Modify to use a different vector store from LlamaIndex
+        pc = Pinecone(api_key=AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY)
+        vector_store = PineconeVectorStore(
+            pinecone_index=pc.Index(AUTOLLAMAINDEX_VSI_PATH), add_sparse_vector=True
+        )
+        return VectorStoreIndex.from_vector_store(
+            vector_store=vector_store, embed_model=embed_model
+        )
+    if AUTOLLAMAINDEX_VSI_PATH.startswith("vsi:"):
+        storage_context = StorageContext.from_defaults(
+            persist_dir=AUTOLLAMAINDEX_VSI_PATH.split(":", 1)[1]
+        )
+        return load_index_from_storage(storage_context=storage_context, embed_model=embed_model)
+    if AUTOLLAMAINDEX_VSI_PATH.startswith("vsi-npy:"):
+        persist_dir = AUTOLLAMAINDEX_VSI_PATH.split(":", 1)[1]
+        storage_context = StorageContext.from_defaults(
+            persist_dir=persist_dir,
+            vector_store=NumpyVectorStore.from_persist_dir(persist_dir),
+        )
+        return load_index_from_storage(storage_context=storage_context, embed_model=embed_model)
+    return AUTOLLAMAINDEX_VSI_PATH
+
+
+def get_bm25_persist_dir() -> str | None:
+    """Folder to persist the sparse BM25 matrix: `AUTOLLAMAINDEX_BM25_PERSIST_DIR` or, by default,
+    the folder of the local VSI.
+
+    Returns:
+        `str | None`: the folder, or None if there is no local VSI.
+    """
+    if AUTOLLAMAINDEX_BM25_PERSIST_DIR is not None:
+        return AUTOLLAMAINDEX_BM25_PERSIST_DIR
+    if AUTOLLAMAINDEX_VSI_PATH.startswith(("vsi:", "vsi-npy:")):
+        return AUTOLLAMAINDEX_VSI_PATH.split(":", 1)[1]
+    return None
 
 
 def create_openai_common_kwargs(llm_model_name: str) -> dict:
@@ -156,7 +249,7 @@ def load_llm_model() -> LLM:
     Several providers are currently supported:
     - OpenAI.
     - AWS Bedrock.
-    - Llama.cpp.
+    - Llama.cpp, in-process or as a pool of processes (`llamacpp-pool:`).
     - HuggingFace.
     The provider is selected and configured based on env variables.
 
@@ -167,6 +260,9 @@ def load_llm_model() -> LLM:
     model_provider, llm_model_name = LLM_MODEL_ID.split(":")
     openai_common_kwargs = create_openai_common_kwargs(llm_model_name)
     if model_provider == "openai":
+        # pooled connections shared with the rest of OpenAI models
+        openai_common_kwargs["http_client"] = http_client_registry.get_client("openai")
+        openai_common_kwargs["http_async_client"] = http_client_registry.get_async_client("openai")
         if "instruct" in llm_model_name:
             return OpenAI(**openai_common_kwargs)
         else:
@@ -188,17 +284,39 @@ def load_llm_model() -> LLM:
         openai_common_kwargs["max_output_tokens"] = openai_common_kwargs.pop("max_tokens")
         return VertexAI(location=LLM_VERTEXAI_CLOUD_LOCATION, **openai_common_kwargs)
     elif model_provider == "llamacpp":
-        return LlamaCpp(
+        # Llama.cpp generates one prompt at a time, so the prompts are only queued
+        return create_scheduled_llm(
+            LlamaCpp(
+                model_path=llm_model_name,
+                temperature=openai_common_kwargs["temperature"],
+                max_tokens=openai_common_kwargs["max_tokens"],
+                top_p=openai_common_kwargs["top_p"],
+                n_ctx=LLM_LLAMACPP_CONTEXT_WINDOW,
+            ),
+            max_batch_size=1,
+        )
+    elif model_provider == "llamacpp-pool":
+        # one replica per process, sharing the memory-mapped weights
+        llm_pool = LlamaCppPool(
             model_path=llm_model_name,
-            temperature=openai_common_kwargs["temperature"],
-            max_tokens=openai_common_kwargs["max_tokens"],
-            top_p=openai_common_kwargs["top_p"],
-            n_ctx=LLM_LLAMACPP_CONTEXT_WINDOW,
+            num_workers=LLM_LLAMACPP_POOL_NUM_WORKERS,
+            n_threads=LLM_LLAMACPP_POOL_THREADS_PER_WORKER,
+            max_queue_size=LLM_LOCAL_QUEUE_MAX_SIZE,
+            llama_cpp_kwargs={
+                "temperature": openai_common_kwargs["temperature"],
+                "max_tokens": openai_common_kwargs["max_tokens"],
+                "top_p": openai_common_kwargs["top_p"],
+                "n_ctx": LLM_LLAMACPP_CONTEXT_WINDOW,
+            },
         )
+        llm_pool.start()
+        register_local_llm_metrics(llm_pool)
+        return llm_pool
     elif model_provider == "hf":
-        return HuggingFacePipeline.from_model_id(
+        hf_llm = HuggingFacePipeline.from_model_id(
             model_id=llm_model_name,
             task="text-generation",
+            batch_size=LLM_LOCAL_MAX_BATCH_SIZE,
             pipeline_kwargs={
                 "max_new_tokens": openai_common_kwargs["max_tokens"],
             },
@@ -215,10 +333,36 @@ def load_llm_model() -> LLM:
                 "trust_remote_code": LLM_HF_TRUST_REMOTE_CODE,
             },
         )
+        # the generated tokens are counted with the tokenizer of the pipeline
+        return create_scheduled_llm(hf_llm, max_batch_size=LLM_LOCAL_MAX_BATCH_SIZE)
     else:
         raise NotImplementedError(f"Provider {model_provider} not implemented")
 
 
+def create_scheduled_llm(llm: LLM, **kwargs) -> ScheduledLLM:
+    """Put a local LLM behind a queue, so concurrent agent runs do not contend for it.
+
+    Args:
+        llm (`LLM`): in-process LLM (e.g., Llama.cpp or HuggingFace).
+        kwargs: overrides the env configuration of `ScheduledLLM`.
+
+    Returns:
+        `ScheduledLLM`: the scheduled LLM. Its queue depth and throughput are exported to Prometheus.
+    """
+    scheduled_llm = ScheduledLLM(
+        llm=llm,
+        **{
+            "max_queue_size": LLM_LOCAL_QUEUE_MAX_SIZE,
+            "max_wait": LLM_LOCAL_BATCH_WAIT,
+            "queue_timeout": LLM_LOCAL_QUEUE_TIMEOUT,
+            "timeout": LLM_LOCAL_TIMEOUT,
+            **kwargs,
+        },
+    )
+    register_local_llm_metrics(scheduled_llm)
+    return scheduled_llm
+
+
 def init_openbb_async_tool(
     auto_rag: AutoRag,
     node_postprocessors: list[BaseNodePostprocessor],
@@ -361,7 +505,10 @@ def init_world_knowledge_tool(
 
 
 def init_agent_tools(
-    embed_model: str | OpenAIEmbedding, llm: LLM, use_openai_agent: bool = False
+    embed_model: BaseEmbedding,
+    llm: LLM,
+    vsi: str | VectorStoreIndex,
+    use_openai_agent: bool = False,
 ) -> list[Tool]:
     """Initialize the agent tools.
 
@@ -370,9 +517,10 @@ def init_agent_tools(
     - OpenBB: custom tool to retrieve financial data using OpenBB Platform.
 
     Args:
-        embed_model (`str | OpenAIEmbedding`):
+        embed_model (`BaseEmbedding`):
             embedding model to use for the RAG. It should be the same as in the Vector Store Index.
         llm (`langchain_core.language_models.llms.LLM`): LLM to use inside the tools that need one.
+        vsi (`str | VectorStoreIndex`): Vector Store Index for the RAG, from `load_vector_store_index`.
 
     Returns:
         `list[Tool]`: list of agent tools to be used by the agent.
@@ -388,17 +536,13 @@ def init_agent_tools(
     if not use_openai_agent:
         llamaindex_llm = LangChainLLM(llm=llm)
     else:
-        llamaindex_llm = LlamaIndexOpenAI(model=llm.model_name, temperature=llm.temperature)
+        llamaindex_llm = http_client_registry.create_llama_index_openai(
+            model=llm.model_name, temperature=llm.temperature
+        )
 
     if AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY:
-        # Initialize connection to Pinecone
-        # NOTE: Modify to use a different vector store from LlamaIndex
-        pc = Pinecone(api_key=AUTOLLAMAINDEX_REMOTE_VECTOR_STORE_API_KEY)
-        vector_store = PineconeVectorStore(
-            pinecone_index=pc.Index(AUTOLLAMAINDEX_VSI_PATH), add_sparse_vector=True
-        )
         auto_rag = AutoRag(
-            vsi=VectorStoreIndex.from_vector_store(vector_store=vector_store),
+            vsi=vsi,
             embedding_model_id=embed_model,
             llm_model=llamaindex_llm,
             context_window=AUTOLLAMAINDEX_LLM_CONTEXT_WINDOW,
@@ -409,10 +553,14 @@ def init_agent_tools(
                 "vector_store_query_mode": "hybrid",
             },
             retriever_type="vector",
+            query_embedding_cache_size=AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE,
+            query_embedding_cache_ttl=AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL,
+            query_embedding_batch_size=AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE,
+            query_embedding_batch_wait=AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT,
         )
     else:
         auto_rag = AutoRag(
-            vsi=AUTOLLAMAINDEX_VSI_PATH,
+            vsi=vsi,
             embedding_model_id=embed_model,
             llm_model=llamaindex_llm,
             context_window=AUTOLLAMAINDEX_LLM_CONTEXT_WINDOW,
@@ -422,6 +570,17 @@ def init_agent_tools(
                 "similarity_top_k": AUTOLLAMAINDEX_VIR_SIMILARITY_TOP_K,
             },
             retriever_type=AUTOLLAMAINDEX_RETRIEVER_TYPE or "hybrid",
+            bm25_retriever_type=AUTOLLAMAINDEX_BM25_RETRIEVER_TYPE,
+            bm25_persist_dir=get_bm25_persist_dir(),
+            files_persist_dir=AUTOLLAMAINDEX_FILES_PERSIST_DIR,
+            other_hybrid_or_retriever_kwargs={
+                "fusion_mode": AUTOLLAMAINDEX_HYBRID_FUSION_MODE,
+                "similarity_top_k": AUTOLLAMAINDEX_HYBRID_SIMILARITY_TOP_K,
+            },
+            query_embedding_cache_size=AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_SIZE,
+            query_embedding_cache_ttl=AUTOLLAMAINDEX_QUERY_EMBEDDING_CACHE_TTL,
+            query_embedding_batch_size=AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_SIZE,
+            query_embedding_batch_wait=AUTOLLAMAINDEX_QUERY_EMBEDDING_BATCH_WAIT,
         )
 
     return [
@@ -439,28 +598,55 @@ def init_agent_tools(
     ]
 
 
-def init_api(app_data: AppData):
+def load_embed_model_and_vsi() -> tuple[BaseEmbedding, str | VectorStoreIndex]:
+    """Load the embedding model and then the Vector Store Index that depends on it."""
+    embed_model = load_embed_model()
+    return embed_model, load_vector_store_index(embed_model)
+
+
+def init_api(app_data: AppData, stop_event: threading.Event | None = None):
     """Initial function called during the application startup.
 
+    The independent components (worker processes, LLM, embedding model and VSI) are loaded
+    concurrently. No network access is needed apart from the one of the configured providers.
+
     Args:
         app_data (`AppData`): global application data.
+        stop_event (`threading.Event | None`): set when the application is shutting down, to skip
+            the remaining stages. The components already loaded are kept in `app_data`.
     """
 
     set_api_debug()
 
-    embed_model = load_embed_model()
-
-    # Create LLM for both langchain agent and llama-index
-    # In the future this logic could be moved to openbb-chat
-    llm = load_llm_model()
+    # Pre-warmed worker processes to execute the code generated for OpenBB
+    app_data.code_executor = OpenBBCodeExecutor(
+        num_workers=OPENBB_EXECUTOR_NUM_WORKERS,
+        timeout=OPENBB_EXECUTOR_TIMEOUT,
+        memory_limit_mb=OPENBB_EXECUTOR_MEMORY_LIMIT_MB,
+        cache_kwargs={
+            "max_size": OPENBB_CACHE_MAX_SIZE,
+            "default_ttl": OPENBB_CACHE_DEFAULT_TTL,
+            "ttls": {**OPENBB_CACHE_DEFAULT_TTLS, **OPENBB_CACHE_TTLS},
+            "cache_dir": OPENBB_CACHE_DIR,
+        },
+    )
 
-    # REPL to execute code
-    app_data.python_repl_utility = PythonREPL()
-    app_data.python_repl_utility.globals = globals()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        code_executor_future = pool.submit(app_data.code_executor.start)
+        # Create LLM for both langchain agent and llama-index
+        # In the future this logic could be moved to openbb-chat
+        llm_future = pool.submit(load_llm_model)
+        embed_model_and_vsi_future = pool.submit(load_embed_model_and_vsi)
+        llm = llm_future.result()
+        app_data.llm = llm
+        embed_model, vsi = embed_model_and_vsi_future.result()
+        code_executor_future.result()
+    if stop_event is not None and stop_event.is_set():
+        return
 
     # Create agent
     if "openai" in LLM_MODEL_ID:
-        tools = init_agent_tools(embed_model=embed_model, llm=llm, use_openai_agent=True)
+        tools = init_agent_tools(embed_model=embed_model, llm=llm, vsi=vsi, use_openai_agent=True)
         prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -484,12 +670,9 @@ def init_api(app_data: AppData):
             | OpenAIToolsAgentOutputParser()
         )
     else:
-        tools = init_agent_tools(embed_model=embed_model, llm=llm, use_openai_agent=False)
-        prompt = (
-            PromptTemplate.from_template(CUSTOM_GPTSTONKS_PREFIX)
-            if CUSTOM_GPTSTONKS_PREFIX
-            else hub.pull("hwchase17/react")
-        )
+        tools = init_agent_tools(embed_model=embed_model, llm=llm, vsi=vsi, use_openai_agent=False)
+        # Local copy of the "hwchase17/react" prompt, to avoid pulling it from the hub
+        prompt = PromptTemplate.from_template(CUSTOM_GPTSTONKS_PREFIX or REACT_PROMPT_TEMPLATE)
         agent = create_react_agent(tools=tools, llm=llm, prompt=prompt)
 
     app_data.agent_executor = AgentExecutor(
@@ -499,3 +682,14 @@ def init_api(app_data: AppData):
         return_intermediate_steps=True,
         early_stopping_method=AGENT_EARLY_STOPPING_METHOD,
     )
+
+    # Semantic cache of whole responses, reusing the embedding model of AutoRag
+    if RESPONSE_CACHE_MAX_SIZE > 0:
+        app_data.response_cache = SemanticResponseCache(
+            embed_model=embed_model,
+            max_size=RESPONSE_CACHE_MAX_SIZE,
+            similarity_threshold=RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+            market_open_data_ttl=RESPONSE_CACHE_MARKET_OPEN_DATA_TTL,
+            market_closed_data_ttl=RESPONSE_CACHE_MARKET_CLOSED_DATA_TTL,
+            default_ttl=RESPONSE_CACHE_DEFAULT_TTL,
+        )
@@ -0,0 +1,93 @@
+import importlib.util
+import threading
+import warnings
+
+import httpx
+from llama_index.llms.openai import OpenAI as LlamaIndexOpenAI
+
+from ..constants import (
+    HTTP_CLIENT_DISABLE_HTTP2,
+    HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    HTTP_CLIENT_MAX_CONNECTIONS,
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+class HTTPClientRegistry:
+    """Pooled HTTP clients shared by all the LangChain and LlamaIndex objects of a provider.
+
+    Each provider (e.g., `openai`) gets one sync and one async `httpx` client, created on first use,
+    so the LLMs and embedding models reuse the same keep-alive connections and TLS sessions instead
+    of opening their own. HTTP/2 requires the `h2` package; without it, HTTP/1.1 is used.
+
+    Args:
+        max_connections (`int`): max. number of connections per client.
+        max_keepalive_connections (`int`): max. number of idle connections kept alive per client.
+        keepalive_expiry (`float`): seconds to keep an idle connection alive.
+        http2 (`bool`): whether to use HTTP/2 when the server supports it.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            warnings.warn("`h2` is not installed, so the HTTP clients use HTTP/1.1")
+            http2 = False
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._clients: dict[str, httpx.Client] = {}
+        self._async_clients: dict[str, httpx.AsyncClient] = {}
+        # the models are loaded from several threads during the startup
+        self._lock = threading.Lock()
+
+    def get_client(self, provider: str) -> httpx.Client:
+        """Sync client of the provider."""
+        with self._lock:
+            if provider not in self._clients:
+                self._clients[provider] = httpx.Client(limits=self.limits, http2=self.http2)
+            return self._clients[provider]
+
+    def get_async_client(self, provider: str) -> httpx.AsyncClient:
+        """Async client of the provider."""
+        with self._lock:
+            if provider not in self._async_clients:
+                self._async_clients[provider] = httpx.AsyncClient(
+                    limits=self.limits, http2=self.http2
+                )
+            return self._async_clients[provider]
+
+    def create_llama_index_openai(self, **kwargs) -> LlamaIndexOpenAI:
+        """LlamaIndex's OpenAI LLM using the sync and async `openai` clients."""
+        return LlamaIndexOpenAI(
+            http_client=self.get_client("openai"),
+            async_http_client=self.get_async_client("openai"),
+            **kwargs,
+        )
+
+    async def aclose(self):
+        """Close the connections of all the clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            async_clients = list(self._async_clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            client.close()
+        for async_client in async_clients:
+            await async_client.aclose()
+
+
+http_client_registry = HTTPClientRegistry(
+    max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    http2=not HTTP_CLIENT_DISABLE_HTTP2,
+)
@@ -0,0 +1 @@
+from .job_queue import JobQueue as JobQueue
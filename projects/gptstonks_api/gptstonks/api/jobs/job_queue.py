@@ -0,0 +1,154 @@
+import asyncio
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from ..models import BaseAgentResponse, DataAgentResponse, JobResponse, JobStatus
+
+
+class JobQueue:
+    """Bounded queue of queries processed in the background by a pool of async workers.
+
+    Jobs are kept in memory after finishing so their result can be polled, and they are removed
+    once `result_ttl` seconds have passed. A job fails if `process_func` raises an exception or
+    returns an error response, or if the queue is stopped before it finishes.
+
+    Args:
+        process_func (`Callable[[str], Awaitable[BaseAgentResponse | DataAgentResponse]]`):
+            coroutine function that processes a query and returns the API response.
+        num_workers (`int`): number of workers processing jobs concurrently.
+        max_queue_size (`int`): max. number of pending jobs. Submitting more raises `asyncio.QueueFull`.
+        result_ttl (`float`): seconds to keep finished jobs available.
+    """
+
+    def __init__(
+        self,
+        process_func: Callable[[str], Awaitable[BaseAgentResponse | DataAgentResponse]],
+        num_workers: int = 4,
+        max_queue_size: int = 100,
+        result_ttl: float = 3600,
+    ):
+        self.process_func = process_func
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self.result_ttl = result_ttl
+        self._queue: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: dict[str, JobResponse] = {}
+        self._finished_at_monotonic: dict[str, float] = {}
+
+    async def start(self):
+        """Start the workers.
+
+        Must be called from within the running event loop.
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        """Cancel the workers, marking the running and pending jobs as failed."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job_id, job in self._jobs.items():
+            if job.status in (JobStatus.PENDING, JobStatus.RUNNING):
+                self._finish_job(
+                    job_id,
+                    status=JobStatus.FAILED,
+                    result=BaseAgentResponse(
+                        type="error", body="The server stopped before the job finished."
+                    ),
+                )
+
+    @property
+    def num_pending(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, query: str, include_timings: bool = False) -> JobResponse:
+        """Enqueue a new query.
+
+        Args:
+            query (`str`): user query to process.
+            include_timings (`bool`): whether to return the timings of the result when polled.
+
+        Returns:
+            `JobResponse`: the pending job.
+
+        Raises:
+            `RuntimeError`: if the workers have not been started.
+            `asyncio.QueueFull`: if there are already `max_queue_size` pending jobs.
+        """
+        if self._queue is None:
+            raise RuntimeError("The job queue has not been started")
+        self._purge_expired_jobs()
+        job = JobResponse(
+            job_id=str(uuid.uuid4()),
+            query=query,
+            created_at=datetime.now(timezone.utc),
+            include_timings=include_timings,
+        )
+        self._queue.put_nowait(job.job_id)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> JobResponse | None:
+        """Get a job by its ID.
+
+        Args:
+            job_id (`str`): ID returned when the job was submitted.
+
+        Returns:
+            `JobResponse | None`: the job, or None if it does not exist or has expired.
+        """
+        self._purge_expired_jobs()
+        return self._jobs.get(job_id)
+
+    def _purge_expired_jobs(self):
+        """Remove finished jobs older than `result_ttl`."""
+        now = time.monotonic()
+        expired = [
+            job_id
+            for job_id, finished_at in self._finished_at_monotonic.items()
+            if now - finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._finished_at_monotonic.pop(job_id, None)
+
+    def _finish_job(
+        self,
+        job_id: str,
+        status: JobStatus,
+        result: BaseAgentResponse | DataAgentResponse,
+    ):
+        job = self._jobs[job_id]
+        job.status = status
+        job.result = result
+        job.finished_at = datetime.now(timezone.utc)
+        self._finished_at_monotonic[job_id] = time.monotonic()
+
+    async def _worker(self):
+        """Process jobs from the queue until cancelled."""
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs[job_id]
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            try:
+                result = await self.process_func(job.query)
+                # the agent returns its errors as responses instead of raising them
+                status = JobStatus.FAILED if result.type == "error" else JobStatus.FINISHED
+                self._finish_job(job_id, status=status, result=result)
+            except Exception:
+                print(f"Job {job_id} failed. Trace:\n{traceback.format_exc()}")
+                self._finish_job(
+                    job_id,
+                    status=JobStatus.FAILED,
+                    result=BaseAgentResponse(type="error", body="Sorry, something went wrong!"),
+                )
+            finally:
+                self._queue.task_done()
@@ -1,28 +1,81 @@
+import asyncio
+import threading
+import traceback
 from contextlib import asynccontextmanager
+from functools import partial
 
 from dotenv import load_dotenv
 
 load_dotenv(".env.template")
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from .agent import run_agent_in_background
-from .constants import API_DESCRIPTION
-from .initialization import init_api
-from .models import AppData, BaseAgentResponse, DataAgentResponse, QueryIn
+from gptstonks.wrappers.llms import LlamaCppPool, ScheduledLLM
+
+from .agent import run_agent_in_background, stream_agent_events
+from .constants import (
+    API_DESCRIPTION,
+    JOBS_NUM_WORKERS,
+    JOBS_QUEUE_MAX_SIZE,
+    JOBS_RESULT_TTL,
+)
+from .initialization import http_client_registry, init_api
+from .jobs import JobQueue
+from .metrics import RequestTimings
+from .models import (
+    AppData,
+    BaseAgentResponse,
+    DataAgentResponse,
+    HealthResponse,
+    JobResponse,
+    QueryIn,
+)
 from .routers import tokens
 
 app_data = AppData()
+job_queue = JobQueue(
+    process_func=partial(run_agent_in_background, app_data=app_data),
+    num_workers=JOBS_NUM_WORKERS,
+    max_queue_size=JOBS_QUEUE_MAX_SIZE,
+    result_ttl=JOBS_RESULT_TTL,
+)
+
+
+async def startup(stop_event: threading.Event):
+    """Initialize everything, marking the application as ready when finished."""
+    try:
+        await asyncio.to_thread(init_api, app_data=app_data, stop_event=stop_event)
+        if stop_event.is_set():
+            return
+        await job_queue.start()
+        app_data.ready = True
+    except Exception as e:
+        print(f"Startup failed. Trace:\n{traceback.format_exc()}")
+        app_data.startup_error = repr(e)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Control the FastAPI lifecycle."""
-    # Initialize everything
-    init_api(app_data=app_data)
+    # Initialize everything in the background, so the health checks can be served meanwhile
+    stop_event = threading.Event()
+    startup_task = asyncio.create_task(startup(stop_event))
     yield
-    # Nothing to do when releasing
+    # The thread of `init_api` cannot be cancelled: stop it after its current stage and wait for
+    # it, so everything it created is shut down below
+    stop_event.set()
+    await startup_task
+    # Stop the background workers
+    await job_queue.stop()
+    if app_data.code_executor is not None:
+        app_data.code_executor.shutdown()
+    # Stop the queue and the processes of the local LLMs
+    if isinstance(app_data.llm, (LlamaCppPool, ScheduledLLM)):
+        await asyncio.to_thread(app_data.llm.shutdown)
+    await http_client_registry.aclose()
 
 
 app = FastAPI(
@@ -51,18 +104,166 @@ app.add_middleware(
 app.include_router(tokens.router)
 
 
-@app.post("/process_query_async")
-async def process_query_async(
-    request: Request, query_in: QueryIn
+def require_ready():
+    """Dependency to reject the queries until the startup finishes."""
+    if not app_data.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The application is starting, try again later",
+        )
+
+
+def set_server_timing(
+    response: Response,
+    agent_response: BaseAgentResponse | DataAgentResponse,
+    include_timings: bool,
+) -> BaseAgentResponse | DataAgentResponse:
+    """Send the timings of the agent's response in the `Server-Timing` header, removing them from
+    the body unless requested.
+
+    Args:
+        response (`Response`): FastAPI response whose headers are set.
+        agent_response (`BaseAgentResponse | DataAgentResponse`): response with its `timings`.
+        include_timings (`bool`): whether to keep the `timings` in the response body.
+
+    Returns:
+        `BaseAgentResponse | DataAgentResponse`: the response to return.
+    """
+    if agent_response.timings is None:
+        return agent_response
+    response.headers["Server-Timing"] = RequestTimings(agent_response.timings).to_server_timing()
+    if include_timings:
+        return agent_response
+    return agent_response.model_copy(update={"timings": None})
+
+
+@app.get("/health/live")
+async def health_live() -> HealthResponse:
+    """Liveness check: the process is up and serving requests, even during the startup.
+
+    Returns:
+        `HealthResponse`: with status `alive`.
+    """
+    return HealthResponse(status="alive")
+
+
+@app.get("/health/ready")
+async def health_ready() -> HealthResponse:
+    """Readiness check: all the components are loaded and the queries can be processed.
+
+    Returns:
+        `HealthResponse`: with status `ready`. 503 is returned while starting or if the startup failed.
+    """
+    if app_data.startup_error is not None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Startup failed: {app_data.startup_error}",
+        )
+    require_ready()
+    return HealthResponse(status="ready")
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics: latencies of the LLM, tools, OpenBB RAG and code execution, agent
+    iterations and token counts.
+
+    Returns:
+        `Response`: metrics in Prometheus text format.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post(
+    "/process_query_async",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_ready)],
+)
+async def process_query_async(request: Request, query_in: QueryIn) -> JobResponse:
+    """Asynchronous endpoint to start processing the given query. The query is enqueued and
+    processed in the background by a pool of workers, and the job is returned right away.
+
+    Poll `GET /jobs/{job_id}` to get the status and the eventual result.
+
+    Args:
+        request (`Request`): FastAPI request object containing the query to be processed.
+        query_in (`QueryIn`): validated query by the user.
+
+    Returns:
+        `JobResponse`: the pending job, including its ID.
+    """
+    try:
+        return job_queue.submit(query_in.query, include_timings=query_in.include_timings)
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending queries, try again later",
+        )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, response: Response) -> JobResponse:
+    """Get the status, timings and result of a job started with `/process_query_async`.
+
+    Once finished, the timing breakdown of the query is sent in the `Server-Timing` header.
+
+    Args:
+        job_id (`str`): ID of the job.
+        response (`Response`): FastAPI response, to set the headers.
+
+    Returns:
+        `JobResponse`: the job. Its `result` is set once the status is `finished` or `failed`.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.result is not None:
+        return job.model_copy(
+            update={
+                "result": set_server_timing(
+                    response, job.result, include_timings=job.include_timings
+                )
+            }
+        )
+    return job
+
+
+@app.post("/process_query", dependencies=[Depends(require_ready)])
+async def process_query(
+    request: Request, query_in: QueryIn, response: Response
 ) -> BaseAgentResponse | DataAgentResponse:
-    """Asynchronous endpoint to start processing the given query. The processing runs in the
-    background and the result is eventually returned.
+    """Endpoint to process the given query, keeping the connection open until the agent finishes.
+
+    The timing breakdown of the query is sent in the `Server-Timing` header and, if
+    `include_timings` is set, in the `timings` field of the response.
 
     Args:
         request (`Request`): FastAPI request object containing the query to be processed.
         query_in (`QueryIn`): validated query by the user.
+        response (`Response`): FastAPI response, to set the headers.
 
     Returns:
         `BaseAgentResponse | DataAgentResponse`: the standard response by the API.
     """
-    return await run_agent_in_background(query=query_in.query, app_data=app_data)
+    agent_response = await run_agent_in_background(query=query_in.query, app_data=app_data)
+    return set_server_timing(response, agent_response, include_timings=query_in.include_timings)
+
+
+@app.post("/process_query_stream", dependencies=[Depends(require_ready)])
+async def process_query_stream(request: Request, query_in: QueryIn) -> StreamingResponse:
+    """Streaming endpoint to process the given query. The agent's progress is sent as Server-Sent
+    Events (SSE): `token` for each LLM token, `tool_start`/`tool_end` when the tools run and
+    `response` with the final response.
+
+    Args:
+        request (`Request`): FastAPI request object containing the query to be processed.
+        query_in (`QueryIn`): validated query by the user.
+
+    Returns:
+        `StreamingResponse`: `text/event-stream` response with the agent's events.
+    """
+    return StreamingResponse(
+        stream_agent_events(query=query_in.query, app_data=app_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
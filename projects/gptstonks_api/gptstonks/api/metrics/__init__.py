@@ -0,0 +1,14 @@
+from .prometheus import AGENT_ITERATIONS as AGENT_ITERATIONS
+from .prometheus import CODE_EXECUTION_SECONDS as CODE_EXECUTION_SECONDS
+from .prometheus import LLM_CALL_SECONDS as LLM_CALL_SECONDS
+from .prometheus import LLM_TOKENS as LLM_TOKENS
+from .prometheus import LOCAL_LLM_QUEUE_DEPTH as LOCAL_LLM_QUEUE_DEPTH
+from .prometheus import LOCAL_LLM_TOKENS_PER_SECOND as LOCAL_LLM_TOKENS_PER_SECOND
+from .prometheus import OPENBB_RAG_SECONDS as OPENBB_RAG_SECONDS
+from .prometheus import TOOL_CALL_SECONDS as TOOL_CALL_SECONDS
+from .prometheus import create_agent_callbacks as create_agent_callbacks
+from .prometheus import observe_agent_callbacks as observe_agent_callbacks
+from .prometheus import register_local_llm_metrics as register_local_llm_metrics
+from .timings import RequestTimings as RequestTimings
+from .timings import current_request_timings as current_request_timings
+from .timings import time_stage as time_stage
@@ -0,0 +1,100 @@
+from prometheus_client import Gauge, Histogram
+
+from gptstonks.wrappers.llms import LlamaCppPool, ScheduledLLM
+
+from ..callbacks import LLMTimeCallback, ToolExecutionOrderCallback, ToolTimeCallback
+from ..constants import LLM_MODEL_ID
+
+# the model is fixed per deployment, so it is a low-cardinality label
+_MODEL_LABEL = str(LLM_MODEL_ID)
+
+LLM_CALL_SECONDS = Histogram(
+    "gptstonks_llm_call_seconds",
+    "Latency of each call to the agent's LLM.",
+    ["model"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80),
+)
+TOOL_CALL_SECONDS = Histogram(
+    "gptstonks_tool_call_seconds",
+    "Latency of each tool call of the agent.",
+    ["tool"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80),
+)
+OPENBB_RAG_SECONDS = Histogram(
+    "gptstonks_openbb_rag_seconds",
+    "Latency of the retrieval and synthesis stages of the OpenBB tool.",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20),
+)
+CODE_EXECUTION_SECONDS = Histogram(
+    "gptstonks_code_execution_seconds",
+    "Latency of the execution of the code generated for OpenBB.",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80),
+)
+AGENT_ITERATIONS = Histogram(
+    "gptstonks_agent_iterations",
+    "Number of actions (tool calls) taken by the agent per query.",
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15),
+)
+LLM_TOKENS = Histogram(
+    "gptstonks_llm_tokens",
+    "Number of tokens per query used by the agent's LLM, if reported by the provider.",
+    ["model", "type"],
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+LOCAL_LLM_QUEUE_DEPTH = Gauge(
+    "gptstonks_local_llm_queue_depth",
+    "Number of prompts waiting for the local LLM (Llama.cpp or HuggingFace).",
+)
+LOCAL_LLM_TOKENS_PER_SECOND = Gauge(
+    "gptstonks_local_llm_tokens_per_second",
+    "Tokens generated per second by the local LLM while generating.",
+)
+
+
+def create_agent_callbacks() -> (
+    tuple[LLMTimeCallback, ToolTimeCallback, ToolExecutionOrderCallback]
+):
+    """Create the per-request callbacks to measure an agent run.
+
+    Returns:
+        `tuple[LLMTimeCallback, ToolTimeCallback, ToolExecutionOrderCallback]`: callbacks to pass
+            to the agent executor.
+    """
+    return LLMTimeCallback(), ToolTimeCallback(), ToolExecutionOrderCallback()
+
+
+def observe_agent_callbacks(
+    llm_time_callback: LLMTimeCallback,
+    tool_time_callback: ToolTimeCallback,
+    tool_execution_order_callback: ToolExecutionOrderCallback,
+):
+    """Record the measures of an agent run in the Prometheus metrics.
+
+    Args:
+        llm_time_callback (`LLMTimeCallback`): LLM latencies and token counts.
+        tool_time_callback (`ToolTimeCallback`): tool latencies.
+        tool_execution_order_callback (`ToolExecutionOrderCallback`): tools used by the agent.
+    """
+    for llm_time_seconds in llm_time_callback.llm_executions_times_seconds:
+        LLM_CALL_SECONDS.labels(model=_MODEL_LABEL).observe(llm_time_seconds)
+    for tool_name, tool_time_seconds in tool_time_callback.tools_executions_times_seconds:
+        TOOL_CALL_SECONDS.labels(tool=tool_name).observe(tool_time_seconds)
+    AGENT_ITERATIONS.observe(len(tool_execution_order_callback.tools_used))
+    if llm_time_callback.prompt_tokens > 0 or llm_time_callback.completion_tokens > 0:
+        LLM_TOKENS.labels(model=_MODEL_LABEL, type="prompt").observe(
+            llm_time_callback.prompt_tokens
+        )
+        LLM_TOKENS.labels(model=_MODEL_LABEL, type="completion").observe(
+            llm_time_callback.completion_tokens
+        )
+
+
+def register_local_llm_metrics(llm: ScheduledLLM | LlamaCppPool):
+    """Export the queue depth and throughput of a local LLM in the Prometheus metrics.
+
+    Args:
+        llm (`ScheduledLLM | LlamaCppPool`): scheduler or pool of the local LLM.
+    """
+    LOCAL_LLM_QUEUE_DEPTH.set_function(lambda: llm.stats["queue_depth"])
+    LOCAL_LLM_TOKENS_PER_SECOND.set_function(lambda: llm.stats["tokens_per_second"])
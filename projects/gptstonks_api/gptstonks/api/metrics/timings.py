@@ -0,0 +1,63 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class RequestTimings:
+    """Breakdown of the time spent by a request, in seconds per stage.
+
+    The durations of the stages that run several times (e.g., the agent's LLM calls) are added up.
+
+    Args:
+        stages (`dict[str, float] | None`): initial seconds per stage.
+    """
+
+    def __init__(self, stages: dict[str, float] | None = None):
+        self.stages: dict[str, float] = dict(stages or {})
+
+    def add(self, stage: str, seconds: float):
+        """Add a duration to a stage.
+
+        Args:
+            stage (`str`): name of the stage (e.g., `retrieval`).
+            seconds (`float`): duration to add.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> dict[str, float]:
+        return dict(self.stages)
+
+    def to_server_timing(self) -> str:
+        """Format the stages as the value of a `Server-Timing` HTTP header, in milliseconds.
+
+        Returns:
+            `str`: e.g., `agent;dur=1520.3, retrieval;dur=85.1`.
+        """
+        return ", ".join(
+            f"{re.sub(r'[^A-Za-z0-9_.-]', '_', stage)};dur={seconds * 1000:.1f}"
+            for stage, seconds in self.stages.items()
+        )
+
+
+# timings of the request being processed in the current async context, if any
+current_request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "current_request_timings", default=None
+)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Measure a block of code as a stage of the current request, if timings are being collected.
+
+    Args:
+        stage (`str`): name of the stage.
+    """
+    request_timings = current_request_timings.get()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        if request_timings is not None:
+            request_timings.add(stage, time.perf_counter() - start_time)
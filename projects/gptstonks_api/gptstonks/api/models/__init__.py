@@ -1,7 +1,10 @@
 from .data import AppData as AppData
 from .data import TokenData as TokenData
+from .job import JobResponse as JobResponse
+from .job import JobStatus as JobStatus
 from .query import QueryIn as QueryIn
 from .response import BaseAgentResponse as BaseAgentResponse
 from .response import DataAgentResponse as DataAgentResponse
+from .response import HealthResponse as HealthResponse
 from .response import MessageResponse as MessageResponse
 from .response import TokenResponse as TokenResponse
@@ -1,7 +1,10 @@
 from langchain.agents.agent import AgentExecutor
-from langchain_community.utilities import PythonREPL
+from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, ConfigDict
 
+from ..caches.semantic_response_cache import SemanticResponseCache
+from ..executors import OpenBBCodeExecutor
+
 
 class TokenData(BaseModel):
     """Model to define the list of tokens available."""
@@ -15,4 +18,8 @@ class AppData(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     agent_executor: AgentExecutor | None = None
-    python_repl_utility: PythonREPL | None = None
+    llm: BaseLanguageModel | None = None
+    code_executor: OpenBBCodeExecutor | None = None
+    response_cache: SemanticResponseCache | None = None
+    ready: bool = False
+    startup_error: str | None = None
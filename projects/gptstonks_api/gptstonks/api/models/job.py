@@ -0,0 +1,44 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, Field, computed_field
+
+from .response import BaseAgentResponse, DataAgentResponse
+
+
+class JobStatus(str, Enum):
+    """Possible states of a background job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+
+class JobResponse(BaseModel):
+    """Model to define the status, timings and result of a background job."""
+
+    job_id: str
+    status: JobStatus = JobStatus.PENDING
+    query: str
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: DataAgentResponse | BaseAgentResponse | None = None
+    include_timings: bool = Field(default=False, exclude=True)
+
+    @computed_field
+    @property
+    def queue_time_seconds(self) -> float | None:
+        """Seconds the job waited in the queue before a worker picked it up."""
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.created_at).total_seconds()
+
+    @computed_field
+    @property
+    def run_time_seconds(self) -> float | None:
+        """Seconds spent by the worker processing the job."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
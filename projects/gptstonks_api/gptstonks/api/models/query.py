@@ -5,3 +5,4 @@ class QueryIn(BaseModel):
     """Model to define the main query parameters."""
 
     query: str
+    include_timings: bool = False
@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel, Json
 
 
@@ -6,6 +8,8 @@ class BaseAgentResponse(BaseModel):
 
     type: str
     body: str
+    metadata: dict[str, Any] | None = None
+    timings: dict[str, float] | None = None
 
 
 class DataAgentResponse(BaseAgentResponse):
@@ -20,6 +24,12 @@ class MessageResponse(BaseModel):
     message: str
 
 
+class HealthResponse(BaseModel):
+    """Model to define the health checks' response."""
+
+    status: str
+
+
 class TokenResponse(BaseModel):
     """Model to define the tokens' endpoint response."""
 
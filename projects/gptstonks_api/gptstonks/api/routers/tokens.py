@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from ..databases import db
+from ..databases import get_openbb_pat, update_openbb_pat
 from ..models import MessageResponse, TokenData, TokenResponse
 
 router = APIRouter(prefix="/tokens", tags=["tokens"])
@@ -16,7 +16,7 @@ async def update_token(token_data: TokenData) -> MessageResponse:
     Returns:
         `MessageResponse`: message indicating success.
     """
-    db.tokens.update_one({}, {"$set": token_data.dict()}, upsert=True)
+    await update_openbb_pat(token_data)
     return MessageResponse(message="Token updated")
 
 
@@ -27,5 +27,5 @@ async def get_token() -> TokenResponse:
     Returns:
         `TokenResponse`: token for OpenBB.
     """
-    token = db.tokens.find_one({}, {"_id": 0, "openbb": 1})
-    return TokenResponse.model_validate(token) if token else TokenResponse(openbb="")
+    openbb_pat = await get_openbb_pat()
+    return TokenResponse(openbb=openbb_pat or "")
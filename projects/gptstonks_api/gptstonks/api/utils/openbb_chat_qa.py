@@ -1,10 +1,12 @@
 from typing import List, Optional
 
-from langchain_community.utilities import PythonREPL
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
 
 from gptstonks.wrappers.kernels import AutoRag
 
+from ..executors import OpenBBCodeExecutor
+from ..metrics import CODE_EXECUTION_SECONDS, OPENBB_RAG_SECONDS, time_stage
+
 
 async def get_openbb_chat_output(
     query_str: str,
@@ -27,53 +29,48 @@ async def get_openbb_chat_output(
     Returns:
         `str`: response by the RAG system to the given query.
     """
-    nodes = await auto_rag.aretrieve(query_str)
-    if node_postprocessors is not None:
-        for node_postprocessor in node_postprocessors:
-            nodes = node_postprocessor.postprocess_nodes(nodes)
-    return (await auto_rag.asynth(str_or_query_bundle=query_str, nodes=nodes)).response
+    with OPENBB_RAG_SECONDS.labels(stage="retrieval").time(), time_stage("retrieval"):
+        nodes = await auto_rag.aretrieve(query_str)
+        if node_postprocessors is not None:
+            for node_postprocessor in node_postprocessors:
+                nodes = node_postprocessor.postprocess_nodes(nodes)
+    with OPENBB_RAG_SECONDS.labels(stage="synthesis").time(), time_stage("synthesis"):
+        return (await auto_rag.asynth(str_or_query_bundle=query_str, nodes=nodes)).response
 
 
-def fix_frequent_code_errors(prev_code: str, openbb_pat: Optional[str] = None) -> str:
+def fix_frequent_code_errors(prev_code: str) -> str:
     """Fix common errors in the LLM-generated code.
 
-    It also adds OpenBB Personal Access Token (PAT) to authenticate the OpenBB Platform calls and use the user's data providers.
+    The OpenBB Personal Access Token (PAT) is not added to the code, the worker process that runs
+    it logs in OpenBB Hub instead.
 
     Args:
         prev_code (`str`): code generated by the LLM.
-        openbb_pat (`Optional[str]`): user's OpenBB PAT.
 
     Returns:
-        `str`: new code with fixes and PAT included.
+        `str`: new code with fixes.
     """
     if "import pandas as pd" not in prev_code:
         prev_code = f"import pandas as pd\n{prev_code}"
     if "obb." in prev_code and "from openbb import obb" not in prev_code:
         prev_code = f"from openbb import obb\n{prev_code}"
-    # login to openbb hub from inside the REPL if a PAT is provided
-    if openbb_pat is not None:
-        prev_code = prev_code.replace(
-            "from openbb import obb\n",
-            f"from openbb import obb\nobb.account.login(pat='{openbb_pat}')\n",
-            1,
-        )
     # convert generic openbb output to JSON
     prev_code = f'{prev_code}\nprint(pd.DataFrame.from_records([dict(r) for r in res.results]).to_json(orient="records"))'
     return prev_code
 
 
-def run_repl_over_openbb(
-    openbb_chat_output: str, python_repl_utility: PythonREPL, openbb_pat: Optional[str] = None
+async def run_repl_over_openbb(
+    openbb_chat_output: str, code_executor: OpenBBCodeExecutor, openbb_pat: Optional[str] = None
 ) -> str:
-    """Run REPL over the code generated by the LLM.
+    """Run the code generated by the LLM in a worker process of the code executor.
 
     Args:
         openbb_chat_output (`str`): output generated by the LLM in the agent's OpenBB Tool.
-        python_repl_utility (`PythonREPL`): REPL to run the generated code with.
-        openbb_pat (`Optional[str]`): user's OpenBB PAT.
+        code_executor (`OpenBBCodeExecutor`): pool of workers to run the generated code with.
+        openbb_pat (`Optional[str]`): user's OpenBB PAT. The worker logs in OpenBB Hub with it.
 
     Returns:
-        `str`: the output of the REPL call, which is stdout.
+        `str`: the output of the code execution, which is stdout.
     """
     if "```python" not in openbb_chat_output:
         # no code available to execute
@@ -83,9 +80,10 @@ def run_repl_over_openbb(
         if "```python" in openbb_chat_output
         else openbb_chat_output
     )
-    fixed_code_str = fix_frequent_code_errors(code_str, openbb_pat)
+    fixed_code_str = fix_frequent_code_errors(code_str)
     # run Python and get output
-    repl_output = python_repl_utility.run(fixed_code_str)
+    with CODE_EXECUTION_SECONDS.time(), time_stage("code_execution"):
+        repl_output = await code_executor.arun(fixed_code_str, openbb_pat=openbb_pat)
     # get OpenBB's functions called for explicability
     openbb_funcs_called = set()
     for code_line in code_str.split("\n"):
@@ -0,0 +1,63 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+import gptstonks.api.main as main
+
+
+def wait_until(condition, timeout: float = 5):
+    start = time.monotonic()
+    while not condition() and time.monotonic() - start < timeout:
+        time.sleep(0.01)
+
+
+def test_health_during_startup(monkeypatch):
+    init_finished = threading.Event()
+    monkeypatch.setattr(main, "init_api", lambda app_data, stop_event: init_finished.wait(5))
+    monkeypatch.setattr(main, "app_data", main.AppData())
+
+    with TestClient(main.app) as client:
+        # the startup runs in the background, so the app is alive but not ready
+        assert client.get("/health/live").json() == {"status": "alive"}
+        assert client.get("/health/ready").status_code == 503
+        assert client.post("/process_query", json={"query": "AAPL price"}).status_code == 503
+
+        init_finished.set()
+        wait_until(lambda: main.app_data.ready)
+        assert client.get("/health/ready").json() == {"status": "ready"}
+
+
+def test_health_startup_failed(monkeypatch):
+    def failing_init_api(app_data, stop_event):
+        raise RuntimeError("model not found")
+
+    monkeypatch.setattr(main, "init_api", failing_init_api)
+    monkeypatch.setattr(main, "app_data", main.AppData())
+
+    with TestClient(main.app) as client:
+        wait_until(lambda: main.app_data.startup_error is not None)
+        res = client.get("/health/ready")
+        assert res.status_code == 503
+        assert "model not found" in res.json()["detail"]
+        assert client.get("/health/live").status_code == 200
+
+
+def test_shutdown_during_startup(monkeypatch):
+    code_executor = MagicMock()
+
+    def slow_init_api(app_data, stop_event):
+        # still loading the models when the application shuts down
+        assert stop_event.wait(5)
+        app_data.code_executor = code_executor
+
+    monkeypatch.setattr(main, "init_api", slow_init_api)
+    monkeypatch.setattr(main, "app_data", main.AppData())
+
+    with TestClient(main.app) as client:
+        assert client.get("/health/ready").status_code == 503
+
+    # the shutdown waited for the startup and stopped what it created
+    code_executor.shutdown.assert_called_once()
+    assert not main.app_data.ready
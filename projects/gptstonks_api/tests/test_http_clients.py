@@ -0,0 +1,39 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from gptstonks.api.initialization import HTTPClientRegistry, http_client_registry
+from gptstonks.api.main import app
+
+
+@pytest.mark.asyncio
+async def test_http_client_registry():
+    registry = HTTPClientRegistry(max_connections=10, max_keepalive_connections=5, http2=False)
+    # concurrent loads of the models get the same clients
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        clients = list(pool.map(registry.get_client, ["openai"] * 8))
+    assert all(client is clients[0] for client in clients)
+    assert isinstance(registry.get_async_client("openai"), httpx.AsyncClient)
+    assert registry.get_async_client("openai") is registry.get_async_client("openai")
+    assert registry.get_client("anthropic") is not clients[0]
+
+    await registry.aclose()
+    assert clients[0].is_closed
+    assert registry.get_client("openai") is not clients[0]
+
+
+def test_http_client_registry_llama_index_openai():
+    os.environ.setdefault("OPENAI_API_KEY", "randomkeyfortesting")
+    registry = HTTPClientRegistry(http2=False)
+    llm = registry.create_llama_index_openai(model="gpt-3.5-turbo", temperature=0.1)
+    assert llm._get_client()._client is registry.get_client("openai")
+    assert llm._get_aclient()._client is registry.get_async_client("openai")
+
+
+def test_http_client_registry_shutdown():
+    with TestClient(app):
+        client = http_client_registry.get_client("openai")
+    assert client.is_closed
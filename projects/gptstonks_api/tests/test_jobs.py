@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from gptstonks.api.jobs import JobQueue
+from gptstonks.api.models import BaseAgentResponse, JobStatus
+
+
+async def fake_process_query(query: str) -> BaseAgentResponse:
+    await asyncio.sleep(0.01)
+    if query == "fail":
+        raise ValueError("Failed query")
+    if query == "error":
+        return BaseAgentResponse(type="error", body="Agent error")
+    if query == "slow":
+        await asyncio.sleep(10)
+    return BaseAgentResponse(type="data", body=query)
+
+
+async def wait_for_job(job_queue: JobQueue, job_id: str):
+    while job_queue.get(job_id).status in (JobStatus.PENDING, JobStatus.RUNNING):
+        await asyncio.sleep(0.01)
+    return job_queue.get(job_id)
+
+
+@pytest.mark.asyncio
+async def test_job_queue():
+    job_queue = JobQueue(process_func=fake_process_query, num_workers=2, max_queue_size=10)
+    await job_queue.start()
+
+    jobs = [job_queue.submit(f"query {i}") for i in range(5)]
+    assert all(job.status == JobStatus.PENDING for job in jobs)
+    finished_jobs = await asyncio.gather(*[wait_for_job(job_queue, job.job_id) for job in jobs])
+    for i, job in enumerate(finished_jobs):
+        assert job.status == JobStatus.FINISHED
+        assert job.result.body == f"query {i}"
+        assert job.run_time_seconds >= 0
+        assert job.queue_time_seconds >= 0
+
+    failed_job = await wait_for_job(job_queue, job_queue.submit("fail").job_id)
+    assert failed_job.status == JobStatus.FAILED
+    assert failed_job.result.type == "error"
+
+    error_job = await wait_for_job(job_queue, job_queue.submit("error").job_id)
+    assert error_job.status == JobStatus.FAILED
+    assert error_job.result.body == "Agent error"
+
+    await job_queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_queue_stop():
+    job_queue = JobQueue(process_func=fake_process_query, num_workers=1, max_queue_size=10)
+    await job_queue.start()
+
+    running_job = job_queue.submit("slow")
+    pending_job = job_queue.submit("query")
+    await asyncio.sleep(0.05)
+    assert job_queue.get(running_job.job_id).status == JobStatus.RUNNING
+    await job_queue.stop()
+
+    for job in (running_job, pending_job):
+        job = job_queue.get(job.job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.result.type == "error"
+        assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_job_queue_full():
+    job_queue = JobQueue(process_func=fake_process_query, num_workers=0, max_queue_size=1)
+    await job_queue.start()
+
+    job_queue.submit("query")
+    with pytest.raises(asyncio.QueueFull):
+        job_queue.submit("another query")
+    assert job_queue.num_pending == 1
+    assert job_queue.get("unknown") is None
+
+    await job_queue.stop()
@@ -11,7 +11,7 @@ from gptstonks.api.main import app_data
 @pytest.mark.asyncio
 async def test_run_model_bg():
     try:
-        db.command("ping")
+        await db.command("ping")
     except Exception as e:
         pytest.skip("No database to connect to. Test skipped")
     init_api(app_data)
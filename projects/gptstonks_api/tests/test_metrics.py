@@ -0,0 +1,69 @@
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.agents import AgentAction
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.outputs import Generation, LLMResult
+from prometheus_client import REGISTRY
+
+from gptstonks.api.main import app
+from gptstonks.api.metrics import (
+    create_agent_callbacks,
+    observe_agent_callbacks,
+    register_local_llm_metrics,
+)
+from gptstonks.wrappers.llms import ScheduledLLM
+
+
+def get_sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_observe_agent_callbacks():
+    llm_time_callback, tool_time_callback, tool_execution_order_callback = create_agent_callbacks()
+    llm_run_id, tool_run_id = uuid4(), uuid4()
+    await llm_time_callback.on_llm_start({}, ["prompt"], run_id=llm_run_id)
+    await llm_time_callback.on_llm_end(
+        LLMResult(
+            generations=[[Generation(text="Action: OpenBB")]],
+            llm_output={"token_usage": {"prompt_tokens": 120, "completion_tokens": 30}},
+        ),
+        run_id=llm_run_id,
+    )
+    await tool_execution_order_callback.on_agent_action(
+        AgentAction(tool="OpenBB", tool_input="AAPL price", log=""), run_id=uuid4()
+    )
+    await tool_time_callback.on_tool_start({"name": "OpenBB"}, "AAPL price", run_id=tool_run_id)
+    await tool_time_callback.on_tool_end("output", run_id=tool_run_id)
+
+    tool_count_before = get_sample("gptstonks_tool_call_seconds_count", {"tool": "OpenBB"})
+    iterations_sum_before = get_sample("gptstonks_agent_iterations_sum")
+    observe_agent_callbacks(llm_time_callback, tool_time_callback, tool_execution_order_callback)
+
+    assert (
+        get_sample("gptstonks_tool_call_seconds_count", {"tool": "OpenBB"})
+        == tool_count_before + 1
+    )
+    assert get_sample("gptstonks_agent_iterations_sum") == iterations_sum_before + 1
+    assert llm_time_callback.prompt_tokens == 120
+    assert llm_time_callback.num_executions == 1
+
+
+def test_metrics_endpoint():
+    res = TestClient(app).get("/metrics")
+    assert res.status_code == 200
+    assert "gptstonks_llm_call_seconds" in res.text
+
+
+def test_register_local_llm_metrics():
+    llm = ScheduledLLM(
+        llm=FakeListLLM(responses=["one two three"]), token_counter=lambda text: len(text.split())
+    )
+    register_local_llm_metrics(llm)
+    llm.invoke("prompt")
+
+    assert get_sample("gptstonks_local_llm_queue_depth") == 0
+    assert get_sample("gptstonks_local_llm_tokens_per_second") > 0
+    llm.shutdown()
@@ -13,7 +13,7 @@ async def run_multiple_async_queries():
         res = await asyncio.gather(
             *[
                 ac.post(
-                    "/process_query_async",
+                    "/process_query",
                     json={
                         "query": "get the balance sheets for AAPL",
                         "openbb_pat": str(i),
@@ -28,10 +28,11 @@ async def run_multiple_async_queries():
 @pytest.mark.asyncio
 async def test_multiple_pats():
     try:
-        db.command("ping")
+        await db.command("ping")
     except Exception as e:
         pytest.skip("No database to connect to. Test skipped")
     init_api(app_data)
+    app_data.ready = True
     res = await run_multiple_async_queries()
     for r in res:
         assert r.status_code == codes.OK
@@ -0,0 +1,54 @@
+import time
+from unittest.mock import MagicMock
+
+from gptstonks.api.executors.openbb_cache import CachedOpenBBProxy, OpenBBResultCache
+
+
+def create_obb() -> MagicMock:
+    obb = MagicMock()
+    obb.equity.price.historical.side_effect = lambda *args, **kwargs: MagicMock(
+        results=[{"close": 1.0}]
+    )
+    return obb
+
+
+def test_openbb_cache_hits_by_args_and_provider():
+    obb = create_obb()
+    cache = OpenBBResultCache(max_size=2)
+    cached_obb = CachedOpenBBProxy(obb, cache)
+
+    first = cached_obb.equity.price.historical("AAPL", provider="yfinance")
+    assert cached_obb.equity.price.historical("AAPL", provider="yfinance") is first
+    cached_obb.equity.price.historical("AAPL", provider="fmp")
+    cached_obb.equity.price.historical(symbol="MSFT", provider="yfinance")
+    assert obb.equity.price.historical.call_count == 3
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 3}
+
+    # account calls are never cached
+    cached_obb.account.login(pat="pat")
+    cached_obb.account.login(pat="pat")
+    assert obb.account.login.call_count == 2
+
+
+def test_openbb_cache_lru_and_ttls():
+    cache = OpenBBResultCache(max_size=2, default_ttl=100, ttls={"equity.price": 0, "equity": 50})
+    assert cache.ttl("equity.price.quote") == 0
+    assert cache.ttl("equity.fundamental.income") == 50
+    assert cache.ttl("news.world") == 100
+
+    cache.put("equity.price.quote", "quote", "result")
+    time.sleep(0.01)
+    assert cache.get("equity.price.quote", "quote") is None
+
+    for key in ("a", "b", "c"):
+        cache.put("news.world", key, key)
+    assert cache.get("news.world", "a") is None
+    assert cache.get("news.world", "c") == "c"
+
+
+def test_openbb_cache_disabled():
+    obb = create_obb()
+    cached_obb = CachedOpenBBProxy(obb, OpenBBResultCache(max_size=0))
+    cached_obb.equity.price.historical("AAPL")
+    cached_obb.equity.price.historical("AAPL")
+    assert obb.equity.price.historical.call_count == 2
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from gptstonks.api.executors import OpenBBCodeExecutor
+from gptstonks.api.executors.openbb_code_executor import _run_code
+
+
+def test_run_code_fresh_namespace():
+    assert _run_code("res = 1\nprint(res)") == "1\n"
+    # variables from previous executions are not shared
+    assert "NameError" in _run_code("print(res)")
+
+
+def test_run_code_exception():
+    assert _run_code("raise ValueError('wrong code')") == "ValueError('wrong code')"
+
+
+def test_run_code_timeout():
+    assert "TimeoutError" in _run_code("while True:\n    pass", timeout=0.1)
+
+
+def test_code_executor_not_started():
+    with pytest.raises(RuntimeError):
+        asyncio.run(OpenBBCodeExecutor().arun("print(1)"))
+
+
+def test_code_executor_restarts_killed_worker():
+    pytest.importorskip("openbb")
+    code_executor = OpenBBCodeExecutor(num_workers=1, timeout=10)
+    code_executor.start()
+    try:
+        output = asyncio.run(code_executor.arun("import os\nos._exit(1)"))
+        assert output.startswith("BrokenProcessPool(")
+        assert asyncio.run(code_executor.arun("print(1)")) == "1\n"
+    finally:
+        code_executor.shutdown()
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.agents import AgentAction
+
+from gptstonks.api.agent import run_agent_in_background
+from gptstonks.api.caches import SemanticResponseCache, is_us_market_open
+from gptstonks.api.models import AppData, BaseAgentResponse, DataAgentResponse
+
+QUERY_EMBEDDINGS = {
+    "AAPL price last month": [1.0, 0.0, 0.0],
+    "apple stock price past month": [0.99, 0.01, 0.0],
+    "latest news about MSFT": [0.0, 1.0, 0.0],
+    "TSLA sentiment": [0.0, 0.0, 1.0],
+}
+
+
+def create_cache(**kwargs) -> SemanticResponseCache:
+    embed_model = MagicMock()
+    embed_model.aget_query_embedding = AsyncMock(side_effect=lambda q: QUERY_EMBEDDINGS[q])
+    return SemanticResponseCache(embed_model=embed_model, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_semantic_response_cache_hit():
+    cache = create_cache(similarity_threshold=0.95)
+    response = DataAgentResponse(type="data", body="AAPL", result_data=[{"close": 1}])
+    cache.put(await cache.aembed_query("AAPL price last month"), response)
+
+    cached_response = cache.get(await cache.aembed_query("apple stock price past month"))
+    assert isinstance(cached_response, DataAgentResponse)
+    assert cached_response.result_data == response.result_data
+    assert cached_response.metadata["cache_hit"]
+    assert cache.get(await cache.aembed_query("latest news about MSFT")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_semantic_response_cache_eviction_and_ttl():
+    cache = create_cache(
+        max_size=2, market_open_data_ttl=0, market_closed_data_ttl=0, default_ttl=3600
+    )
+    cache.put(
+        await cache.aembed_query("AAPL price last month"),
+        DataAgentResponse(type="data", body="AAPL", result_data=[{"close": 1}]),
+    )
+    cache.put(
+        await cache.aembed_query("TSLA sentiment"),
+        BaseAgentResponse(type="data", body="TSLA"),
+        tools_executed=["OpenBB", "world_knowledge"],
+    )
+    # data responses expire with the data TTLs, the others with the default TTL
+    assert cache.get(await cache.aembed_query("AAPL price last month")) is None
+    assert cache.get(await cache.aembed_query("TSLA sentiment")) is None
+    cache.put(
+        await cache.aembed_query("latest news about MSFT"),
+        BaseAgentResponse(type="data", body="news"),
+        tools_executed=["world_knowledge"],
+    )
+    assert cache.get(await cache.aembed_query("latest news about MSFT")) is not None
+
+    cache = create_cache(max_size=2)
+    for query in ("AAPL price last month", "latest news about MSFT", "TSLA sentiment"):
+        cache.put(await cache.aembed_query(query), BaseAgentResponse(type="data", body=query))
+    # least recently used evicted
+    assert len(cache) == 2
+    assert cache.get(await cache.aembed_query("AAPL price last month")) is None
+
+    # errors are not cached
+    cache.put(
+        await cache.aembed_query("AAPL price last month"),
+        BaseAgentResponse(type="error", body="error"),
+    )
+    assert cache.get(await cache.aembed_query("AAPL price last month")) is None
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.agent.run_background.get_openbb_pat", AsyncMock(return_value=None))
+async def test_semantic_response_cache_skips_failed_code_execution():
+    agent_executor = MagicMock()
+    agent_executor.ainvoke = AsyncMock(
+        return_value={
+            "output": "",
+            "intermediate_steps": [
+                (
+                    AgentAction("OpenBB", "AAPL price last month", ""),
+                    "```python\nres = obb.equity.price.historical('AAPL')\n```",
+                )
+            ],
+        }
+    )
+    code_executor = MagicMock()
+    code_executor.arun = AsyncMock(return_value="NameError(\"name 'obb' is not defined\")")
+    cache = create_cache()
+    app_data = AppData.model_construct(
+        agent_executor=agent_executor, code_executor=code_executor, response_cache=cache
+    )
+
+    response = await run_agent_in_background("AAPL price last month", app_data)
+
+    assert not isinstance(response, DataAgentResponse)
+    assert "NameError" in response.body
+    assert len(cache) == 0
+
+
+def test_is_us_market_open():
+    # Wednesday 15:00 UTC is 11:00 in New York
+    assert is_us_market_open(datetime(2024, 4, 17, 15, 0, tzinfo=timezone.utc))
+    # Saturday
+    assert not is_us_market_open(datetime(2024, 4, 20, 15, 0, tzinfo=timezone.utc))
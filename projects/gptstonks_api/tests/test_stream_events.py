@@ -0,0 +1,68 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.agents import AgentAction
+from langchain_core.messages import AIMessageChunk
+
+from gptstonks.api.agent import stream_agent_events
+from gptstonks.api.models import AppData
+
+
+async def fake_astream_events(*args, **kwargs):
+    yield {"event": "on_chain_start", "run_id": "root", "name": "AgentExecutor", "data": {}}
+    yield {
+        "event": "on_chat_model_stream",
+        "run_id": "llm",
+        "name": "ChatOpenAI",
+        "data": {"chunk": AIMessageChunk(content="Hello")},
+    }
+    yield {
+        "event": "on_tool_start",
+        "run_id": "tool",
+        "name": "world_knowledge",
+        "data": {"input": "news about AAPL"},
+    }
+    yield {
+        "event": "on_tool_end",
+        "run_id": "tool",
+        "name": "world_knowledge",
+        "data": {"output": "AAPL news"},
+    }
+    yield {
+        "event": "on_chain_end",
+        "run_id": "root",
+        "name": "AgentExecutor",
+        "data": {
+            "output": {
+                "output": "AAPL news",
+                "intermediate_steps": [
+                    (AgentAction("world_knowledge", "news about AAPL", ""), "AAPL news")
+                ],
+            }
+        },
+    }
+
+
+def parse_sse(frames: list[str]) -> list[tuple[str, dict]]:
+    events = []
+    for frame in frames:
+        event_line, data_line = frame.strip().split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line[6:])))
+    return events
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.agent.stream_events.get_openbb_pat", AsyncMock(return_value=None))
+async def test_stream_agent_events():
+    agent_executor = MagicMock()
+    agent_executor.astream_events = fake_astream_events
+    app_data = AppData.model_construct(agent_executor=agent_executor)
+
+    events = parse_sse([frame async for frame in stream_agent_events("AAPL news", app_data)])
+
+    assert [event for event, _ in events] == ["token", "tool_start", "tool_end", "response"]
+    assert events[0][1]["token"] == "Hello"
+    assert events[1][1]["tool"] == "world_knowledge"
+    assert events[-1][1]["type"] == "data"
+    assert "AAPL news" in events[-1][1]["body"]
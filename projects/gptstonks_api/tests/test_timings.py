@@ -0,0 +1,63 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.agents import AgentAction
+
+import gptstonks.api.main as main
+from gptstonks.api.agent import run_agent_in_background
+from gptstonks.api.metrics import RequestTimings, time_stage
+from gptstonks.api.models import AppData
+
+
+async def fake_ainvoke(inputs: dict, config: dict) -> dict:
+    with time_stage("retrieval"):
+        await asyncio.sleep(0.01)
+    return {
+        "output": "AAPL news",
+        "intermediate_steps": [(AgentAction("world_knowledge", "news about AAPL", ""), "news")],
+    }
+
+
+def test_request_timings_server_timing():
+    request_timings = RequestTimings({"agent": 1.5})
+    request_timings.add("tool.world knowledge", 0.25)
+    request_timings.add("tool.world knowledge", 0.25)
+
+    assert request_timings.to_server_timing() == "agent;dur=1500.0, tool.world_knowledge;dur=500.0"
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.agent.run_background.get_openbb_pat", AsyncMock(return_value=None))
+async def test_run_agent_in_background_timings():
+    agent_executor = MagicMock()
+    agent_executor.ainvoke = fake_ainvoke
+    app_data = AppData.model_construct(agent_executor=agent_executor, response_cache=None)
+
+    response = await run_agent_in_background("news about AAPL", app_data)
+
+    assert response.type == "data"
+    assert response.timings["retrieval"] >= 0.01
+    assert response.timings["agent"] >= response.timings["retrieval"]
+    assert response.timings["total"] >= response.timings["agent"]
+
+
+@pytest.mark.parametrize("include_timings", [False, True])
+@patch("gptstonks.api.agent.run_background.get_openbb_pat", AsyncMock(return_value=None))
+def test_process_query_server_timing(monkeypatch, include_timings):
+    agent_executor = MagicMock()
+    agent_executor.ainvoke = fake_ainvoke
+    monkeypatch.setattr(
+        main,
+        "app_data",
+        AppData.model_construct(agent_executor=agent_executor, response_cache=None, ready=True),
+    )
+
+    res = TestClient(main.app).post(
+        "/process_query", json={"query": "news about AAPL", "include_timings": include_timings}
+    )
+
+    assert res.status_code == 200
+    assert "retrieval;dur=" in res.headers["Server-Timing"]
+    assert (res.json()["timings"] is not None) == include_timings
@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from gptstonks.api.databases import (
+    get_openbb_pat,
+    invalidate_openbb_pat_cache,
+    update_openbb_pat,
+)
+from gptstonks.api.models import TokenData
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.databases.tokens.db")
+async def test_openbb_pat_cache(mocked_db):
+    mocked_db.tokens.find_one = AsyncMock(return_value={"openbb": "pat1"})
+    mocked_db.tokens.update_one = AsyncMock()
+    invalidate_openbb_pat_cache()
+
+    # only one database call while the token does not change
+    assert await get_openbb_pat() == "pat1"
+    assert await get_openbb_pat() == "pat1"
+    mocked_db.tokens.find_one.assert_awaited_once()
+
+    # updating the token invalidates the cache
+    mocked_db.tokens.find_one.return_value = {"openbb": "pat2"}
+    await update_openbb_pat(TokenData(openbb="pat2"))
+    mocked_db.tokens.update_one.assert_awaited_once()
+    assert await get_openbb_pat() == "pat2"
+    assert mocked_db.tokens.find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.databases.tokens.db")
+async def test_openbb_pat_not_set(mocked_db):
+    mocked_db.tokens.find_one = AsyncMock(return_value=None)
+    invalidate_openbb_pat_cache()
+
+    assert await get_openbb_pat() is None
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.databases.tokens.db")
+async def test_openbb_pat_update_while_reading(mocked_db):
+    async def find_one_then_update(*args, **kwargs):
+        # the PAT is updated after the database returned the previous one
+        await update_openbb_pat(TokenData(openbb="pat2"))
+        return {"openbb": "pat1"}
+
+    mocked_db.tokens.find_one = AsyncMock(side_effect=find_one_then_update)
+    mocked_db.tokens.update_one = AsyncMock()
+    invalidate_openbb_pat_cache()
+
+    assert await get_openbb_pat() == "pat1"
+    # the previous PAT is not cached
+    mocked_db.tokens.find_one = AsyncMock(return_value={"openbb": "pat2"})
+    assert await get_openbb_pat() == "pat2"
+
+
+@pytest.mark.asyncio
+@patch("gptstonks.api.databases.tokens.MONGO_TOKENS_CACHE_TTL", 0)
+@patch("gptstonks.api.databases.tokens.db")
+async def test_openbb_pat_cache_expires(mocked_db):
+    mocked_db.tokens.find_one = AsyncMock(return_value={"openbb": "pat1"})
+    invalidate_openbb_pat_cache()
+
+    assert await get_openbb_pat() == "pat1"
+    # updated by another API worker
+    mocked_db.tokens.find_one.return_value = {"openbb": "pat2"}
+    assert await get_openbb_pat() == "pat2"